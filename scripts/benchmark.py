@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Benchmark
+Time the script entry points against synthetic wardrobes of any size.
+
+The generator writes a deterministic wardrobe (items, index, offsets sidecar) plus
+matching recommendation and feedback archives, every record shaped like the files
+in templates/. Each size is measured in a fresh process pointed at its own data
+directory through WARDROBE_DATA_DIR, so the real data is never touched. Every case
+is timed several times with in-process caches cleared first (like a new CLI
+invocation; on-disk caches stay warm), then run once more under tracemalloc to
+record peak memory.
+
+Results are written as JSON. Compare a run with a stored baseline to flag cases
+that got slower, or use more memory, by more than a threshold.
+
+Usage:
+    # Measure 100, 1,000 and 10,000 items and save the results
+    python scripts/benchmark.py run --sizes 100 1000 10000 --output bench.json
+
+    # Measure again and flag regressions against the saved run
+    python scripts/benchmark.py run --sizes 100 1000 10000 --baseline bench.json
+
+    # Only write a synthetic wardrobe, e.g. to try the scripts on it
+    python scripts/benchmark.py generate --sizes 5000 --data-dir /tmp/wardrobe-5k
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import generate_recommendation_html
+import get_item_details
+import item_offsets
+import update_wardrobe
+import wardrobe_core
+import wardrobe_db
+import wardrobe_query
+import wear_log
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_REPEAT = 5
+DEFAULT_SEED = 42
+DEFAULT_THRESHOLD = 0.25
+
+# Differences below these never count as regressions (timer and allocator noise)
+MIN_TIME_DELTA = 0.001
+MIN_MEMORY_DELTA_KB = 64
+
+# Vocabulary for generated items
+TYPES = {
+    'tops': ['t-shirt', 'button-up shirt', 'polo', 'sweater', 'dress shirt'],
+    'bottoms': ['jeans', 'chinos', 'shorts', 'dress pants'],
+    'shoes': ['sneakers', 'boots', 'loafers', 'oxfords'],
+    'outerwear': ['jacket', 'blazer', 'coat'],
+    'accessories': ['belt', 'watch', 'scarf'],
+}
+ROLES = {'outerwear': 'primary layer', 'tops': 'base layer', 'bottoms': 'base',
+         'shoes': 'foundation', 'accessories': 'accent'}
+COLORS = ['navy blue', 'gray blue', 'charcoal', 'white', 'black', 'olive', 'tan', 'burgundy',
+          'light blue', 'heathered gray', 'khaki', 'brown', 'cream', 'forest green']
+PATTERNS = ['solid', 'heathered', 'striped', 'plaid', 'textured']
+MATERIALS = ['cotton', 'wool blend', 'performance tech fabric', 'denim', 'leather', 'linen', 'merino wool']
+FITS = ['slim fit', 'modern fit', 'relaxed fit', 'tailored fit']
+STYLES = ['casual', 'classic', 'athletic', 'versatile', 'minimal', 'professional']
+SEASONS = ['spring', 'summer', 'fall', 'winter']
+CONDITIONS = ['clear', 'cloudy', 'rain', 'wind', 'snow']
+OCCASIONS = ['casual', 'weekend', 'business meeting', 'date night', 'errands', 'travel', 'wedding']
+TIMES_OF_DAY = ['morning', 'afternoon', 'evening']
+TAGS = ['casual', 'versatile', 'performance', 'stretch', 'classic', 'professional',
+        'wardrobe-staple', 'hybrid', 'travel', 'layering']
+BRANDS = ['01Algo', '7 Diamonds', 'Northfield', 'Arden & Co', 'Kestrel', 'Union Mill']
+FEATURES = ['Side pockets', 'Zipper pockets', 'Stretch waistband', 'Button cuffs', 'Reinforced seams',
+            'Moisture wicking', 'Contrast stitching', 'Water resistant finish']
+PERFORMANCE = ['excellent', 'good', 'fair', 'poor']
+
+ITEMS_PER_DAY = 500  # item IDs are item_YYYYMMDD_NNN
+
+
+# ---------------------------------------------------------------------------
+# Data generation
+# ---------------------------------------------------------------------------
+
+def generate_item(rng, item_id, day):
+    """Return one item shaped like templates/wardrobe/wardrobe_items.template.json."""
+    item_type = rng.choice(list(TYPES))
+    category = rng.choice(TYPES[item_type])
+    primary = rng.choice(COLORS)
+    material = rng.choice(MATERIALS)
+    low = rng.randrange(20, 75)
+    added = day.strftime('%Y-%m-%dT00:00:00Z')
+    wear_count = rng.choice([0, 0, 0, rng.randrange(1, 40)])
+    last_worn = None
+    if wear_count:
+        last_worn = (day + timedelta(days=rng.randrange(1, 300))).strftime('%Y-%m-%dT%H:00:00Z')
+    features = rng.sample(FEATURES, 3)
+
+    return {
+        'id': item_id,
+        'name': f"{primary.title()} {material.title()} {category.title()}",
+        'brand': rng.choice(BRANDS),
+        'type': item_type,
+        'category': category,
+        'metadata': {
+            'colors': {
+                'primary': primary,
+                'secondary': rng.sample(COLORS, rng.randrange(0, 3)),
+                'accent': rng.sample(COLORS, rng.randrange(0, 2)),
+            },
+            'patterns': rng.sample(PATTERNS, rng.randrange(1, 3)),
+            'material': material,
+            'fit': rng.choice(FITS),
+            'formality': rng.randrange(1, 11),
+            'style': rng.sample(STYLES, 3),
+        },
+        'context': {
+            'seasons': sorted(rng.sample(SEASONS, rng.randrange(1, 5)), key=SEASONS.index),
+            'weather': {
+                'tempRange': {'min': low, 'max': low + rng.randrange(10, 35), 'unit': 'fahrenheit'},
+                'conditions': rng.sample(CONDITIONS, 2),
+            },
+            'occasions': rng.sample(OCCASIONS, 3),
+            'timeOfDay': rng.sample(TIMES_OF_DAY, rng.randrange(1, 4)),
+        },
+        'tracking': {
+            'dateAdded': added,
+            'lastWorn': last_worn,
+            'wearCount': wear_count,
+            'lastUpdated': added,
+        },
+        'imagePath': f"images/{item_id}.jpg",
+        'notes': f"{material.capitalize()} {category} with {features[0].lower()}. "
+                 f"Works for {rng.choice(OCCASIONS)}.",
+        'tags': rng.sample(TAGS, 3),
+        'aiAnalysis': {
+            'analyzedDate': added,
+            'confidenceScore': round(rng.uniform(0.7, 0.99), 2),
+            'detectedFeatures': [material.capitalize(), f"{primary.capitalize()} color"] + features,
+            'stylingNotes': f"Pairs well with {rng.choice(COLORS)} and {rng.choice(COLORS)} pieces.",
+        },
+    }
+
+
+def generate_recommendation(rng, rec_id, moment, by_type):
+    """Return one recommendation shaped like the recommendation template."""
+    chosen = [rng.choice(by_type[item_type]) for item_type in ROLES
+              if by_type.get(item_type)
+              and not (item_type in ('outerwear', 'accessories') and rng.random() < 0.5)]
+    outfit_items = [{
+        'id': item['id'],
+        'name': item['name'],
+        'type': item['type'],
+        'category': item['category'],
+        'role': ROLES[item['type']],
+        'reason': f"Formality {item['metadata']['formality']} and {item['metadata']['colors']['primary']} "
+                  f"suit the occasion.",
+    } for item in chosen]
+    colors = [item['metadata']['colors']['primary'] for item in chosen]
+    temperature = rng.randrange(30, 90)
+
+    return {
+        'id': rec_id,
+        'timestamp': moment.strftime('%Y-%m-%dT%H:%M:00Z'),
+        'context': {
+            'occasion': rng.choice(OCCASIONS),
+            'weather': {'temperature': temperature, 'unit': 'fahrenheit',
+                        'conditions': rng.choice(CONDITIONS), 'precipitation': rng.randrange(0, 60)},
+            'season': rng.choice(SEASONS),
+            'timeOfDay': rng.choice(TIMES_OF_DAY),
+            'mood': 'relaxed and confident',
+            'duration': f"{rng.randrange(1, 8)} hours",
+            'additionalNotes': '',
+        },
+        'outfit': {
+            'items': outfit_items,
+            'totalFormality': round(sum(item['metadata']['formality'] for item in chosen) / len(chosen), 1)
+                              if chosen else 0,
+            'dominantColors': list(dict.fromkeys(colors))[:3],
+            'accentColors': list(dict.fromkeys(colors))[3:],
+        },
+        'reasoning': {
+            'overall': 'Balanced outfit for the occasion and weather.',
+            'formalityMatch': 'Formality is within the target range.',
+            'colorCoordination': 'Neutral base with one accent color.',
+            'weatherAppropriateness': f"Comfortable at {temperature}°F.",
+            'occasionFit': 'Appropriate for the setting.',
+            'styleNotes': ['Keep the layers unbuttoned indoors'],
+        },
+        'alternatives': {
+            'variations': [{'type': 'color variation', 'description': 'Swap the top for a lighter color',
+                            'reason': 'Slightly less formal', 'formalityChange': -0.5}],
+            'ifNotWearing': {},
+        },
+        'metadata': {
+            'generatedBy': 'benchmark',
+            'modelVersion': 'v1.0',
+            'confidenceScore': round(rng.uniform(0.7, 0.99), 2),
+            'basedOnFeedback': [],
+            'wardrobeCoverage': f"{len(outfit_items)} of {sum(len(v) for v in by_type.values())} items used",
+        },
+    }
+
+
+def generate_feedback(rng, feedback_id, rec):
+    """Return one feedback record shaped like templates/feedback/feedback.template.json."""
+    worn = [piece['id'] for piece in rec['outfit']['items']]
+    rated = rng.sample(worn, min(2, len(worn)))
+    moment = datetime.strptime(rec['timestamp'], '%Y-%m-%dT%H:%M:00Z') + timedelta(hours=8)
+
+    return {
+        'id': feedback_id,
+        'recommendationId': rec['id'],
+        'timestamp': moment.strftime('%Y-%m-%dT%H:%M:00Z'),
+        'worn': True,
+        'woreExactly': rng.random() < 0.7,
+        'actualOutfit': {'itemsWorn': worn, 'modifications': [], 'addedItems': [], 'removedItems': []},
+        'ratings': {
+            'overall': rng.randrange(4, 11),
+            'comfort': rng.randrange(4, 11),
+            'appropriateness': rng.randrange(4, 11),
+            'confidence': rng.randrange(4, 11),
+            'compliments': rng.randrange(0, 4),
+            'wouldWearAgain': rng.random() < 0.8,
+        },
+        'experience': {'whatWorked': ['Comfortable all day'], 'whatDidnt': [],
+                       'surprises': [], 'improvements': []},
+        'context': {
+            'actualWeather': {'temperature': rec['context']['weather']['temperature'] + rng.randrange(-5, 6),
+                              'conditions': rng.choice(CONDITIONS), 'different': ''},
+            'actualOccasion': {'asExpected': True, 'notes': ''},
+            'duration': rec['context']['duration'],
+            'activities': ['walking', 'sitting'],
+        },
+        'learning': {
+            'colorInsights': [], 'fitInsights': [], 'occasionInsights': [],
+            'itemPerformance': {item_id: {'performance': rng.choice(PERFORMANCE), 'notes': ''}
+                                for item_id in rated},
+        },
+        'futurePreferences': {'repeatThisCombination': rng.random() < 0.6, 'similarOccasions': [],
+                              'adjustments': [], 'avoidances': []},
+        'photos': {'hasPhotos': False, 'photoDirectory': None, 'photos': []},
+        'metadata': {'feedbackCompleteness': 'quick', 'timeToComplete': '1 minute', 'notes': ''},
+    }
+
+
+def generate_dataset(size, data_dir, seed=DEFAULT_SEED):
+    """Write a synthetic wardrobe of size items, with recommendations and feedback, to data_dir.
+
+    The same size and seed always produce the same files. Returns the record counts.
+    """
+    rng = random.Random(f"{seed}:{size}")
+    data_dir = Path(data_dir)
+    for sub in ('wardrobe', 'recommendations', 'feedback'):
+        (data_dir / sub).mkdir(parents=True, exist_ok=True)
+
+    start = datetime(2025, 1, 1)
+    items = []
+    for n in range(size):
+        day = start + timedelta(days=n // ITEMS_PER_DAY)
+        items.append(generate_item(rng, f"item_{day:%Y%m%d}_{n % ITEMS_PER_DAY + 1:03d}", day))
+
+    item_offsets.write_items_file(data_dir / 'wardrobe' / 'wardrobe_items.json', {'items': items})
+    with open(data_dir / 'wardrobe' / 'wardrobe_index.json', 'w', encoding='utf-8') as f:
+        json.dump({'items': [wardrobe_core.index_entry(item) for item in items]}, f, indent=2, ensure_ascii=False)
+
+    by_type = {}
+    for item in items:
+        by_type.setdefault(item['type'], []).append(item)
+
+    rec_count = max(3, size // 25)
+    feedback_count = 0
+    for n in range(rec_count):
+        moment = start + timedelta(hours=n * 7)
+        rec = generate_recommendation(rng, f"rec_{moment:%Y%m%d}_{n % 1000 + 1:03d}", moment, by_type)
+        with open(data_dir / 'recommendations' / f"{rec['id']}.json", 'w', encoding='utf-8') as f:
+            json.dump(rec, f, indent=2, ensure_ascii=False)
+        if n % 2 == 0:
+            feedback = generate_feedback(rng, rec['id'].replace('rec_', 'feedback_'), rec)
+            with open(data_dir / 'feedback' / f"{feedback['id']}.json", 'w', encoding='utf-8') as f:
+                json.dump(feedback, f, indent=2, ensure_ascii=False)
+            feedback_count += 1
+
+    return {'items': size, 'recommendations': rec_count, 'feedback': feedback_count}
+
+
+# ---------------------------------------------------------------------------
+# Measurement (runs inside a process whose WARDROBE_DATA_DIR is the dataset)
+# ---------------------------------------------------------------------------
+
+def query_args(**flags):
+    """Return a wardrobe_query argument namespace with the given filter flags set."""
+    args = argparse.Namespace(type=None, category=None, color=None, formality=None, season=None,
+                              tag=None, ids=None, color_near=None, max_delta=None, temp=None,
+                              temp_range=None, not_worn_since=None, sort_by=None, sort=None,
+                              offset=0, limit=None)
+    for name, value in flags.items():
+        setattr(args, name, value)
+    return args
+
+
+def filter_case(**flags):
+    args = query_args(**flags)
+    return lambda rep: wardrobe_query.filter_index(None, args, engine=wardrobe_core.Wardrobe.load().engine)
+
+
+def benchmark_cases(ids, rec_ids, scratch):
+    """Return [(name, run, setup)]; run(rep) is timed, setup(rep) runs untimed before it.
+
+    Cases that change data use a different item on every repetition.
+    """
+    count = len(ids)
+    wear_date = '2025-12-01T18:00:00Z'
+    batch_path = Path(scratch) / 'batch.jsonl'
+
+    def write_batch(rep):
+        ops = [{'op': 'update', 'id': ids[(rep * 20 + n) % count], 'field': 'metadata.fit', 'value': 'slim fit'}
+               for n in range(20)]
+        ops.append({'op': 'mark-worn', 'ids': ids[rep * 3 % count:rep * 3 % count + 3], 'date': wear_date})
+        batch_path.write_text(''.join(json.dumps(op) + '\n' for op in ops), encoding='utf-8')
+
+    def log_wear(rep):
+        wear_log.append_events(ids[rep * 50 % count:rep * 50 % count + 50], wear_date)
+
+    return [
+        ('filter_index', filter_case(type='tops', formality='5-7', season='fall'), None),
+        ('filter_index_color_temp', filter_case(color_near='navy', temp=50.0), None),
+        ('filter_index_not_worn_sorted', filter_case(not_worn_since='2025-06-01', sort_by='last-worn', limit=10), None),
+        ('load_full_items_20', lambda rep: wardrobe_query.load_full_items(ids[:20]), None),
+        ('load_full_items_all', lambda rep: wardrobe_query.load_full_items(), None),
+        ('get_items_by_ids_10', lambda rep: get_item_details.get_items_by_ids(ids[-10:]), None),
+        ('update_item_field', lambda rep: update_wardrobe.update_item_field(
+            ids[rep % count], 'metadata.formality', 6), None),
+        ('mark_items_worn', lambda rep: update_wardrobe.mark_items_worn(
+            ids[rep * 3 % count:rep * 3 % count + 3], wear_date), None),
+        ('compact_wear_log', lambda rep: wear_log.compact(), log_wear),
+        ('batch', lambda rep: update_wardrobe.run_batch(str(batch_path)), write_batch),
+        ('check_index', lambda rep: update_wardrobe.sync_index(write=False), None),
+        ('rebuild_index', lambda rep: update_wardrobe.sync_index(write=True), None),
+        ('remove_item', lambda rep: update_wardrobe.remove_item(ids[-1 - rep % count]), None),
+        ('generate_html', lambda rep: generate_recommendation_html.generate_html(
+            rec_ids[rep % len(rec_ids)], Path(scratch) / 'page.html'), None),
+    ]
+
+
+def time_case(run, setup, repeat):
+    """Time run(rep) repeat times and measure its peak memory once."""
+    timings = []
+    quiet = io.StringIO()
+    for rep in range(repeat + 1):
+        wardrobe_core.Wardrobe.clear_caches()
+        if setup:
+            setup(rep)
+        measure_memory = rep == repeat
+        with contextlib.redirect_stdout(quiet), contextlib.redirect_stderr(quiet):
+            if measure_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            run(rep)
+            elapsed = time.perf_counter() - start
+            if measure_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        quiet.seek(0)
+        quiet.truncate()
+        if not measure_memory:
+            timings.append(elapsed)
+
+    return {
+        'min': round(min(timings), 6),
+        'median': round(statistics.median(timings), 6),
+        'max': round(max(timings), 6),
+        'peakKB': peak // 1024,
+    }
+
+
+def measure(repeat, only=None):
+    """Time every case against the data directory this process points at."""
+    if wardrobe_db.backend_enabled():
+        with wardrobe_db.open_db() as conn:
+            wardrobe_db.import_json(conn)
+
+    wardrobe = wardrobe_core.Wardrobe.load()
+    ids = list(wardrobe.ids)
+    rec_ids = wardrobe_core.recommendation_ids()
+    wardrobe.engine  # build the on-disk caches before timing
+
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for name, run, setup in benchmark_cases(ids, rec_ids, scratch):
+            if only and name not in only:
+                continue
+            results[name] = time_case(run, setup, repeat)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Runs and comparison
+# ---------------------------------------------------------------------------
+
+def run_size(size, repeat, seed, only=None, keep_data=False):
+    """Generate a dataset of size items and measure it in a separate process."""
+    data_dir = Path(tempfile.mkdtemp(prefix=f"wardrobe-bench-{size}-"))
+    try:
+        generate_dataset(size, data_dir, seed)
+        result_path = data_dir / 'results.json'
+        command = [sys.executable, str(Path(__file__).resolve()), 'measure',
+                   '--data-dir', str(data_dir), '--repeat', str(repeat), '--output', str(result_path)]
+        if only:
+            command += ['--cases'] + list(only)
+        subprocess.run(command, check=True, env=dict(os.environ, WARDROBE_DATA_DIR=str(data_dir)))
+        with open(result_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        if keep_data:
+            print(f"Kept data for {size} items: {data_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Return comparison rows for every size/case present in both result sets.
+
+    Each row is (size, case, metric, baseline, current, change, regressed).
+    """
+    rows = []
+    for size, cases in current['results'].items():
+        for case, stats in cases.items():
+            base = baseline.get('results', {}).get(size, {}).get(case)
+            if base is None:
+                continue
+            for metric, min_delta in (('median', MIN_TIME_DELTA), ('peakKB', MIN_MEMORY_DELTA_KB)):
+                before, after = base[metric], stats[metric]
+                change = (after - before) / before if before else 0.0
+                regressed = change > threshold and after - before > min_delta
+                rows.append((size, case, metric, before, after, change, regressed))
+    return rows
+
+
+def format_value(metric, value):
+    return f"{value * 1000:.2f}ms" if metric == 'median' else f"{value}KB"
+
+
+def print_comparison(rows, threshold):
+    """Print a comparison table and return the number of regressions."""
+    print(f"{'size':>7}  {'case':30} {'metric':7} {'baseline':>12} {'current':>12} {'change':>8}")
+    for size, case, metric, before, after, change, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{size:>7}  {case:30} {metric:7} {format_value(metric, before):>12} "
+              f"{format_value(metric, after):>12} {change:+8.1%}{flag}")
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"\n{regressions} regression(s) past {threshold:.0%} in {len(rows)} comparison(s)")
+    return regressions
+
+
+def print_results(results):
+    for size, cases in results['results'].items():
+        print(f"\n{size} items")
+        for case, stats in cases.items():
+            print(f"  {case:30} median {stats['median'] * 1000:9.2f}ms  "
+                  f"min {stats['min'] * 1000:9.2f}ms  peak {stats['peakKB']:>8}KB")
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    if results.get('version') != RESULTS_VERSION:
+        raise ValueError(f"{path} is not a version {RESULTS_VERSION} benchmark result file")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the wardrobe scripts on synthetic data',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Measure the default sizes and save the results
+  python scripts/benchmark.py run --output bench.json
+
+  # Measure 100k items, only a few cases
+  python scripts/benchmark.py run --sizes 100000 --repeat 3 --cases filter_index load_full_items_20
+
+  # Flag cases more than 20% slower than a stored baseline
+  python scripts/benchmark.py run --baseline bench.json --threshold 0.2
+  python scripts/benchmark.py compare new.json bench.json
+
+  # Write a 5,000-item wardrobe for manual testing
+  python scripts/benchmark.py generate --sizes 5000 --data-dir /tmp/wardrobe-5k
+        """
+    )
+
+    parser.add_argument('command', choices=['run', 'compare', 'generate', 'measure'],
+                        help='Action to perform (measure times one data directory; run uses it)')
+    parser.add_argument('files', nargs='*', help='compare: CURRENT BASELINE result files')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f"Wardrobe sizes in items (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'Timed runs per case (default: {DEFAULT_REPEAT})')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'Generator seed (default: {DEFAULT_SEED})')
+    parser.add_argument('--cases', nargs='+', metavar='CASE', help='Only run these cases')
+    parser.add_argument('--output', '-o', help='Write results JSON here (run default: benchmark_results.json)')
+    parser.add_argument('--baseline', help='run: compare the results with this result file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Relative slowdown or memory growth flagged as a regression '
+                             f'(default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--data-dir', help='generate/measure: data directory')
+    parser.add_argument('--keep-data', action='store_true', help='run: keep the generated data directories')
+
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+    if any(size < 1 for size in args.sizes):
+        parser.error('--sizes must be positive')
+
+    if args.command == 'generate':
+        if not args.data_dir:
+            parser.error('generate requires --data-dir')
+        for size in args.sizes:
+            data_dir = Path(args.data_dir) if len(args.sizes) == 1 else Path(args.data_dir) / str(size)
+            counts = generate_dataset(size, data_dir, args.seed)
+            print(f"Wrote {counts['items']} items, {counts['recommendations']} recommendations and "
+                  f"{counts['feedback']} feedback files to {data_dir}")
+        return
+
+    if args.command == 'measure':
+        if not args.data_dir or not args.output:
+            parser.error('measure requires --data-dir and --output')
+        if Path(args.data_dir).resolve() != wardrobe_core.DATA_DIR.resolve():
+            parser.error('measure must run with WARDROBE_DATA_DIR set to --data-dir')
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(measure(args.repeat, args.cases), f, indent=2)
+        return
+
+    if args.command == 'compare':
+        if len(args.files) != 2:
+            parser.error('compare requires CURRENT and BASELINE result files')
+        try:
+            current, baseline = (load_results(path) for path in args.files)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(1 if print_comparison(compare(current, baseline, args.threshold), args.threshold) else 0)
+
+    # run
+    results = {
+        'version': RESULTS_VERSION,
+        'created': datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': 'sqlite' if wardrobe_db.backend_enabled() else 'json',
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'results': {},
+    }
+    try:
+        for size in args.sizes:
+            print(f"Measuring {size} items...", file=sys.stderr)
+            results['results'][str(size)] = run_size(size, args.repeat, args.seed, args.cases, args.keep_data)
+    except subprocess.CalledProcessError as e:
+        print(f"Error: measurement failed (exit status {e.returncode})", file=sys.stderr)
+        sys.exit(1)
+
+    output = args.output or 'benchmark_results.json'
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print_results(results)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        try:
+            baseline = load_results(args.baseline)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print()
+        if print_comparison(compare(results, baseline, args.threshold), args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Color Engine
+Maps free-text clothing color names to CIELAB and compares them perceptually.
+
+A name is resolved against a table of named colors: an exact match first, then
+word by word (color words, multi-word names such as "navy blue", and modifiers
+such as "light", "dark" or "heathered"), and finally a fuzzy match for misspelled
+words. Each distinct string is resolved once per process. Colors are compared with
+CIEDE2000 (delta E; about 2 is a just-noticeable difference, 10+ a clearly
+different color) and a simple hue-based harmony score.
+
+The pairwise matrices over many items use NumPy when it is installed and fall back
+to pure Python otherwise.
+
+Usage:
+    # Show how color names resolve
+    python scripts/color_engine.py "heathered gray" "gray blue" charcoal
+
+    # Distance between two colors
+    python scripts/color_engine.py navy "dark blue" --compare
+"""
+
+import argparse
+import difflib
+import math
+import re
+import sys
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # optional: only speeds up the pairwise matrices
+    np = None
+
+# Named colors (hex). The first block keeps the swatch colors the HTML generator
+# has always used, so existing pages render the same.
+NAMED_COLORS = {
+    'light blue': '#87CEEB',
+    'dark grey': '#4A5568',
+    'dark gray': '#4A5568',
+    'tan': '#D2B48C',
+    'brown': '#8B4513',
+    'navy': '#001f3f',
+    'navy blue': '#001f3f',
+    'grey': '#718096',
+    'gray': '#718096',
+    'black': '#000000',
+    'white': '#FFFFFF',
+    'olive green': '#556B2F',
+    'olive': '#556B2F',
+    'beige': '#F5F5DC',
+    'burgundy': '#800020',
+    'red': '#DC143C',
+    'blue': '#4169E1',
+    'indigo': '#4B0082',
+    'light purple': '#D8BFD8',
+    'burnt orange': '#CC5500',
+    'yellow': '#FFD700',
+    'teal blue': '#008080',
+    'khaki': '#C3B091',
+
+    # Neutrals
+    'charcoal': '#36454F',
+    'slate': '#708090',
+    'silver': '#C0C0C0',
+    'ash': '#B2BEB5',
+    'stone': '#928E85',
+    'graphite': '#383838',
+    'jet': '#343434',
+    'ivory': '#FFFFF0',
+    'cream': '#FFFDD0',
+    'off white': '#FAF9F6',
+    'ecru': '#C2B280',
+    'oatmeal': '#D8CAB0',
+    'bone': '#E3DAC9',
+    'sand': '#C2B280',
+    'taupe': '#483C32',
+    'camel': '#C19A6B',
+    'chocolate': '#7B3F00',
+    'espresso': '#4B3621',
+    'cognac': '#9A463D',
+    'mocha': '#967969',
+    'coffee': '#6F4E37',
+    'chestnut': '#954535',
+    'rust': '#B7410E',
+    'copper': '#B87333',
+    'bronze': '#CD7F32',
+    'gold': '#D4AF37',
+    'mustard': '#E1AD01',
+
+    # Blues
+    'sky blue': '#87CEEB',
+    'baby blue': '#89CFF0',
+    'powder blue': '#B0E0E6',
+    'royal blue': '#4169E1',
+    'cobalt': '#0047AB',
+    'cobalt blue': '#0047AB',
+    'denim': '#1560BD',
+    'indigo blue': '#3F51B5',
+    'midnight blue': '#191970',
+    'steel blue': '#4682B4',
+    'cornflower': '#6495ED',
+    'azure': '#007FFF',
+    'cyan': '#00FFFF',
+    'turquoise': '#40E0D0',
+    'aqua': '#00FFFF',
+    'teal': '#008080',
+    'petrol': '#005F6A',
+
+    # Greens
+    'green': '#228B22',
+    'forest green': '#228B22',
+    'hunter green': '#355E3B',
+    'emerald': '#50C878',
+    'kelly green': '#4CBB17',
+    'mint': '#98FF98',
+    'sage': '#9CAF88',
+    'army green': '#4B5320',
+    'moss': '#8A9A5B',
+    'lime': '#32CD32',
+    'seafoam': '#93E9BE',
+    'jade': '#00A86B',
+
+    # Reds, pinks, purples
+    'crimson': '#DC143C',
+    'scarlet': '#FF2400',
+    'cherry': '#D2042D',
+    'wine': '#722F37',
+    'maroon': '#800000',
+    'oxblood': '#4A0000',
+    'brick': '#CB4154',
+    'coral': '#FF7F50',
+    'salmon': '#FA8072',
+    'pink': '#FFC0CB',
+    'blush': '#DE5D83',
+    'rose': '#FF007F',
+    'dusty rose': '#C9A9A6',
+    'fuchsia': '#FF00FF',
+    'magenta': '#FF00FF',
+    'purple': '#800080',
+    'violet': '#8F00FF',
+    'lavender': '#E6E6FA',
+    'lilac': '#C8A2C8',
+    'plum': '#8E4585',
+    'mauve': '#E0B0FF',
+    'eggplant': '#614051',
+    'aubergine': '#3D0734',
+
+    # Oranges, yellows
+    'orange': '#FF8C00',
+    'peach': '#FFE5B4',
+    'apricot': '#FBCEB1',
+    'tangerine': '#F28500',
+    'amber': '#FFBF00',
+    'lemon': '#FFF44F',
+    'butter': '#FFFAA0',
+}
+
+# Modifier words: (lightness shift, chroma factor)
+MODIFIERS = {
+    'light': (18, 0.85),
+    'pale': (22, 0.6),
+    'pastel': (20, 0.55),
+    'dark': (-18, 1.0),
+    'deep': (-12, 1.1),
+    'rich': (-6, 1.15),
+    'bright': (5, 1.25),
+    'vivid': (3, 1.3),
+    'neon': (5, 1.5),
+    'muted': (0, 0.6),
+    'dusty': (3, 0.55),
+    'washed': (8, 0.65),
+    'faded': (8, 0.65),
+    'heathered': (4, 0.7),
+    'heather': (4, 0.7),
+    'medium': (0, 1.0),
+    'mid': (0, 1.0),
+}
+
+# Weight of each additional color word when mixed into the head color
+# ("gray blue" is a blue mixed with some gray)
+MIX_WEIGHT = 0.3
+
+# Below this chroma a color counts as a neutral that goes with anything
+NEUTRAL_CHROMA = 12.0
+
+FALLBACK_HEX = '#CCCCCC'
+
+HEX_PATTERN = re.compile(r'^#?([0-9a-f]{6})$')
+MAX_PHRASE_WORDS = max(len(name.split()) for name in NAMED_COLORS)
+SINGLE_WORD_COLORS = [name for name in NAMED_COLORS if ' ' not in name]
+
+
+# ---------------------------------------------------------------------------
+# Conversions
+# ---------------------------------------------------------------------------
+
+def _srgb_to_linear(c):
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(c):
+    c = min(max(c, 0.0), 1.0)
+    return 12.92 * c if c <= 0.0031308 else 1.055 * c ** (1 / 2.4) - 0.055
+
+
+# D65 reference white
+_XN, _YN, _ZN = 0.95047, 1.0, 1.08883
+
+
+def _f(t):
+    return t ** (1 / 3) if t > 216 / 24389 else (24389 / 27 * t + 16) / 116
+
+
+def _f_inv(t):
+    return t ** 3 if t ** 3 > 216 / 24389 else (116 * t - 16) / (24389 / 27)
+
+
+def hex_to_lab(hex_code):
+    """Convert #RRGGBB to an (L, a, b) tuple."""
+    hex_code = hex_code.lstrip('#')
+    r, g, b = (_srgb_to_linear(int(hex_code[i:i + 2], 16) / 255) for i in (0, 2, 4))
+
+    x = (0.4124564 * r + 0.3575761 * g + 0.1804375 * b) / _XN
+    y = (0.2126729 * r + 0.7151522 * g + 0.0721750 * b) / _YN
+    z = (0.0193339 * r + 0.1191920 * g + 0.9503041 * b) / _ZN
+
+    fx, fy, fz = _f(x), _f(y), _f(z)
+    return (116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz))
+
+
+def lab_to_hex(lab):
+    """Convert an (L, a, b) tuple to #RRGGBB (clamped to the sRGB gamut)."""
+    L, a, b = lab
+    fy = (L + 16) / 116
+    x = _XN * _f_inv(fy + a / 500)
+    y = _YN * _f_inv(fy)
+    z = _ZN * _f_inv(fy - b / 200)
+
+    r = 3.2404542 * x - 1.5371385 * y - 0.4985314 * z
+    g = -0.9692660 * x + 1.8760108 * y + 0.0415560 * z
+    bl = 0.0556434 * x - 0.2040259 * y + 1.0572252 * z
+    return '#' + ''.join(f"{round(_linear_to_srgb(c) * 255):02X}" for c in (r, g, bl))
+
+
+def _lch(lab):
+    L, a, b = lab
+    return L, math.hypot(a, b), math.atan2(b, a)
+
+
+def _from_lch(L, C, h):
+    return (min(max(L, 0.0), 100.0), C * math.cos(h), C * math.sin(h))
+
+
+def _mix(lab1, lab2, weight):
+    return tuple(c1 * (1 - weight) + c2 * weight for c1, c2 in zip(lab1, lab2))
+
+
+# ---------------------------------------------------------------------------
+# Name resolution
+# ---------------------------------------------------------------------------
+
+def normalize(name):
+    """Lowercase a color name and reduce it to plain words."""
+    text = name.lower().replace('grey', 'gray')
+    text = re.sub(r'[-_/,&+]', ' ', text)
+    text = re.sub(r"[^a-z0-9# ]", '', text)
+    return ' '.join(text.split())
+
+
+def _fuzzy_word(word):
+    match = difflib.get_close_matches(word, SINGLE_WORD_COLORS, n=1, cutoff=0.8)
+    return match[0] if match else None
+
+
+@lru_cache(maxsize=4096)
+def lab(name):
+    """Return the (L, a, b) of a free-text color name, or None if unrecognized."""
+    if not name:
+        return None
+    text = normalize(name)
+
+    if text in NAMED_COLORS:
+        return hex_to_lab(NAMED_COLORS[text])
+    hex_match = HEX_PATTERN.match(text)
+    if hex_match:
+        return hex_to_lab(hex_match.group(1))
+
+    words = text.split()
+    colors = []
+    modifiers = []
+    i = 0
+    while i < len(words):
+        # Longest named phrase starting at this word ("navy blue", "off white")
+        for span in range(min(MAX_PHRASE_WORDS, len(words) - i), 0, -1):
+            phrase = ' '.join(words[i:i + span])
+            if phrase in NAMED_COLORS:
+                colors.append(NAMED_COLORS[phrase])
+                i += span
+                break
+        else:
+            word = words[i]
+            if word in MODIFIERS:
+                modifiers.append(MODIFIERS[word])
+            elif word.endswith('ish') and word[:-3] in NAMED_COLORS:
+                colors.append(NAMED_COLORS[word[:-3]])  # "bluish", "grayish"
+            else:
+                fuzzy = _fuzzy_word(word) if len(word) > 3 else None
+                if fuzzy:
+                    colors.append(NAMED_COLORS[fuzzy])
+            i += 1
+
+    if not colors:
+        return None
+
+    # The last color word names the color; earlier ones tint it
+    result = hex_to_lab(colors[-1])
+    for hex_code in colors[:-1]:
+        result = _mix(result, hex_to_lab(hex_code), MIX_WEIGHT)
+
+    if modifiers:
+        L, C, h = _lch(result)
+        for shift, factor in modifiers:
+            L += shift
+            C *= factor
+        result = _from_lch(L, C, h)
+    return result
+
+
+def to_hex(name, default=FALLBACK_HEX):
+    """Return a display hex color for a color name."""
+    value = lab(name)
+    if value is None:
+        return default
+    text = normalize(name)
+    if text in NAMED_COLORS:
+        return NAMED_COLORS[text]
+    return lab_to_hex(value)
+
+
+def item_colors(item):
+    """Return the color names of an item: primary, then secondary and accent colors."""
+    colors = item.get('metadata', {}).get('colors', {})
+    names = [colors.get('primary')]
+    for key in ('secondary', 'accent'):
+        value = colors.get(key) or []
+        names.extend([value] if isinstance(value, str) else value)
+    return [name for name in names if name]
+
+
+# ---------------------------------------------------------------------------
+# Distances and harmony
+# ---------------------------------------------------------------------------
+
+def delta_e(lab1, lab2):
+    """CIEDE2000 color difference between two Lab colors."""
+    L1, a1, b1 = lab1
+    L2, a2, b2 = lab2
+
+    C_bar = (math.hypot(a1, b1) + math.hypot(a2, b2)) / 2
+    G = 0.5 * (1 - math.sqrt(C_bar ** 7 / (C_bar ** 7 + 25 ** 7)))
+    a1p, a2p = (1 + G) * a1, (1 + G) * a2
+    C1p, C2p = math.hypot(a1p, b1), math.hypot(a2p, b2)
+    h1p = math.degrees(math.atan2(b1, a1p)) % 360
+    h2p = math.degrees(math.atan2(b2, a2p)) % 360
+
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    if C1p * C2p == 0:
+        dhp = 0.0
+    else:
+        dhp = h2p - h1p
+        if dhp > 180:
+            dhp -= 360
+        elif dhp < -180:
+            dhp += 360
+    dHp = 2 * math.sqrt(C1p * C2p) * math.sin(math.radians(dhp) / 2)
+
+    Lbp = (L1 + L2) / 2
+    Cbp = (C1p + C2p) / 2
+    if C1p * C2p == 0:
+        hbp = h1p + h2p
+    elif abs(h1p - h2p) <= 180:
+        hbp = (h1p + h2p) / 2
+    elif h1p + h2p < 360:
+        hbp = (h1p + h2p + 360) / 2
+    else:
+        hbp = (h1p + h2p - 360) / 2
+
+    T = (1 - 0.17 * math.cos(math.radians(hbp - 30)) + 0.24 * math.cos(math.radians(2 * hbp))
+         + 0.32 * math.cos(math.radians(3 * hbp + 6)) - 0.20 * math.cos(math.radians(4 * hbp - 63)))
+    d_theta = 30 * math.exp(-((hbp - 275) / 25) ** 2)
+    Rc = 2 * math.sqrt(Cbp ** 7 / (Cbp ** 7 + 25 ** 7))
+    Sl = 1 + 0.015 * (Lbp - 50) ** 2 / math.sqrt(20 + (Lbp - 50) ** 2)
+    Sc = 1 + 0.045 * Cbp
+    Sh = 1 + 0.015 * Cbp * T
+    Rt = -math.sin(math.radians(2 * d_theta)) * Rc
+
+    return math.sqrt((dLp / Sl) ** 2 + (dCp / Sc) ** 2 + (dHp / Sh) ** 2
+                     + Rt * (dCp / Sc) * (dHp / Sh))
+
+
+def name_delta_e(name1, name2):
+    """Delta E between two color names, or None if either is unrecognized."""
+    lab1, lab2 = lab(name1), lab(name2)
+    if lab1 is None or lab2 is None:
+        return None
+    return delta_e(lab1, lab2)
+
+
+def harmony(lab1, lab2):
+    """Score how well two colors go together, from 0 (clash) to 1.
+
+    Neutrals go with everything; otherwise the hue angle decides: analogous and
+    complementary pairs score well, triadic pairs reasonably, anything else poorly.
+    """
+    _, C1, h1 = _lch(lab1)
+    _, C2, h2 = _lch(lab2)
+    if min(C1, C2) < NEUTRAL_CHROMA:
+        return 1.0
+    return _hue_score(abs(math.degrees(h1 - h2)) % 360)
+
+
+def _hue_score(diff):
+    diff = 360 - diff if diff > 180 else diff
+    if diff <= 30:
+        return 0.9   # analogous
+    if diff >= 150:
+        return 0.8   # complementary
+    if 100 <= diff <= 140:
+        return 0.7   # triadic
+    return 0.4
+
+
+def delta_e_matrix(labs_a, labs_b=None):
+    """Pairwise CIEDE2000 distances between two lists of Lab colors.
+
+    Returns a NumPy array when NumPy is available, else a list of lists.
+    """
+    labs_b = labs_a if labs_b is None else labs_b
+    if np is None:
+        return [[delta_e(x, y) for y in labs_b] for x in labs_a]
+
+    A = np.asarray(labs_a, dtype=float).reshape(-1, 1, 3)
+    B = np.asarray(labs_b, dtype=float).reshape(1, -1, 3)
+    L1, a1, b1 = A[..., 0], A[..., 1], A[..., 2]
+    L2, a2, b2 = B[..., 0], B[..., 1], B[..., 2]
+
+    C_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    G = 0.5 * (1 - np.sqrt(C_bar ** 7 / (C_bar ** 7 + 25.0 ** 7)))
+    a1p, a2p = (1 + G) * a1, (1 + G) * a2
+    C1p, C2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    zero = (C1p * C2p) == 0
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, np.where(dhp < -180, dhp + 360, dhp))
+    dhp = np.where(zero, 0.0, dhp)
+    dHp = 2 * np.sqrt(C1p * C2p) * np.sin(np.radians(dhp) / 2)
+
+    Lbp = (L1 + L2) / 2
+    Cbp = (C1p + C2p) / 2
+    hsum = h1p + h2p
+    hbp = np.where(np.abs(h1p - h2p) <= 180, hsum / 2,
+                   np.where(hsum < 360, (hsum + 360) / 2, (hsum - 360) / 2))
+    hbp = np.where(zero, hsum, hbp)
+
+    T = (1 - 0.17 * np.cos(np.radians(hbp - 30)) + 0.24 * np.cos(np.radians(2 * hbp))
+         + 0.32 * np.cos(np.radians(3 * hbp + 6)) - 0.20 * np.cos(np.radians(4 * hbp - 63)))
+    d_theta = 30 * np.exp(-((hbp - 275) / 25) ** 2)
+    Rc = 2 * np.sqrt(Cbp ** 7 / (Cbp ** 7 + 25.0 ** 7))
+    Sl = 1 + 0.015 * (Lbp - 50) ** 2 / np.sqrt(20 + (Lbp - 50) ** 2)
+    Sc = 1 + 0.045 * Cbp
+    Sh = 1 + 0.015 * Cbp * T
+    Rt = -np.sin(np.radians(2 * d_theta)) * Rc
+
+    return np.sqrt((dLp / Sl) ** 2 + (dCp / Sc) ** 2 + (dHp / Sh) ** 2
+                   + Rt * (dCp / Sc) * (dHp / Sh))
+
+
+def harmony_matrix(labs_a, labs_b=None):
+    """Pairwise harmony scores between two lists of Lab colors (see harmony)."""
+    labs_b = labs_a if labs_b is None else labs_b
+    if np is None:
+        return [[harmony(x, y) for y in labs_b] for x in labs_a]
+
+    A = np.asarray(labs_a, dtype=float).reshape(-1, 1, 3)
+    B = np.asarray(labs_b, dtype=float).reshape(1, -1, 3)
+    C1 = np.hypot(A[..., 1], A[..., 2])
+    C2 = np.hypot(B[..., 1], B[..., 2])
+    diff = np.abs(np.degrees(np.arctan2(A[..., 2], A[..., 1]) - np.arctan2(B[..., 2], B[..., 1]))) % 360
+    diff = np.where(diff > 180, 360 - diff, diff)
+
+    score = np.select([diff <= 30, diff >= 150, (diff >= 100) & (diff <= 140)], [0.9, 0.8, 0.7], 0.4)
+    return np.where(np.minimum(C1, C2) < NEUTRAL_CHROMA, 1.0, score)
+
+
+def item_color_matrices(items):
+    """Pairwise color relations between items.
+
+    Returns (ids, delta, harmony): delta[i][j] is the delta E between the primary
+    colors of items i and j (inf if either is unrecognized); harmony[i][j] is the
+    worst harmony between any color of item i (primary, secondary, accent) and any
+    color of item j, so one clashing accent counts. Items without recognizable
+    colors harmonize with everything.
+    """
+    ids = [item['id'] for item in items]
+    names = [item_colors(item) for item in items]
+    primaries = [lab(item_names[0]) if item_names else None for item_names in names]
+    groups = [[value for value in map(lab, item_names) if value is not None] for item_names in names]
+
+    # Flatten every color, remembering which item it belongs to
+    flat = [value for group in groups for value in group]
+    owners = [pos for pos, group in enumerate(groups) for _ in group]
+    known = [value if value is not None else (0.0, 0.0, 0.0) for value in primaries]
+
+    if np is not None:
+        n = len(items)
+        delta = delta_e_matrix(known) if n else np.zeros((0, 0))
+        missing = np.array([value is None for value in primaries], dtype=bool)
+        if n:
+            delta[missing, :] = np.inf
+            delta[:, missing] = np.inf
+
+        item_harmony = np.ones((n, n))
+        if flat:
+            pair = harmony_matrix(flat)
+            owner = np.asarray(owners)
+            starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+            rows = np.minimum.reduceat(pair, starts, axis=0)
+            block = np.minimum.reduceat(rows, starts, axis=1)
+            present = owner[starts]
+            item_harmony[np.ix_(present, present)] = block
+        return ids, delta, item_harmony
+
+    delta = [[(delta_e(a, b) if a is not None and b is not None else math.inf) for b in primaries]
+             for a in primaries]
+    item_harmony = [[min((harmony(x, y) for x in ga for y in gb), default=1.0) for gb in groups]
+                    for ga in groups]
+    return ids, delta, item_harmony
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Resolve clothing color names and compare them',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # How do these names resolve?
+  python scripts/color_engine.py "heathered gray" "gray blue" charcoal
+
+  # Delta E and harmony between two colors
+  python scripts/color_engine.py navy "dark blue" --compare
+        """
+    )
+
+    parser.add_argument('colors', nargs='+', help='Color names')
+    parser.add_argument('--compare', action='store_true', help='Compare the first two colors')
+
+    args = parser.parse_args()
+
+    if args.compare:
+        if len(args.colors) != 2:
+            parser.error('--compare takes exactly two colors')
+        lab1, lab2 = lab(args.colors[0]), lab(args.colors[1])
+        for name, value in zip(args.colors, (lab1, lab2)):
+            if value is None:
+                print(f"Error: Unrecognized color: {name}", file=sys.stderr)
+                sys.exit(1)
+        print(f"Delta E: {delta_e(lab1, lab2):.1f}")
+        print(f"Harmony: {harmony(lab1, lab2):.2f}")
+        return
+
+    for name in args.colors:
+        value = lab(name)
+        if value is None:
+            print(f"{name}: unrecognized")
+        else:
+            L, a, b = value
+            print(f"{name}: {to_hex(name)}  L={L:.1f} a={a:.1f} b={b:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Feedback Statistics
+Materialized per-item and per-pair aggregates over the feedback files.
+
+data/feedback/aggregates.json holds, for every item that appears in feedback,
+rating statistics (count, sum and sum of squares per rating), its wear-again
+rate and the performance labels from learning.itemPerformance; and for every
+pair of items worn together, their combined overall rating and wear-again rate.
+
+A manifest inside the store records each processed feedback file by name, size
+and modification time together with what it contributed. A refresh only reads
+new or changed files and subtracts the old contribution of changed or deleted
+ones, so it costs one directory scan plus the new feedback; lookups are then a
+dictionary access.
+
+Usage:
+    # Bring the aggregates up to date
+    python scripts/feedback_stats.py refresh
+
+    # How do items perform, and how do two items do together?
+    python scripts/feedback_stats.py item item_20251004_001 item_20251004_004
+    python scripts/feedback_stats.py pair item_20251004_001 item_20251004_003
+
+    # Best-rated items with at least 3 pieces of feedback
+    python scripts/feedback_stats.py top --by overall --min-feedback 3
+"""
+
+import argparse
+import fnmatch
+import json
+import math
+import os
+import sys
+from itertools import combinations
+
+import wardrobe_core
+import wardrobe_lock
+
+STORE_PATH = wardrobe_core.FEEDBACK_DIR / "aggregates.json"
+STORE_VERSION = 1
+
+RATING_FIELDS = ('overall', 'comfort', 'appropriateness', 'confidence', 'compliments')
+
+
+def empty_store():
+    return {'version': STORE_VERSION, 'manifest': {}, 'items': {}, 'pairs': {}}
+
+
+def load_store():
+    """Return the stored aggregates, or an empty store (safe to modify)."""
+    try:
+        store = wardrobe_core.load_json(STORE_PATH)
+        if store.get('version') == STORE_VERSION:
+            return store
+    except (OSError, ValueError):
+        pass
+    return empty_store()
+
+
+def save_store(store):
+    wardrobe_lock.write_json_atomic(STORE_PATH, store, compact=True)
+
+
+def pair_key(item_a, item_b):
+    """Return the store key for an (unordered) item pair."""
+    return '|'.join(sorted((item_a, item_b)))
+
+
+def contribution(feedback):
+    """Extract what one feedback document adds to the aggregates."""
+    ratings = feedback.get('ratings', {})
+    performance = feedback.get('learning', {}).get('itemPerformance', {})
+    wear_again = ratings.get('wouldWearAgain')
+    return {
+        'items': list(dict.fromkeys(feedback.get('actualOutfit', {}).get('itemsWorn', []))),
+        'ratings': {field: ratings[field] for field in RATING_FIELDS
+                    if isinstance(ratings.get(field), (int, float)) and not isinstance(ratings[field], bool)},
+        'wearAgain': wear_again if isinstance(wear_again, bool) else None,
+        'performance': {item_id: entry['performance'] for item_id, entry in performance.items()
+                        if isinstance(entry, dict) and entry.get('performance')},
+    }
+
+
+def _add_moments(moments, value, sign):
+    moments[0] += sign
+    moments[1] += sign * value
+    moments[2] += sign * value * value
+
+
+def _add_wear_again(counts, wear_again, sign):
+    if wear_again is not None:
+        counts[0] += sign * wear_again
+        counts[1] += sign
+
+
+def _new_item_stats():
+    return {'feedback': 0, 'ratings': {}, 'wearAgain': [0, 0], 'performance': {}}
+
+
+def apply(store, contrib, sign=1):
+    """Add (sign=1) or remove (sign=-1) one feedback contribution."""
+    items, pairs = store['items'], store['pairs']
+    ratings, wear_again = contrib['ratings'], contrib['wearAgain']
+
+    for item_id in contrib['items']:
+        stats = items.setdefault(item_id, _new_item_stats())
+        stats['feedback'] += sign
+        for field, value in ratings.items():
+            _add_moments(stats['ratings'].setdefault(field, [0, 0, 0]), value, sign)
+            if not stats['ratings'][field][0]:
+                del stats['ratings'][field]
+        _add_wear_again(stats['wearAgain'], wear_again, sign)
+
+    for item_id, label in contrib['performance'].items():
+        performance = items.setdefault(item_id, _new_item_stats())['performance']
+        performance[label] = performance.get(label, 0) + sign
+        if not performance[label]:
+            del performance[label]
+
+    for item_a, item_b in combinations(sorted(contrib['items']), 2):
+        stats = pairs.setdefault(pair_key(item_a, item_b), {'n': 0, 'overall': [0, 0, 0], 'wearAgain': [0, 0]})
+        stats['n'] += sign
+        if 'overall' in ratings:
+            _add_moments(stats['overall'], ratings['overall'], sign)
+        _add_wear_again(stats['wearAgain'], wear_again, sign)
+        if not stats['n']:
+            del pairs[pair_key(item_a, item_b)]
+
+    # Drop items no remaining feedback mentions
+    for item_id in set(contrib['items']) | set(contrib['performance']):
+        stats = items.get(item_id)
+        if stats is not None and not stats['feedback'] and not stats['performance']:
+            del items[item_id]
+
+
+def refresh(rebuild=False):
+    """Bring the store up to date with the feedback directory.
+
+    Returns (store, changes) where changes maps 'added', 'updated' and 'removed'
+    to lists of file names. Unreadable files are reported and retried once they
+    change.
+    """
+    store = empty_store() if rebuild else load_store()
+    manifest = store['manifest']
+
+    current = {}
+    if wardrobe_core.FEEDBACK_DIR.exists():
+        for entry in os.scandir(wardrobe_core.FEEDBACK_DIR):
+            if fnmatch.fnmatch(entry.name, 'feedback_*.json') and entry.is_file():
+                stat = entry.stat()
+                current[entry.name] = [stat.st_size, stat.st_mtime_ns]
+
+    changes = {
+        'added': sorted(name for name in current if name not in manifest),
+        'updated': sorted(name for name in current if name in manifest
+                          and manifest[name]['signature'] != current[name]),
+        'removed': sorted(name for name in manifest if name not in current),
+    }
+
+    for name in changes['removed'] + changes['updated']:
+        old = manifest.pop(name)
+        if old['contribution'] is not None:
+            apply(store, old['contribution'], -1)
+
+    for name in changes['added'] + changes['updated']:
+        try:
+            contrib = contribution(wardrobe_core.load_json(wardrobe_core.FEEDBACK_DIR / name))
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Warning: Skipping {name}: {e}", file=sys.stderr)
+            contrib = None
+        if contrib is not None:
+            apply(store, contrib)
+        manifest[name] = {'signature': current[name], 'contribution': contrib}
+
+    if rebuild or any(changes.values()):
+        STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        save_store(store)
+    return store, changes
+
+
+# ---------------------------------------------------------------------------
+# Lookups
+# ---------------------------------------------------------------------------
+
+def describe_moments(moments):
+    """Return {'count', 'mean', 'stddev'} for stored [n, sum, sumsq] moments."""
+    n, total, squares = moments
+    if not n:
+        return {'count': 0, 'mean': None, 'stddev': None}
+    mean = total / n
+    return {'count': n, 'mean': round(mean, 2), 'stddev': round(math.sqrt(max(squares / n - mean * mean, 0)), 2)}
+
+
+def wear_again_rate(counts):
+    yes, n = counts
+    return round(yes / n, 3) if n else None
+
+
+def item_stats(store, item_id):
+    """Return the aggregate statistics for one item, or None if it has no feedback."""
+    stats = store['items'].get(item_id)
+    if stats is None:
+        return None
+    return {
+        'id': item_id,
+        'feedback': stats['feedback'],
+        'ratings': {field: describe_moments(moments) for field, moments in stats['ratings'].items()},
+        'wearAgainRate': wear_again_rate(stats['wearAgain']),
+        'performance': dict(stats['performance']),
+    }
+
+
+def pair_stats(store, item_a, item_b):
+    """Return the co-worn statistics for two items, or None if never worn together."""
+    stats = store['pairs'].get(pair_key(item_a, item_b))
+    if stats is None:
+        return None
+    return {
+        'items': sorted((item_a, item_b)),
+        'wornTogether': stats['n'],
+        'overall': describe_moments(stats['overall']),
+        'wearAgainRate': wear_again_rate(stats['wearAgain']),
+    }
+
+
+def top_items(store, by='overall', limit=10, min_feedback=1):
+    """Return item stats ranked by a rating's mean (or by='wear-again')."""
+    ranked = []
+    for item_id, stats in store['items'].items():
+        if stats['feedback'] < min_feedback:
+            continue
+        if by == 'wear-again':
+            value = wear_again_rate(stats['wearAgain'])
+        else:
+            value = describe_moments(stats['ratings'].get(by, [0, 0, 0]))['mean']
+        if value is not None:
+            ranked.append((value, item_id))
+    ranked.sort(key=lambda pair: (-pair[0], pair[1]))
+    return [item_stats(store, item_id) for _, item_id in ranked[:limit]]
+
+
+def format_item(stats):
+    ratings = ', '.join(f"{field} {value['mean']:g}" for field, value in stats['ratings'].items())
+    line = f"{stats['id']}: {stats['feedback']} feedback"
+    if ratings:
+        line += f" | {ratings}"
+    if stats['wearAgainRate'] is not None:
+        line += f" | wear again {stats['wearAgainRate']:.0%}"
+    if stats['performance']:
+        line += ' | ' + ', '.join(f"{label} x{n}" for label, n in sorted(stats['performance'].items()))
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Query aggregated feedback statistics per item and item pair',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Process new or changed feedback files
+  python scripts/feedback_stats.py refresh
+
+  # Per-item statistics (as JSON)
+  python scripts/feedback_stats.py item item_20251004_001 --json
+
+  # How two items do when worn together
+  python scripts/feedback_stats.py pair item_20251004_001 item_20251004_003
+
+  # Items most often worn again
+  python scripts/feedback_stats.py top --by wear-again --limit 5
+        """
+    )
+
+    parser.add_argument('command', choices=['refresh', 'item', 'pair', 'top'], help='Action to perform')
+    parser.add_argument('ids', nargs='*', help='Item IDs (item: one or more, pair: two)')
+    parser.add_argument('--by', choices=list(RATING_FIELDS) + ['wear-again'], default='overall',
+                       help='Ranking for top (default: overall)')
+    parser.add_argument('--limit', type=int, default=10, help='Items listed by top (default: 10)')
+    parser.add_argument('--min-feedback', type=int, default=1,
+                       help='Minimum feedback count for top (default: 1)')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute the store from every file')
+    parser.add_argument('--no-refresh', action='store_true',
+                       help='Answer from the store as is, without checking for new feedback')
+    parser.add_argument('--json', action='store_true', help='Output JSON')
+
+    args = parser.parse_args()
+
+    if args.command == 'item' and not args.ids:
+        parser.error('item requires at least one item ID')
+    if args.command == 'pair' and len(args.ids) != 2:
+        parser.error('pair requires exactly two item IDs')
+    if args.command in ('refresh', 'top') and args.ids:
+        parser.error(f'{args.command} does not take item IDs')
+
+    if args.no_refresh and not args.rebuild:
+        store, changes = load_store(), None
+    else:
+        store, changes = refresh(rebuild=args.rebuild)
+
+    if args.command == 'refresh':
+        print(f"✓ Feedback aggregates: {len(changes['added'])} added, {len(changes['updated'])} updated, "
+              f"{len(changes['removed'])} removed ({len(store['manifest'])} files, "
+              f"{len(store['items'])} items, {len(store['pairs'])} pairs)")
+
+    elif args.command == 'item':
+        results = [item_stats(store, item_id) for item_id in args.ids]
+        if args.json:
+            print(json.dumps([r for r in results if r is not None], indent=2, ensure_ascii=False))
+        else:
+            for item_id, stats in zip(args.ids, results):
+                print(format_item(stats) if stats else f"{item_id}: no feedback")
+
+    elif args.command == 'pair':
+        stats = pair_stats(store, *args.ids)
+        if args.json:
+            print(json.dumps(stats, indent=2, ensure_ascii=False))
+        elif stats is None:
+            print(f"{args.ids[0]} and {args.ids[1]} have not been worn together")
+        else:
+            line = f"Worn together {stats['wornTogether']} time(s)"
+            if stats['overall']['count']:
+                line += f" | overall {stats['overall']['mean']:g}"
+            if stats['wearAgainRate'] is not None:
+                line += f" | wear again {stats['wearAgainRate']:.0%}"
+            print(line)
+
+    elif args.command == 'top':
+        results = top_items(store, args.by, args.limit, args.min_feedback)
+        if args.json:
+            print(json.dumps(results, indent=2, ensure_ascii=False))
+        elif not results:
+            print("No items with enough feedback")
+        else:
+            for stats in results:
+                print(format_item(stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,86 +6,93 @@ Converts recommendation JSON files to beautiful HTML visualizations.
 Usage:
     python scripts/generate_recommendation_html.py rec_20251005_001
     python scripts/generate_recommendation_html.py rec_20251005_001 --output custom_name.html
+
+    # Regenerate every recommendation (or those matching a glob) in parallel
+    python scripts/generate_recommendation_html.py --all
+    python scripts/generate_recommendation_html.py 'rec_202510*'
+
+    # Render October's fall recommendations into one lookbook page
+    python scripts/generate_recommendation_html.py --lookbook --since 2025-10-01 --until 2025-10-31 --season fall
 """
 
-import json
 import argparse
+import fnmatch
+import html
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
 from pathlib import Path
 
-# Set base path to project root
-BASE_PATH = Path(__file__).parent.parent
-RECOMMENDATIONS_DIR = BASE_PATH / "data" / "recommendations"
-TEMPLATE_PATH = BASE_PATH / "templates" / "recommendations" / "recommendation.html"
-WARDROBE_ITEMS = BASE_PATH / "data" / "wardrobe" / "wardrobe_items.json"
-
-
-# Color mapping for visualization
-COLOR_MAP = {
-    'light blue': '#87CEEB',
-    'dark grey': '#4A5568',
-    'dark gray': '#4A5568',
-    'tan': '#D2B48C',
-    'brown': '#8B4513',
-    'navy': '#001f3f',
-    'navy blue': '#001f3f',
-    'grey': '#718096',
-    'gray': '#718096',
-    'black': '#000000',
-    'white': '#FFFFFF',
-    'olive green': '#556B2F',
-    'olive': '#556B2F',
-    'beige': '#F5F5DC',
-    'burgundy': '#800020',
-    'red': '#DC143C',
-    'blue': '#4169E1',
-    'indigo': '#4B0082',
-    'light purple': '#D8BFD8',
-    'burnt orange': '#CC5500',
-    'yellow': '#FFD700',
-    'teal blue': '#008080',
-    'khaki': '#C3B091'
-}
+import color_engine
+import html_template
+import telemetry
+import thumbnails
+import wardrobe_core
+import wardrobe_daemon
+import wardrobe_db
+import wardrobe_lock
+
+RECOMMENDATIONS_DIR = wardrobe_core.RECOMMENDATIONS_DIR
+TEMPLATE_PATH = wardrobe_core.TEMPLATES_DIR / "recommendations" / "recommendation.html"
+WARDROBE_ITEMS = wardrobe_core.WARDROBE_ITEMS
 
 
 def load_recommendation(rec_id):
     """Load recommendation JSON file."""
-    rec_path = RECOMMENDATIONS_DIR / f"{rec_id}.json"
-    if not rec_path.exists():
-        print(f"Error: Recommendation file not found: {rec_path}", file=sys.stderr)
+    # Answer from the resident daemon when it is running
+    if not wardrobe_db.backend_enabled():
+        response = wardrobe_daemon.request('recommendation', id=rec_id)
+        if response is not None:
+            return response['recommendation']
+
+    rec = wardrobe_core.load_recommendation(rec_id)
+    if rec is None:
+        print(f"Error: Recommendation file not found: {wardrobe_core.recommendation_path(rec_id)}",
+              file=sys.stderr)
         sys.exit(1)
-
-    with open(rec_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return rec
 
 
 def load_template():
-    """Load HTML template."""
+    """Load the compiled HTML template."""
     if not TEMPLATE_PATH.exists():
         print(f"Error: Template file not found: {TEMPLATE_PATH}", file=sys.stderr)
         sys.exit(1)
 
-    with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
-        return f.read()
+    try:
+        template = html_template.CompiledTemplate.load(TEMPLATE_PATH)
+    except ValueError as e:
+        print(f"Error: Invalid template {TEMPLATE_PATH}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if 'outfit' not in template.regions:
+        print("Warning: Template has no <!-- region:outfit --> block; outfits will not be shown",
+              file=sys.stderr)
+    return template
 
 
 def get_image_paths():
     """Load image paths from wardrobe items."""
-    with open(WARDROBE_ITEMS, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Answer from the resident daemon when it is running
+    if not wardrobe_db.backend_enabled():
+        response = wardrobe_daemon.request('image_map')
+        if response is not None:
+            return response['image_map']
 
-    # Create mapping of item_id -> imagePath
-    image_map = {}
-    for item in data['items']:
-        image_map[item['id']] = item.get('imagePath', '')
+    return wardrobe_core.Wardrobe.load().image_map()
 
-    return image_map
 
+def esc(value):
+    """HTML-escape a value for use in text or a quoted attribute."""
+    return html.escape(str(value))
 
-def build_context_html(context):
-    """Build context bar HTML."""
+
+def iter_context_html(context):
+    """Yield the context bar HTML."""
     occasion = context.get('occasion', 'Occasion')
-    time = context.get('timeOfDay', 'day')
+    time_of_day = context.get('timeOfDay', 'day')
     temp = context.get('weather', {}).get('temperature', '?')
     unit = context.get('weather', {}).get('unit', 'F')
 
@@ -102,79 +109,100 @@ def build_context_html(context):
     else:
         icon = '📅'
 
-    context_html = f'''
+    yield f'''
 <div class="context-item">
     <span class="icon">{icon}</span>
-    <span class="label">{occasion.title()}</span>
+    <span class="label">{esc(occasion.title())}</span>
 </div>
 <div class="context-item">
     <span class="icon">🌡️</span>
-    <span class="label">{temp}°{unit[0].upper()}</span>
+    <span class="label">{esc(temp)}°{esc(unit[0].upper())}</span>
 </div>
 <div class="context-item">
     <span class="icon">🕐</span>
-    <span class="label">{time.title()}</span>
+    <span class="label">{esc(time_of_day.title())}</span>
 </div>
 '''
 
     # Add mood if present
     mood = context.get('mood')
     if mood:
-        context_html += f'''
+        yield f'''
 <div class="context-item">
     <span class="icon">😊</span>
-    <span class="label">{mood.title()}</span>
+    <span class="label">{esc(mood.title())}</span>
 </div>
 '''
 
-    return context_html
 
+def iter_color_palette(colors):
+    """Yield color swatch HTML for a list of color names."""
+    for color in colors:
+        color_code = color_engine.to_hex(color)
+        yield f'''
+        <div class="color-swatch">
+            <div class="color-circle" style="background-color: {color_code};"></div>
+            <div class="color-name">{esc(color.title())}</div>
+        </div>
+        '''
 
-def build_outfit_section(outfit, outfit_name, outfit_number, image_map):
-    """Build HTML for a single outfit option."""
-    items_html = ''
 
+def image_html(img_path, alt):
+    """Return the <img> (or <picture> with thumbnail srcsets) for an item image."""
+    rel_path = f"../../{img_path}"
+    thumbs = thumbnails.variants(img_path)
+    if not thumbs:
+        return f'<img src="{esc(rel_path)}" alt="{esc(alt)}">'
+
+    def srcset(entries):
+        return esc(', '.join(f"../../{path} {width}w" for path, width in entries))
+
+    sizes = thumbnails.SIZES
+    webp = thumbs.pop('image/webp', None)
+    fallback = next(iter(thumbs.values()), None)
+    sources = f'<source type="image/webp" srcset="{srcset(webp)}" sizes="{sizes}">' if webp else ''
+    if fallback:
+        img = (f'<img src="../../{esc(fallback[0][0])}" srcset="{srcset(fallback)}" sizes="{sizes}" '
+               f'alt="{esc(alt)}" loading="lazy">')
+    else:
+        img = f'<img src="{esc(rel_path)}" alt="{esc(alt)}" loading="lazy">'
+    return f'<picture>{sources}{img}</picture>'
+
+
+def iter_outfit_items(outfit, image_map):
+    """Yield an item card per outfit item."""
     for item in outfit['items']:
         img_path = image_map.get(item['id'], '')
-        rel_path = f"../../{img_path}" if img_path else ''
-
-        img_html = f'<img src="{rel_path}" alt="{item["name"]}">' if rel_path else '<span class="item-icon">👔</span>'
+        img_html = image_html(img_path, item['name']) if img_path else '<span class="item-icon">👔</span>'
 
-        items_html += f'''
+        yield f'''
         <div class="item-card">
-            <div class="item-badge">{item['role']}</div>
+            <div class="item-badge">{esc(item['role'])}</div>
             <div class="item-image">{img_html}</div>
-            <div class="item-name">{item['name']}</div>
-            <div class="item-meta">{item['category'].title()}</div>
-            <div class="item-reason">{item['reason']}</div>
+            <div class="item-name">{esc(item['name'])}</div>
+            <div class="item-meta">{esc(item['category'].title())}</div>
+            <div class="item-reason">{esc(item['reason'])}</div>
         </div>
         '''
 
-    # Build color palette
-    colors_html = ''
-    all_colors = outfit.get('dominantColors', []) + outfit.get('accentColors', [])
-    for color in all_colors:
-        color_code = COLOR_MAP.get(color.lower(), '#CCCCCC')
-        colors_html += f'''
-        <div class="color-swatch">
-            <div class="color-circle" style="background-color: {color_code};"></div>
-            <div class="color-name">{color.title()}</div>
-        </div>
-        '''
 
+def iter_outfit_section(outfit, outfit_name, outfit_number, image_map):
+    """Yield the HTML for a single outfit option."""
     # Icon for each option
     icons = ['🌟', '✨', '💫']
     icon = icons[outfit_number - 1] if outfit_number <= 3 else '👔'
 
-    outfit_section = f'''
+    yield f'''
     <div class="section" style="margin-bottom: 60px; padding-bottom: 40px; border-bottom: 2px solid #e2e8f0;">
-        <h2 class="section-title" style="color: #667eea;">{icon} Option {outfit_number}: {outfit_name}</h2>
+        <h2 class="section-title" style="color: #667eea;">{icon} Option {outfit_number}: {esc(outfit_name)}</h2>
         <div class="outfit-grid">
-            {items_html}
+            '''
+    yield from iter_outfit_items(outfit, image_map)
+    yield f'''
         </div>
         <div class="stats-bar">
             <div class="stat">
-                <div class="stat-value">{outfit.get('totalFormality', 'N/A')}</div>
+                <div class="stat-value">{esc(outfit.get('totalFormality', 'N/A'))}</div>
                 <div class="stat-label">Formality</div>
             </div>
             <div class="stat">
@@ -184,18 +212,16 @@ def build_outfit_section(outfit, outfit_name, outfit_number, image_map):
         </div>
         <div style="margin-top: 20px;">
             <h3 style="color: #2d3748; margin-bottom: 10px;">Color Palette</h3>
-            <div class="color-palette">{colors_html}</div>
+            <div class="color-palette">'''
+    yield from iter_color_palette(outfit.get('dominantColors', []) + outfit.get('accentColors', []))
+    yield '''</div>
         </div>
     </div>
     '''
 
-    return outfit_section
-
-
-def build_all_outfits_html(rec, image_map):
-    """Build HTML for all outfit options in the recommendation."""
-    all_outfits_html = ''
 
+def iter_all_outfits_html(rec, image_map):
+    """Yield the HTML for all outfit options in the recommendation."""
     # Check if recommendation has multiple outfits or single outfit
     outfit = rec.get('outfit', {})
 
@@ -209,50 +235,58 @@ def build_all_outfits_html(rec, image_map):
 
         for outfit_data, name, number in outfits:
             if outfit_data and outfit_data.get('items'):
-                all_outfits_html += build_outfit_section(outfit_data, name, number, image_map)
+                yield from iter_outfit_section(outfit_data, name, number, image_map)
 
     elif 'items' in outfit:
         # Single outfit format
-        all_outfits_html = build_outfit_section(outfit, 'The Outfit', 1, image_map)
+        yield from iter_outfit_section(outfit, 'The Outfit', 1, image_map)
 
-    return all_outfits_html
 
+def iter_style_notes_html(reasoning):
+    """Yield the style notes list items."""
+    for note in reasoning.get('styleNotes', []):
+        yield f'<li>{esc(note)}</li>\n'
 
-def build_style_notes_html(reasoning):
-    """Build style notes list."""
-    style_notes = reasoning.get('styleNotes', [])
-    notes_html = ''
 
-    for note in style_notes:
-        notes_html += f'<li>{note}</li>\n'
+def iter_alternatives_html(alternatives):
+    """Yield the alternatives section."""
+    for alt in alternatives.get('variations', []):
+        yield f'''
+    <div class="alt-card">
+        <h4>{esc(alt.get('type', 'Alternative').title())}</h4>
+        <p><strong>{esc(alt.get('description', ''))}</strong></p>
+        <p>{esc(alt.get('reason', ''))}</p>
+    </div>
+    '''
 
-    return notes_html
 
+def build_context_html(context):
+    """Build context bar HTML."""
+    return ''.join(iter_context_html(context))
 
-def build_alternatives_html(alternatives):
-    """Build alternatives section."""
-    variations = alternatives.get('variations', [])
-    alts_html = ''
 
-    for alt in variations:
-        alts_html += f'''
-    <div class="alt-card">
-        <h4>{alt.get('type', 'Alternative').title()}</h4>
-        <p><strong>{alt.get('description', '')}</strong></p>
-        <p>{alt.get('reason', '')}</p>
-    </div>
-    '''
+def build_outfit_section(outfit, outfit_name, outfit_number, image_map):
+    """Build HTML for a single outfit option."""
+    return ''.join(iter_outfit_section(outfit, outfit_name, outfit_number, image_map))
 
-    return alts_html
 
+def build_all_outfits_html(rec, image_map):
+    """Build HTML for all outfit options in the recommendation."""
+    return ''.join(iter_all_outfits_html(rec, image_map))
+
+
+def build_style_notes_html(reasoning):
+    """Build style notes list."""
+    return ''.join(iter_style_notes_html(reasoning))
+
+
+def build_alternatives_html(alternatives):
+    """Build alternatives section."""
+    return ''.join(iter_alternatives_html(alternatives))
 
-def generate_html(rec_id, output_path=None):
-    """Generate HTML from recommendation JSON."""
-    # Load data
-    rec = load_recommendation(rec_id)
-    template = load_template()
-    image_map = get_image_paths()
 
+def render_html(rec, rec_id, template, image_map):
+    """Render a recommendation document to an HTML string."""
     # Build sections
     context = rec.get('context', {})
     occasion = context.get('occasion', 'Outfit Recommendation')
@@ -263,71 +297,257 @@ def generate_html(rec_id, output_path=None):
     style_notes_html = build_style_notes_html(reasoning)
     alternatives_html = build_alternatives_html(rec.get('alternatives', {}))
 
-    # Replace placeholders
-    html = template
-    html = html.replace('{{HEADER_ICON}}', '👔')
-    html = html.replace('{{OCCASION_TITLE}}', occasion.title())
-    html = html.replace('{{RECOMMENDATION_ID}}', rec.get('id', rec_id))
-    html = html.replace('{{CONTEXT_ITEMS}}', context_html)
-
-    # Replace entire outfit section
-    outfit_section_template = '''<div class="section">
-                <h2 class="section-title">👔 The Outfit</h2>
-                <div class="outfit-grid">
-                    {{OUTFIT_ITEMS}}
-                </div>
-
-                <div class="stats-bar">
-                    <div class="stat">
-                        <div class="stat-value">{{FORMALITY_LEVEL}}</div>
-                        <div class="stat-label">Formality Level</div>
-                    </div>
-                    <div class="stat">
-                        <div class="stat-value">{{CONFIDENCE_SCORE}}%</div>
-                        <div class="stat-label">Confidence Score</div>
-                    </div>
-                    <div class="stat">
-                        <div class="stat-value">{{ITEMS_COUNT}}</div>
-                        <div class="stat-label">Items Used</div>
-                    </div>
-                </div>
-            </div>'''
-
-    html = html.replace(outfit_section_template, outfits_html)
-
-    # Remove color section (integrated into each outfit)
-    color_section = '''<div class="section">
-                <h2 class="section-title">🎨 Color Palette</h2>
-                <div class="reasoning-box">
-                    <div class="color-palette">
-                        {{COLOR_SWATCHES}}
-                    </div>
-                    <p style="margin-top: 20px;"><strong>Color Strategy:</strong> {{COLOR_STRATEGY}}</p>
-                </div>
-            </div>'''
-    html = html.replace(color_section, '')
-
-    # Replace reasoning sections
-    html = html.replace('{{OVERALL_REASONING}}', reasoning.get('overall', ''))
-    html = html.replace('{{FORMALITY_REASONING}}', reasoning.get('formalityMatch', ''))
-    html = html.replace('{{WEATHER_REASONING}}', reasoning.get('weatherAppropriateness', ''))
-    html = html.replace('{{OCCASION_REASONING}}', reasoning.get('occasionFit', ''))
-    html = html.replace('{{STYLE_NOTES}}', style_notes_html)
-    html = html.replace('{{ALTERNATIVES}}', alternatives_html)
-
-    # Write output
+    # Fill slots; outfits replace the single-outfit block and the standalone
+    # color section is dropped (palettes are shown per outfit)
+    page = template.render(
+        {
+            'HEADER_ICON': '👔',
+            'OCCASION_TITLE': esc(occasion.title()),
+            'RECOMMENDATION_ID': esc(rec.get('id', rec_id)),
+            'CONTEXT_ITEMS': context_html,
+            'OVERALL_REASONING': esc(reasoning.get('overall', '')),
+            'FORMALITY_REASONING': esc(reasoning.get('formalityMatch', '')),
+            'WEATHER_REASONING': esc(reasoning.get('weatherAppropriateness', '')),
+            'OCCASION_REASONING': esc(reasoning.get('occasionFit', '')),
+            'STYLE_NOTES': style_notes_html,
+            'ALTERNATIVES': alternatives_html,
+        },
+        regions={'outfit': outfits_html, 'color-palette': None},
+    )
+
+    return page
+
+
+def write_html(page, rec_id, output_path=None):
+    """Write rendered HTML and return the output path."""
     if output_path:
         output_file = Path(output_path)
     else:
         output_file = RECOMMENDATIONS_DIR / f"{rec_id}.html"
 
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+        f.write(page)
+    return output_file
+
+
+def generate_html(rec_id, output_path=None):
+    """Generate HTML from recommendation JSON."""
+    # Load data
+    with telemetry.phase('load'):
+        rec = load_recommendation(rec_id)
+        template = load_template()
+        image_map = get_image_paths()
+
+    with telemetry.phase('render'):
+        page = render_html(rec, rec_id, template, image_map)
+    with telemetry.phase('write'):
+        output_file = write_html(page, rec_id, output_path)
+    telemetry.count('pages', 1)
 
     print(f"HTML generated: {output_file}")
     return output_file
 
 
+# ---------------------------------------------------------------------------
+# Batch rendering
+# ---------------------------------------------------------------------------
+
+# Shared inputs, set once per worker process by _init_worker
+_batch_state = {}
+
+
+def _init_worker(template, image_map):
+    _batch_state['template'] = template
+    _batch_state['image_map'] = image_map
+
+
+def _render_one(rec_id):
+    """Render and write one recommendation. Returns (rec_id, output_path, error)."""
+    try:
+        rec = wardrobe_core.load_recommendation(rec_id)
+        if rec is None:
+            return rec_id, None, f"Recommendation file not found: {wardrobe_core.recommendation_path(rec_id)}"
+        page = render_html(rec, rec_id, _batch_state['template'], _batch_state['image_map'])
+        return rec_id, str(write_html(page, rec_id)), None
+    except Exception as e:  # one bad document should not abort the whole batch
+        return rec_id, None, f"{type(e).__name__}: {e}"
+
+
+def resolve_recommendation_ids(patterns, include_all=False):
+    """Expand recommendation ID globs (or --all) into a list of IDs."""
+    if include_all:
+        return wardrobe_core.recommendation_ids()
+
+    available = None
+    rec_ids = []
+    for pattern in patterns:
+        if any(ch in pattern for ch in '*?['):
+            if available is None:
+                available = wardrobe_core.recommendation_ids()
+            rec_ids.extend(fnmatch.filter(available, pattern))
+        else:
+            rec_ids.append(pattern)
+    return list(dict.fromkeys(rec_ids))
+
+
+def generate_batch(rec_ids, workers=None):
+    """Render many recommendations across a process pool.
+
+    The template and image map are loaded once and handed to each worker when it
+    starts; every worker then reads, renders and writes its recommendations
+    independently. Returns the number of failures.
+    """
+    with telemetry.phase('load'):
+        template = load_template()
+        image_map = get_image_paths()
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(rec_ids)))
+
+    start = time.perf_counter()
+    # Workers are separate processes, so their CPU time and I/O are not counted here
+    with telemetry.phase('render'):
+        if workers == 1:
+            _init_worker(template, image_map)
+            results = [_render_one(rec_id) for rec_id in rec_ids]
+        else:
+            chunksize = max(1, len(rec_ids) // (workers * 8))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(template, image_map)) as pool:
+                results = list(pool.map(_render_one, rec_ids, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for rec_id, output_file, error in results:
+        if error:
+            failed += 1
+            print(f"Error: {rec_id}: {error}", file=sys.stderr)
+
+    rendered = len(results) - failed
+    telemetry.count('pages', rendered)
+    rate = rendered / elapsed if elapsed > 0 else 0.0
+    print(f"Rendered {rendered} of {len(results)} page(s) in {elapsed:.2f}s "
+          f"({rate:.1f} pages/sec, {workers} worker(s))")
+    return failed
+
+
+# ---------------------------------------------------------------------------
+# Lookbook
+# ---------------------------------------------------------------------------
+
+def iter_lookbook_recommendations(rec_ids, since=None, until=None, occasion=None, season=None):
+    """Yield the recommendations matching the filters, loading one at a time."""
+    occasion = occasion.lower() if occasion else None
+    season = season.lower() if season else None
+
+    for rec_id in rec_ids:
+        rec = wardrobe_core.load_recommendation(rec_id, cached=False)
+        if rec is None:
+            print(f"Warning: Recommendation not found: {rec_id}", file=sys.stderr)
+            continue
+
+        day = rec.get('timestamp', '')[:10]
+        context = rec.get('context', {})
+        if since and day < since:
+            continue
+        if until and day > until:
+            continue
+        if occasion and occasion not in context.get('occasion', '').lower():
+            continue
+        if season and context.get('season', '').lower() != season:
+            continue
+        yield rec
+
+
+def iter_lookbook_entry(rec, image_map):
+    """Yield the lookbook section for one recommendation."""
+    context = rec.get('context', {})
+    occasion = context.get('occasion', 'Outfit Recommendation')
+    day = rec.get('timestamp', '')[:10]
+
+    yield f'''
+            <div class="section">
+                <h2 class="section-title">📅 {esc(day)} · {esc(occasion.title())}</h2>
+                <p style="font-family: monospace; color: #718096; margin-bottom: 10px;">{esc(rec.get('id', ''))}</p>
+                <div class="context-bar">'''
+    yield from iter_context_html(context)
+    yield '''</div>
+'''
+    yield from iter_all_outfits_html(rec, image_map)
+
+    overall = rec.get('reasoning', {}).get('overall')
+    if overall:
+        yield f'''
+                <div class="reasoning-box"><p>{esc(overall)}</p></div>'''
+    yield '''
+            </div>
+'''
+
+
+def iter_lookbook_filters(since=None, until=None, occasion=None, season=None):
+    """Yield header context items describing the lookbook filters."""
+    labels = []
+    if since or until:
+        labels.append(('📅', f"{since or '…'} – {until or '…'}"))
+    if season:
+        labels.append(('🍂', season.title()))
+    if occasion:
+        labels.append(('🎯', occasion.title()))
+    if not labels:
+        labels.append(('📚', 'All Recommendations'))
+
+    for icon, label in labels:
+        yield f'''
+<div class="context-item">
+    <span class="icon">{icon}</span>
+    <span class="label">{esc(label)}</span>
+</div>
+'''
+
+
+def generate_lookbook(rec_ids, output_path, since=None, until=None, occasion=None, season=None):
+    """Stream the matching recommendations into a single lookbook page.
+
+    Recommendations are loaded, rendered and written one at a time, so memory use
+    does not grow with the number of outfits. Returns the number included.
+    """
+    template = load_template()
+    image_map = get_image_paths()
+    output_file = Path(output_path)
+    included = 0
+
+    def entries():
+        nonlocal included
+        for rec in iter_lookbook_recommendations(rec_ids, since, until, occasion, season):
+            included += 1
+            yield from iter_lookbook_entry(rec, image_map)
+
+    chunks = template.iter_render(
+        {
+            'HEADER_ICON': '📖',
+            'OCCASION_TITLE': 'Lookbook',
+            'RECOMMENDATION_ID': esc(date.today().isoformat()),
+            'CONTEXT_ITEMS': iter_lookbook_filters(since, until, occasion, season),
+        },
+        regions={'outfit': entries(), 'color-palette': None, 'reasoning': None, 'alternatives': None},
+    )
+
+    # Stream into a temp file so a failed (or empty) run never replaces the page
+    with wardrobe_lock.atomic_file(output_file, 'w', encoding='utf-8') as f:
+        f.writelines(chunks)
+        if not included:
+            raise wardrobe_lock.Discard()
+
+    return included
+
+
+def valid_date(value):
+    """argparse type for YYYY-MM-DD dates."""
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}' (expected YYYY-MM-DD)")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Generate HTML visualization from recommendation JSON',
@@ -339,15 +559,76 @@ Examples:
 
   # Generate with custom output path
   python scripts/generate_recommendation_html.py rec_20251005_001 --output my_outfit.html
+
+  # Regenerate every recommendation using all CPU cores
+  python scripts/generate_recommendation_html.py --all
+
+  # Regenerate October's recommendations with 4 workers
+  python scripts/generate_recommendation_html.py 'rec_202510*' --workers 4
+
+  # One lookbook page of every business recommendation since October
+  python scripts/generate_recommendation_html.py --lookbook --since 2025-10-01 --occasion business
         """
     )
 
-    parser.add_argument('recommendation_id', help='Recommendation ID (e.g., rec_20251005_001)')
+    parser.add_argument('recommendation_id', nargs='*',
+                       help='Recommendation ID(s) or glob(s) (e.g., rec_20251005_001, "rec_202510*")')
+    parser.add_argument('--all', action='store_true', help='Render every recommendation')
     parser.add_argument('--output', '-o', help='Custom output path (default: data/recommendations/{id}.html)')
+    parser.add_argument('--workers', '-j', type=int,
+                       help='Worker processes for batch rendering (default: CPU count)')
+
+    # Lookbook
+    parser.add_argument('--lookbook', nargs='?', const=str(RECOMMENDATIONS_DIR / 'lookbook.html'), metavar='PATH',
+                       help='Render the selected recommendations into one page '
+                            '(default: data/recommendations/lookbook.html)')
+    parser.add_argument('--since', type=valid_date, metavar='DATE', help='Lookbook: only recommendations on/after DATE')
+    parser.add_argument('--until', type=valid_date, metavar='DATE', help='Lookbook: only recommendations on/before DATE')
+    parser.add_argument('--occasion', help='Lookbook: only occasions containing this text')
+    parser.add_argument('--season', help='Lookbook: only recommendations for this season')
+    parser.add_argument('--timings', action='store_true',
+                       help='Log per-phase timings to data/telemetry.jsonl and print them to stderr')
 
     args = parser.parse_args()
+    telemetry.enable('generate_recommendation_html', args, parser)
+
+    lookbook_filters = {'since': args.since, 'until': args.until, 'occasion': args.occasion, 'season': args.season}
+
+    if args.lookbook:
+        if args.output:
+            parser.error('use --lookbook PATH instead of --output')
+        rec_ids = resolve_recommendation_ids(args.recommendation_id, args.all or not args.recommendation_id)
+        with telemetry.phase('lookbook'):
+            included = generate_lookbook(rec_ids, args.lookbook, **lookbook_filters)
+        telemetry.count('recommendations', included)
+        if not included:
+            print("No matching recommendations found", file=sys.stderr)
+            sys.exit(1)
+        print(f"Lookbook generated: {args.lookbook} ({included} recommendation(s))")
+        return
+
+    if any(lookbook_filters.values()):
+        parser.error('--since, --until, --occasion and --season require --lookbook')
+
+    if not args.recommendation_id and not args.all:
+        parser.error('a recommendation ID, a glob, or --all is required')
+
+    single = (not args.all and len(args.recommendation_id) == 1
+              and not any(ch in args.recommendation_id[0] for ch in '*?['))
+    if single:
+        generate_html(args.recommendation_id[0], args.output)
+        return
+
+    if args.output:
+        parser.error('--output can only be used with a single recommendation ID')
+
+    rec_ids = resolve_recommendation_ids(args.recommendation_id, args.all)
+    if not rec_ids:
+        print("No matching recommendations found", file=sys.stderr)
+        sys.exit(1)
 
-    generate_html(args.recommendation_id, args.output)
+    failed = generate_batch(rec_ids, args.workers)
+    sys.exit(1 if failed else 0)
 
 
 if __name__ == '__main__':
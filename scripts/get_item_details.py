@@ -12,38 +12,40 @@ Usage:
 import json
 import argparse
 import sys
-from pathlib import Path
 
-# Set base path to project root
-BASE_PATH = Path(__file__).parent.parent
-WARDROBE_ITEMS = BASE_PATH / "data" / "wardrobe" / "wardrobe_items.json"
+import telemetry
+import wardrobe_core
+import wardrobe_daemon
+import wardrobe_db
+import wear_log
+
+WARDROBE_ITEMS = wardrobe_core.WARDROBE_ITEMS
 
 
 def load_wardrobe():
     """Load full wardrobe items."""
-    with open(WARDROBE_ITEMS, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return {'items': wardrobe_core.Wardrobe.load().items()}
 
 
 def get_items_by_ids(item_ids):
-    """Retrieve items by their IDs."""
-    data = load_wardrobe()
-    items = data['items']
+    """Retrieve items by their IDs.
 
-    # Create lookup for fast access
-    item_map = {item['id']: item for item in items}
+    Returns (found_items, not_found_ids) in the requested order.
+    """
+    # Answer from the resident daemon when it is running
+    if not wardrobe_db.backend_enabled():
+        response = wardrobe_daemon.request('details', ids=item_ids)
+        if response is not None:
+            return response['items'], response['not_found']
 
-    # Get requested items
-    found_items = []
-    not_found = []
+    return wardrobe_core.Wardrobe.load().get_many(item_ids)
 
-    for item_id in item_ids:
-        if item_id in item_map:
-            found_items.append(item_map[item_id])
-        else:
-            not_found.append(item_id)
 
-    return found_items, not_found
+def add_wear_history(item):
+    """Return a copy of item with tracking.wearHistory filled from the wear log."""
+    events = [{'date': wear_date, 'outfitId': outfit_id}
+              for wear_date, outfit_id in wear_log.history(item['id'])]
+    return dict(item, tracking=dict(item.get('tracking', {}), wearHistory=events))
 
 
 def format_json(items):
@@ -99,6 +101,12 @@ def format_summary(items):
         last_worn = tracking.get('lastWorn')
         if last_worn:
             print(f"Last Worn: {last_worn}")
+        wear_history = tracking.get('wearHistory')
+        if wear_history:
+            print(f"Wear History:")
+            for event in wear_history:
+                outfit = f" ({event['outfitId']})" if event.get('outfitId') else ''
+                print(f"  - {event['date']}{outfit}")
 
         # Image
         img_path = item.get('imagePath')
@@ -149,17 +157,27 @@ Examples:
 
   # Get compact format
   python scripts/get_item_details.py item_20251004_001 item_20251004_002 --format compact
+
+  # Include every logged wear date
+  python scripts/get_item_details.py item_20251004_001 --format summary --history
         """
     )
 
     parser.add_argument('item_ids', nargs='+', help='Item ID(s) to retrieve')
     parser.add_argument('--format', choices=['json', 'summary', 'compact'], default='json',
                        help='Output format (default: json)')
+    parser.add_argument('--history', action='store_true',
+                       help='Include full wear history (tracking.wearHistory) from the wear log')
+    parser.add_argument('--timings', action='store_true',
+                       help='Log per-phase timings to data/telemetry.jsonl and print them to stderr')
 
     args = parser.parse_args()
+    telemetry.enable('get_item_details', args, parser)
 
     # Get items
-    found_items, not_found = get_items_by_ids(args.item_ids)
+    with telemetry.phase('load'):
+        found_items, not_found = get_items_by_ids(args.item_ids)
+    telemetry.count('found', len(found_items))
 
     # Warn about not found items
     if not_found:
@@ -173,12 +191,17 @@ Examples:
         print("No items found.", file=sys.stderr)
         sys.exit(1)
 
-    if args.format == 'json':
-        format_json(found_items)
-    elif args.format == 'summary':
-        format_summary(found_items)
-    elif args.format == 'compact':
-        format_compact(found_items)
+    if args.history:
+        with telemetry.phase('history'):
+            found_items = [add_wear_history(item) for item in found_items]
+
+    with telemetry.phase('output'):
+        if args.format == 'json':
+            format_json(found_items)
+        elif args.format == 'summary':
+            format_summary(found_items)
+        elif args.format == 'compact':
+            format_compact(found_items)
 
 
 if __name__ == '__main__':
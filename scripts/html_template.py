@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+HTML Template Compiler
+Parses an HTML template once into named slots and removable regions.
+
+Templates use two kinds of markers:
+
+    {{NAME}}                      a slot, filled with a string at render time
+    <!-- region:name -->          start of a region that can be kept (rendering
+    ...                           its slots), replaced with other content, or
+    <!-- endregion:name -->       dropped; marker lines never reach the output
+
+A compiled template is a flat list of parts, so rendering is one pass that
+collects the output chunks and joins them once (or streams them to a file),
+instead of a str.replace pass over the whole document per placeholder. Compiled
+templates are cached next to the template as <name>.compiled.pickle, keyed by a
+hash of the template text.
+
+Usage:
+    # Show the slots and regions of a template
+    python scripts/html_template.py templates/recommendations/recommendation.html
+"""
+
+import hashlib
+import pickle
+import re
+import sys
+from pathlib import Path
+
+import wardrobe_lock
+
+CACHE_VERSION = 1
+
+TOKEN = re.compile(
+    r'^[ \t]*<!--\s*(?P<kind>region|endregion):(?P<region>[\w-]+)\s*-->[ \t]*\n?'
+    r'|\{\{(?P<slot>[A-Z0-9_]+)\}\}',
+    re.MULTILINE,
+)
+
+# Part opcodes
+TEXT, SLOT, REGION, END = 0, 1, 2, 3
+
+
+def compile_template(text):
+    """Parse template text into a flat list of (opcode, value, skip) parts.
+
+    For REGION parts, skip is the index of the matching END part.
+    """
+    parts = []
+    open_regions = []
+    pos = 0
+
+    for match in TOKEN.finditer(text):
+        if match.start() > pos:
+            parts.append((TEXT, text[pos:match.start()], 0))
+        pos = match.end()
+
+        if match.group('slot'):
+            parts.append((SLOT, match.group('slot'), 0))
+        elif match.group('kind') == 'region':
+            open_regions.append((match.group('region'), len(parts)))
+            parts.append(None)  # patched once the end marker is found
+        else:
+            name = match.group('region')
+            if not open_regions or open_regions[-1][0] != name:
+                raise ValueError(f"Unexpected endregion:{name} at offset {match.start()}")
+            _, start = open_regions.pop()
+            parts[start] = (REGION, name, len(parts))
+            parts.append((END, name, 0))
+
+    if open_regions:
+        raise ValueError(f"Unclosed region: {open_regions[-1][0]}")
+    if pos < len(text):
+        parts.append((TEXT, text[pos:], 0))
+    return parts
+
+
+class CompiledTemplate:
+    """A parsed template that renders in a single pass."""
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.slots = {value for op, value, _ in parts if op == SLOT}
+        self.regions = {value for op, value, _ in parts if op == REGION}
+
+    @classmethod
+    def from_text(cls, text):
+        return cls(compile_template(text))
+
+    @classmethod
+    def load(cls, template_path):
+        """Load a template, reusing its on-disk compiled form while the text is unchanged."""
+        template_path = Path(template_path)
+        with open(template_path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        cache_file = cache_path(template_path)
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('version') == CACHE_VERSION and cached.get('sha256') == digest:
+                return cls(cached['parts'])
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+            pass
+
+        parts = compile_template(raw.decode('utf-8'))
+        _save_cache(cache_file, {'version': CACHE_VERSION, 'sha256': digest, 'parts': parts})
+        return cls(parts)
+
+    def render(self, slots, regions=None):
+        """Render the template to a string (see iter_render for arguments)."""
+        return ''.join(self.iter_render(slots, regions))
+
+    def iter_render(self, slots, regions=None):
+        """Yield the rendered template in chunks.
+
+        slots maps slot names to strings; slots without a value are left as
+        {{NAME}}. regions maps region names to replacement strings, or to None to
+        drop the region; regions not listed are kept and rendered in place. Slot
+        and region values may also be iterables of strings (e.g. generators), which
+        are streamed through without being joined first.
+        """
+        regions = regions or {}
+        parts = self.parts
+        i = 0
+        while i < len(parts):
+            op, value, skip = parts[i]
+            if op == TEXT:
+                yield value
+            elif op == SLOT:
+                yield from _chunks(slots.get(value, '{{' + value + '}}'))
+            elif op == REGION and value in regions:
+                if regions[value] is not None:
+                    yield from _chunks(regions[value])
+                i = skip  # jump to the matching END
+            i += 1
+
+
+def _chunks(value):
+    if isinstance(value, str):
+        return (value,)
+    return value
+
+
+def cache_path(template_path):
+    """Return the compiled-cache path for a template."""
+    template_path = Path(template_path)
+    return template_path.with_name(template_path.stem + '.compiled.pickle')
+
+
+def _save_cache(cache_file, payload):
+    # Best effort: a read-only templates directory just means compiling each time
+    try:
+        with wardrobe_lock.atomic_file(cache_file) as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python scripts/html_template.py TEMPLATE", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        template = CompiledTemplate.load(sys.argv[1])
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Slots:   {', '.join(sorted(template.slots)) or '(none)'}")
+    print(f"Regions: {', '.join(sorted(template.regions)) or '(none)'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Index Fields
+The canonical projection of a full item record onto its wardrobe_index.json entry.
+
+Kept free of project imports, like wardrobe_paths, so the storage modules
+(wardrobe_db, ...) can build index entries without importing wardrobe_core,
+which imports them. wardrobe_core re-exports everything here.
+"""
+
+# Bump whenever index_entry() changes shape, so stored hashes are recomputed
+INDEX_VERSION = 3
+
+
+def index_entry(item):
+    """Project a full item record onto the lightweight index fields.
+
+    This is the single definition of what wardrobe_index.json holds per item.
+    """
+    metadata = item.get('metadata', {})
+    colors = metadata.get('colors', {})
+    context = item.get('context', {})
+    tracking = item.get('tracking', {})
+
+    return {
+        'id': item['id'],
+        'name': item['name'],
+        'type': item['type'],
+        'category': item['category'],
+        'primaryColor': colors.get('primary', ''),
+        'formality': metadata.get('formality', 0),
+        'seasons': context.get('seasons', []),
+        'tempRange': temp_range_f(item),
+        'tags': item.get('tags', []),
+        'wearCount': tracking.get('wearCount', 0),
+        'lastWorn': tracking.get('lastWorn')
+    }
+
+
+def to_fahrenheit(value, unit='fahrenheit'):
+    """Convert a temperature to Fahrenheit ('celsius'/'c' or 'fahrenheit'/'f')."""
+    if value is None:
+        return None
+    if (unit or 'f').lower().startswith('c'):
+        return value * 9 / 5 + 32
+    return value
+
+
+def temp_range_f(item):
+    """Return an item's tempRange as {'min', 'max'} in Fahrenheit, or None."""
+    temp_range = item.get('context', {}).get('weather', {}).get('tempRange') or {}
+    if temp_range.get('min') is None or temp_range.get('max') is None:
+        return None
+    unit = temp_range.get('unit', 'fahrenheit')
+    return {key: round(to_fahrenheit(temp_range[key], unit), 1) for key in ('min', 'max')}
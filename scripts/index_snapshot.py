@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Index Snapshot
+Columnar binary copy of wardrobe_index.json that loads via mmap.
+
+wardrobe_index.json repeats the same type, category, color, season and tag strings
+for every item, and parsing it creates every entry up front. The snapshot stores
+each index field as a column instead: repetitive strings and string lists are
+dictionary-encoded (the distinct values once, then one integer code per item),
+numbers live in `array` buffers (with a per-row flag where ints and floats share
+a column, so each value keeps its JSON type), and unique strings such as IDs and
+names are one UTF-8 blob with fixed-width offsets. Opening the snapshot maps the file and reads
+a small JSON header; an entry dict is only built when its row is first accessed.
+
+The snapshot is written next to the index as wardrobe_index.snapshot whenever the
+query engine is rebuilt, and records the size and modification time of the JSON it
+was built from, so it is regenerated whenever the JSON changes. wardrobe_index.json
+remains the source of truth and the format every script edits and exports.
+
+Usage:
+    # Rebuild the snapshot from wardrobe_index.json and show its layout
+    python scripts/index_snapshot.py
+
+    # Check that every snapshot row matches the JSON entry
+    python scripts/index_snapshot.py --verify
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+
+import wardrobe_lock
+import wardrobe_paths
+
+WARDROBE_INDEX = wardrobe_paths.WARDROBE_INDEX
+
+MAGIC = b'WSNP'
+SNAPSHOT_VERSION = 2
+PREAMBLE = struct.Struct('<4sII')  # magic, version, header length
+ALIGN = 8
+
+
+def snapshot_path(index_path):
+    """Return the snapshot path for an index file."""
+    index_path = Path(index_path)
+    return index_path.with_name(index_path.stem + '.snapshot')
+
+
+# -- writing ------------------------------------------------------------------
+
+class _Buffers:
+    """Collects aligned column buffers and returns their [offset, length]."""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def add(self, data):
+        raw = data.tobytes() if isinstance(data, array) else bytes(data)
+        pad = -self.size % ALIGN
+        if pad:
+            self.chunks.append(b'\0' * pad)
+            self.size += pad
+        span = [self.size, len(raw)]
+        self.chunks.append(raw)
+        self.size += len(raw)
+        return span
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _null_mask(values, buffers):
+    if all(value is not None for value in values):
+        return None
+    return buffers.add(bytes(value is None for value in values))
+
+
+def _string_column(values, buffers):
+    distinct = sorted({value for value in values if value is not None})
+    column = {'nulls': _null_mask(values, buffers)}
+    if len(distinct) * 2 <= len(values):
+        codes = {value: code for code, value in enumerate(distinct)}
+        column.update(kind='dict', values=distinct,
+                      codes=buffers.add(array('I', [codes.get(value, 0) for value in values])))
+    else:
+        blob = bytearray()
+        offsets = array('I', [0])
+        for value in values:
+            blob += (value or '').encode('utf-8')
+            offsets.append(len(blob))
+        column.update(kind='str', offsets=buffers.add(offsets), blob=buffers.add(blob))
+    return column
+
+
+def _number_column(values, buffers):
+    present = [value for value in values if value is not None]
+    typecode = 'q' if all(isinstance(value, int) for value in present) else 'd'
+    column = {'kind': 'num', 'nulls': _null_mask(values, buffers),
+              'data': buffers.add(array(typecode, [0 if value is None else value for value in values])),
+              'typecode': typecode, 'ints': None}
+    if typecode == 'd' and any(isinstance(value, int) for value in present):
+        # Mixed column: flag the rows that were ints so they decode as ints again
+        column['ints'] = buffers.add(bytes(isinstance(value, int) for value in values))
+    return column
+
+
+def _list_column(values, buffers):
+    distinct = sorted({item for value in values if value for item in value})
+    codes = {value: code for code, value in enumerate(distinct)}
+    flat = array('I')
+    offsets = array('I', [0])
+    for value in values:
+        flat.extend(codes[item] for item in value or ())
+        offsets.append(len(flat))
+    return {'kind': 'list', 'nulls': _null_mask(values, buffers), 'values': distinct,
+            'offsets': buffers.add(offsets), 'codes': buffers.add(flat)}
+
+
+def _struct_column(values, keys, buffers):
+    present = [value or {} for value in values]
+    return {'kind': 'struct', 'nulls': _null_mask(values, buffers),
+            'fields': [[key, _number_column([value.get(key) for value in present], buffers)]
+                       for key in keys]}
+
+
+def _column(values, buffers):
+    """Encode one field's values, or return None if they fit no column kind."""
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, str) for value in present):
+        return _string_column(values, buffers)
+    if all(_is_number(value) for value in present):
+        return _number_column(values, buffers)
+    if all(isinstance(value, list) and all(isinstance(item, str) for item in value)
+           for value in present):
+        return _list_column(values, buffers)
+    if all(isinstance(value, dict) for value in present):
+        keys = list(present[0])
+        if all(list(value) == keys and all(_is_number(v) for v in value.values())
+               for value in present):
+            return _struct_column(values, keys, buffers)
+    return None
+
+
+def write_snapshot(index_path, entries, signature):
+    """Write the snapshot for entries built from index_path with the given signature.
+
+    Returns the snapshot path, or None when the entries do not share one set of
+    fields that columns can represent (the JSON index is then used as is).
+    """
+    fields = list(entries[0]) if entries else []
+    if any(list(entry) != fields for entry in entries):
+        return None
+
+    buffers = _Buffers()
+    columns = []
+    for field in fields:
+        column = _column([entry[field] for entry in entries], buffers)
+        if column is None:
+            return None
+        columns.append([field, column])
+
+    header = json.dumps({'byteorder': sys.byteorder, 'source': list(signature),
+                         'count': len(entries), 'columns': columns},
+                        separators=(',', ':')).encode('utf-8')
+    header += b' ' * (-(PREAMBLE.size + len(header)) % ALIGN)
+
+    path = snapshot_path(index_path)
+    with wardrobe_lock.atomic_file(path) as f:
+        f.write(PREAMBLE.pack(MAGIC, SNAPSHOT_VERSION, len(header)))
+        f.write(header)
+        f.writelines(buffers.chunks)
+    return path
+
+
+# -- reading ------------------------------------------------------------------
+
+def _decoder(column, data):
+    """Return a function pos -> value for one encoded column."""
+    def view(span, typecode='B'):
+        offset, length = span
+        return data[offset:offset + length].cast(typecode)
+
+    kind = column['kind']
+    if kind == 'dict':
+        values, codes = column['values'], view(column['codes'], 'I')
+
+        def decode(pos):
+            return values[codes[pos]]
+    elif kind == 'str':
+        offsets, blob = view(column['offsets'], 'I'), view(column['blob'])
+
+        def decode(pos):
+            return str(blob[offsets[pos]:offsets[pos + 1]], 'utf-8')
+    elif kind == 'num':
+        numbers = view(column['data'], column['typecode'])
+        if column.get('ints') is None:
+            decode = numbers.__getitem__
+        else:
+            ints = view(column['ints'])
+
+            def decode(pos):
+                return int(numbers[pos]) if ints[pos] else numbers[pos]
+    elif kind == 'list':
+        values, offsets, codes = column['values'], view(column['offsets'], 'I'), view(column['codes'], 'I')
+
+        def decode(pos):
+            return [values[code] for code in codes[offsets[pos]:offsets[pos + 1]]]
+    elif kind == 'struct':
+        fields = [(key, _decoder(sub, data)) for key, sub in column['fields']]
+
+        def decode(pos):
+            return {key: field(pos) for key, field in fields}
+    else:
+        raise ValueError(f"unknown snapshot column kind: {kind}")
+
+    if column.get('nulls') is None:
+        return decode
+    nulls = view(column['nulls'])
+
+    def decode_nullable(pos):
+        return None if nulls[pos] else decode(pos)
+    return decode_nullable
+
+
+class SnapshotEntries(Sequence):
+    """Read-only sequence of index entries backed by a mapped snapshot.
+
+    Each row is decoded into a dict on first access and reused afterwards.
+    """
+
+    def __init__(self, mapped, header, data_start):
+        self._mapped = mapped  # keep the mapping alive as long as the views
+        data = memoryview(mapped)[data_start:]
+        self._count = header['count']
+        self._fields = [(name, _decoder(column, data)) for name, column in header['columns']]
+        self._rows = {}
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(self._count))]
+        if pos < 0:
+            pos += self._count
+        if not 0 <= pos < self._count:
+            raise IndexError('snapshot row out of range')
+        row = self._rows.get(pos)
+        if row is None:
+            row = self._rows[pos] = {name: decode(pos) for name, decode in self._fields}
+        return row
+
+
+def load_snapshot(index_path, signature=None):
+    """Map the snapshot of index_path, or return None if it is missing or stale.
+
+    signature, when given, must match the (size, mtime_ns) the snapshot was built from.
+    """
+    try:
+        with open(snapshot_path(index_path), 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # missing, or empty (cannot be mapped)
+        return None
+
+    try:
+        magic, version, header_length = PREAMBLE.unpack_from(mapped)
+        if magic != MAGIC or version != SNAPSHOT_VERSION:
+            return None
+        header = json.loads(mapped[PREAMBLE.size:PREAMBLE.size + header_length])
+        if header['byteorder'] != sys.byteorder:
+            return None
+        if signature is not None and tuple(header['source']) != tuple(signature):
+            return None
+        return SnapshotEntries(mapped, header, PREAMBLE.size + header_length)
+    except (struct.error, ValueError, KeyError, TypeError):
+        return None
+
+
+def same_value(a, b):
+    """Return True if a and b are equal and of the same JSON types (1 and 1.0 differ)."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return list(a) == list(b) and all(same_value(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(same_value(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build or check the binary snapshot of wardrobe_index.json',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Rebuild the snapshot and show its columns
+  python scripts/index_snapshot.py
+
+  # Compare every row with wardrobe_index.json
+  python scripts/index_snapshot.py --verify
+        """
+    )
+    parser.add_argument('--verify', action='store_true',
+                        help='Check the snapshot against wardrobe_index.json instead of rebuilding it')
+    args = parser.parse_args()
+
+    import query_engine
+
+    try:
+        if args.verify:
+            with open(WARDROBE_INDEX, 'r', encoding='utf-8') as f:
+                index_data = json.load(f)
+            entries = index_data.get('items', index_data.get('index', []))
+            snapshot = load_snapshot(WARDROBE_INDEX, wardrobe_paths.file_signature(WARDROBE_INDEX))
+            if snapshot is None:
+                print(f"Snapshot is missing or out of date: {snapshot_path(WARDROBE_INDEX)}", file=sys.stderr)
+                sys.exit(1)
+            mismatched = [entry.get('id') for pos, entry in enumerate(entries)
+                          if pos >= len(snapshot) or not same_value(snapshot[pos], entry)]
+            if mismatched or len(snapshot) != len(entries):
+                print(f"Snapshot differs from {WARDROBE_INDEX.name} for {len(mismatched)} item(s)", file=sys.stderr)
+                sys.exit(1)
+            print(f"Snapshot matches {WARDROBE_INDEX.name} ({len(entries)} items)")
+            return
+
+        query_engine.build_engine()
+        signature = wardrobe_paths.file_signature(WARDROBE_INDEX)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    path = snapshot_path(WARDROBE_INDEX)
+    snapshot = load_snapshot(WARDROBE_INDEX, signature)
+    if snapshot is None:
+        print(f"Error: {WARDROBE_INDEX.name} has entries with differing fields; no snapshot written",
+              file=sys.stderr)
+        sys.exit(1)
+    with open(path, 'rb') as f:
+        header_length = PREAMBLE.unpack(f.read(PREAMBLE.size))[2]
+        header = json.loads(f.read(header_length))
+    print(f"Wrote snapshot of {len(snapshot)} items: {path}")
+    print(f"  {path.stat().st_size} bytes (JSON: {WARDROBE_INDEX.stat().st_size} bytes)")
+    for name, column in header['columns']:
+        distinct = f" ({len(column['values'])} distinct)" if 'values' in column else ''
+        print(f"  {name:14} {column['kind']}{distinct}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Index Sync
+Incremental, hash-driven rebuild of wardrobe_index.json and drift detection.
+
+wardrobe_index.hashes.json stores, per item, a hash of its raw record bytes in
+wardrobe_items.json and a hash of its index entry. A rebuild hashes each record
+straight from the offsets sidecar without decoding it, and only decodes and
+re-projects the records whose hash changed (or whose index entry was edited,
+is missing, or is orphaned). Rebuild cost therefore follows the number of edits
+rather than the wardrobe size. The store also records the size and modification
+time of both files at the last sync; while neither file has changed since, a
+check or rebuild reports the index in sync without reading either file.
+
+Usage:
+    # Report drift between the index and the items file without writing
+    python scripts/update_wardrobe.py --check-index
+
+    # Rebuild the changed index entries
+    python scripts/update_wardrobe.py --rebuild-index
+"""
+
+import hashlib
+import json
+import mmap
+from pathlib import Path
+
+import item_offsets
+import wardrobe_core
+import wardrobe_lock
+import wardrobe_paths
+
+HASHES_VERSION = 1
+
+
+def hashes_path(index_path):
+    """Return the hash store path for an index file."""
+    index_path = Path(index_path)
+    return index_path.with_name(index_path.stem + '.hashes.json')
+
+
+def entry_hash(entry):
+    """Return a stable hash of an index entry."""
+    return hashlib.sha1(json.dumps(entry, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def load_hashes(index_path):
+    """Return the stored {'items': {...}, 'entries': {...}} hashes, or empty maps.
+
+    Hashes recorded for an older index projection are discarded, so every entry
+    is re-projected after index_entry() changes.
+    """
+    try:
+        with open(hashes_path(index_path), 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if (stored.get('version') == HASHES_VERSION
+                and stored.get('projection') == wardrobe_core.INDEX_VERSION):
+            return stored
+    except (OSError, ValueError):
+        pass
+    return {'items': {}, 'entries': {}}
+
+
+def save_hashes(index_path, item_hashes, entry_hashes, sources=None):
+    """Store the hashes, and the file signatures they are known to match (see file_sources)."""
+    wardrobe_lock.write_json_atomic(hashes_path(index_path), {
+        'version': HASHES_VERSION, 'projection': wardrobe_core.INDEX_VERSION,
+        'sources': sources, 'items': item_hashes, 'entries': entry_hashes}, compact=True)
+
+
+def file_sources(index_path, items_path):
+    """Return [items signature, index signature] as stored in the hash file, or None."""
+    try:
+        return [list(wardrobe_paths.file_signature(items_path)),
+                list(wardrobe_paths.file_signature(index_path))]
+    except FileNotFoundError:
+        return None
+
+
+def record_hashes(items_path):
+    """Hash every raw record without decoding it.
+
+    Returns (list of (item_id, hash) in file order, offsets).
+    """
+    offsets = item_offsets.load_sidecar(items_path)
+    if offsets is None:
+        # Sidecar is stale: one full parse regenerates it
+        item_offsets.load_items_document(items_path)
+        offsets = item_offsets.load_sidecar(items_path)
+        if offsets is None:
+            raise ValueError(f"Could not locate item records in {items_path}")
+
+    with open(items_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            ordered = sorted(offsets.items(), key=lambda kv: kv[1][0])
+            hashes = [(item_id, hashlib.sha1(mm[off:off + length]).hexdigest())
+                      for item_id, (off, length) in ordered]
+    return hashes, offsets
+
+
+def sync_index(write=True, index_path=None, items_path=None):
+    """Compare the index with the items file and optionally rebuild it.
+
+    Returns a report dict with lists of 'missing', 'orphaned', 'mismatched' IDs
+    (the drift found) and the counts 'items', 'recomputed' and 'written'.
+    """
+    index_path = Path(index_path or wardrobe_core.WARDROBE_INDEX)
+    items_path = Path(items_path or wardrobe_core.WARDROBE_ITEMS)
+
+    stored = load_hashes(index_path)
+    sources = file_sources(index_path, items_path)
+    if sources is not None and stored.get('sources') == sources:
+        # Neither file changed since a sync that left the index matching the items
+        return {'missing': [], 'orphaned': [], 'mismatched': [],
+                'items': len(stored['items']), 'recomputed': 0, 'written': False}
+
+    if index_path.exists():
+        index_data = wardrobe_core.load_json(index_path)
+    else:
+        index_data = {'items': []}
+    legacy = 'items' not in index_data
+    index_data = {('items' if key == 'index' and legacy else key): value
+                  for key, value in index_data.items()}
+    current = {entry['id']: entry for entry in index_data.get('items', [])}
+
+    hashes, offsets = record_hashes(items_path)
+    item_ids = {item_id for item_id, _ in hashes}
+
+    report = {'missing': [], 'orphaned': sorted(set(current) - item_ids), 'mismatched': [],
+              'items': len(hashes), 'recomputed': 0, 'written': False}
+
+    new_entries = []
+    item_hashes = {}
+    entry_hashes = {}
+
+    with open(items_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for item_id, record_hash in hashes:
+                entry = current.get(item_id)
+                unchanged = (entry is not None
+                             and stored['items'].get(item_id) == record_hash
+                             and stored['entries'].get(item_id) == entry_hash(entry))
+
+                if not unchanged:
+                    offset, length = offsets[item_id]
+                    item = json.loads(mm[offset:offset + length].decode('utf-8'))
+                    projected = wardrobe_core.index_entry(item)
+                    report['recomputed'] += 1
+                    if entry is None:
+                        report['missing'].append(item_id)
+                    elif entry != projected:
+                        report['mismatched'].append(item_id)
+                    entry = projected
+
+                new_entries.append(entry)
+                item_hashes[item_id] = record_hash
+                entry_hashes[item_id] = entry_hash(entry)
+
+    drift = report['missing'] or report['orphaned'] or report['mismatched']
+    reordered = list(current) != [entry['id'] for entry in new_entries]
+
+    if write:
+        if drift or reordered or legacy:
+            index_data['items'] = new_entries
+            wardrobe_lock.write_json_atomic(index_path, index_data)
+            report['written'] = True
+        save_hashes(index_path, item_hashes, entry_hashes, file_sources(index_path, items_path))
+    elif not (drift or reordered or legacy):
+        # The index is in sync: remember that, so the next check can skip the hashing
+        save_hashes(index_path, item_hashes, entry_hashes, sources)
+
+    return report
+
+
+def print_report(report):
+    """Print a drift report and return the number of drifted entries."""
+    drift = sum(len(report[key]) for key in ['missing', 'orphaned', 'mismatched'])
+    print(f"Checked {report['items']} item(s), re-projected {report['recomputed']}")
+
+    labels = {
+        'missing': 'Missing from index',
+        'orphaned': 'Orphaned in index (no matching item)',
+        'mismatched': 'Index entry out of date',
+    }
+    for key, label in labels.items():
+        if report[key]:
+            print(f"\n{label}: {len(report[key])}")
+            for item_id in report[key]:
+                print(f"  - {item_id}")
+
+    if not drift:
+        print("Index is in sync")
+    elif report['written']:
+        print(f"\nRebuilt wardrobe_index.json ({drift} entr{'y' if drift == 1 else 'ies'} fixed)")
+    return drift
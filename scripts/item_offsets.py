@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Item Offsets
+Byte-offset sidecar for wardrobe_items.json so single records can be read directly.
+
+wardrobe_items.offsets.json maps each item ID to the (offset, length) of its record
+inside wardrobe_items.json, along with the size and modification time of the file it
+describes. Readers memory-map the items file and decode only the requested records.
+When the sidecar is missing or stale (the items file was edited some other way),
+readers fall back to a full parse and regenerate the sidecar.
+
+Usage:
+    # Regenerate the sidecar from the current items file
+    python scripts/item_offsets.py
+"""
+
+import json
+import mmap
+import re
+import sys
+from pathlib import Path
+
+import wardrobe_lock
+import wardrobe_paths
+
+WARDROBE_ITEMS = wardrobe_paths.WARDROBE_ITEMS
+
+SIDECAR_VERSION = 1
+ITEMS_ARRAY_START = re.compile(r'"items"\s*:\s*\[')
+
+
+def sidecar_path(items_path):
+    """Return the sidecar path for an items file."""
+    items_path = Path(items_path)
+    return items_path.with_name(items_path.stem + '.offsets.json')
+
+
+def _indent(text, prefix):
+    # json.dumps never emits raw newlines inside strings, so this is safe
+    return text.replace('\n', '\n' + prefix)
+
+
+def dump_items_document(data):
+    """Serialize an items document exactly like json.dump(data, indent=2, ensure_ascii=False).
+
+    Returns (encoded_bytes, offsets) where offsets maps item ID -> [offset, length].
+    """
+    if not data:
+        return b'{}', {}
+
+    chunks = [b'{\n']
+    size = 2
+    offsets = {}
+
+    for key_num, (key, value) in enumerate(data.items()):
+        head = ('' if key_num == 0 else ',\n') + '  ' + json.dumps(key, ensure_ascii=False) + ': '
+
+        if key == 'items' and isinstance(value, list) and value:
+            head_bytes = (head + '[\n').encode('utf-8')
+            chunks.append(head_bytes)
+            size += len(head_bytes)
+
+            for item_num, item in enumerate(value):
+                prefix = ('    ' if item_num == 0 else ',\n    ').encode('utf-8')
+                chunks.append(prefix)
+                size += len(prefix)
+
+                record = _indent(json.dumps(item, indent=2, ensure_ascii=False), '    ').encode('utf-8')
+                offsets[item['id']] = [size, len(record)]
+                chunks.append(record)
+                size += len(record)
+
+            tail = b'\n  ]'
+        else:
+            head_bytes = head.encode('utf-8')
+            tail = _indent(json.dumps(value, indent=2, ensure_ascii=False), '  ').encode('utf-8')
+            chunks.append(head_bytes)
+            size += len(head_bytes)
+
+        chunks.append(tail)
+        size += len(tail)
+
+    chunks.append(b'\n}')
+    return b''.join(chunks), offsets
+
+
+def write_sidecar(items_path, offsets, signature=None):
+    """Write the sidecar for the current state of items_path (or the given signature)."""
+    if signature is None:
+        signature = wardrobe_paths.file_signature(items_path)
+    sidecar = {'version': SIDECAR_VERSION, 'source': list(signature), 'offsets': offsets}
+    # Readers may regenerate a stale sidecar too, so this must be atomic as well
+    wardrobe_lock.write_json_atomic(sidecar_path(items_path), sidecar, compact=True)
+
+
+def write_items_file(items_path, data):
+    """Write wardrobe_items.json atomically and regenerate its offsets sidecar."""
+    items_path = Path(items_path)
+    payload, offsets = dump_items_document(data)
+
+    wardrobe_lock.write_atomic(items_path, payload)
+    write_sidecar(items_path, offsets)
+
+
+def scan_offsets(raw):
+    """Locate every record of the items array in raw file bytes.
+
+    Returns a dict of item ID -> [offset, length], or None if the layout is not
+    recognized.
+    """
+    text = raw.decode('utf-8')
+    match = ITEMS_ARRAY_START.search(text)
+    if not match:
+        return None
+
+    decoder = json.JSONDecoder()
+    is_ascii = len(text) == len(raw)
+    offsets = {}
+    pos = match.end()
+    byte_pos = len(text[:pos].encode('utf-8'))
+    char_pos = pos
+
+    while True:
+        while pos < len(text) and text[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(text) or text[pos] == ']':
+            break
+
+        item, end = decoder.raw_decode(text, pos)
+        if not isinstance(item, dict) or 'id' not in item:
+            return None
+
+        if is_ascii:
+            start, length = pos, end - pos
+        else:
+            byte_pos += len(text[char_pos:pos].encode('utf-8'))
+            length = len(text[pos:end].encode('utf-8'))
+            start = byte_pos
+            byte_pos += length
+            char_pos = end
+
+        offsets[item['id']] = [start, length]
+        pos = end
+
+    return offsets
+
+
+def load_sidecar(items_path, signature=None):
+    """Return the offsets map if the sidecar matches items_path, else None.
+
+    signature, when given, is the (size, mtime_ns) of the items file being read
+    (a pinned snapshot) instead of the file currently on disk.
+    """
+    try:
+        with open(sidecar_path(items_path), 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        if sidecar.get('version') != SIDECAR_VERSION:
+            return None
+        if signature is None:
+            signature = wardrobe_paths.file_signature(items_path)
+        if sidecar.get('source') != list(signature):
+            return None
+        return sidecar['offsets']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def read_items(items_path, item_ids):
+    """Decode only the requested records using the sidecar.
+
+    Returns a dict of item ID -> item for the IDs that exist, or None if the
+    sidecar is missing or stale and the caller should fall back to a full parse.
+    """
+    offsets = load_sidecar(items_path)
+    if offsets is None:
+        return None
+
+    wanted = [(offsets[item_id], item_id) for item_id in dict.fromkeys(item_ids) if item_id in offsets]
+    if not wanted:
+        return {}
+
+    found = {}
+    with open(items_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for (offset, length), item_id in sorted(wanted):
+                try:
+                    item = json.loads(mm[offset:offset + length].decode('utf-8'))
+                except ValueError:
+                    return None
+                if not isinstance(item, dict) or item.get('id') != item_id:
+                    return None
+                found[item_id] = item
+
+    return found
+
+
+def load_items_document(items_path, snapshot=None):
+    """Fully parse the items file and refresh its sidecar (the stale-sidecar path).
+
+    With a wardrobe_lock snapshot, the pinned file is parsed; its sidecar is only
+    written if that is still the file on disk.
+    """
+    if snapshot is None:
+        with open(items_path, 'rb') as f:
+            raw = f.read()
+        signature = wardrobe_paths.file_signature(items_path)
+    else:
+        raw = snapshot.read_bytes(items_path)
+        signature = snapshot.signature(items_path)
+    data = json.loads(raw.decode('utf-8'))
+
+    offsets = scan_offsets(raw)
+    if offsets is not None and len(offsets) == len(data.get('items', [])):
+        try:
+            if wardrobe_paths.file_signature(items_path) == signature:
+                write_sidecar(items_path, offsets, signature)
+        except OSError as e:
+            print(f"Warning: could not write {sidecar_path(items_path).name}: {e}", file=sys.stderr)
+
+    return data
+
+
+def main():
+    if not WARDROBE_ITEMS.exists():
+        print(f"Error: Items file not found: {WARDROBE_ITEMS}", file=sys.stderr)
+        sys.exit(1)
+
+    data = load_items_document(WARDROBE_ITEMS)
+    if load_sidecar(WARDROBE_ITEMS) is None:
+        print("Error: Could not locate item records in wardrobe_items.json", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Indexed {len(data.get('items', []))} item(s): {sidecar_path(WARDROBE_ITEMS)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+Outfit Generator
+Builds the best-scoring outfits from the wardrobe for an occasion and weather.
+
+Each slot (outerwear, tops, bottoms, shoes, accessories) is prefiltered through
+the index by type, season, formality and temperature range, then ranked by how
+well each item fits the context on its own. The cross product of the slots is
+searched depth-first with branch and bound: a partial outfit is dropped as soon
+as its formality spread or a color clash rules it out, or when even the best
+remaining pieces could not lift it into the current top k (kept in a bounded
+heap). The last slot is scored for all candidates at once with NumPy when it is
+installed.
+
+Outfits are written in the recommendation.template.json shape (primary,
+alternative1, ...), so generate_recommendation_html.py can render them.
+
+Usage:
+    python scripts/outfit_generator.py --occasion "business meeting" --temp 55 --season fall
+    python scripts/outfit_generator.py --occasion dinner --formality 5-7 --top-k 3 --save
+"""
+
+import argparse
+import heapq
+import json
+import math
+import sys
+import time
+from datetime import datetime, timezone
+
+import color_engine
+import wardrobe_core
+import wardrobe_db
+import wardrobe_lock
+
+try:
+    import numpy as np
+except ImportError:  # optional: only vectorizes the last search level
+    np = None
+
+# Slot -> (role, required). Output lists items in this order.
+SLOTS = {
+    'outerwear': ('primary layer', False),
+    'tops': ('base layer', True),
+    'bottoms': ('base', True),
+    'shoes': ('foundation', True),
+    'accessories': ('accent', False),
+}
+ACCENT_SLOTS = {'shoes', 'accessories'}
+
+# Default target formality for occasion keywords (1 = gym, 10 = black tie)
+OCCASION_FORMALITY = {
+    'gala': 10, 'wedding': 9, 'interview': 8, 'business': 8, 'meeting': 8,
+    'presentation': 8, 'office': 7, 'work': 7, 'dinner': 6, 'date': 6,
+    'theater': 6, 'party': 5, 'brunch': 4, 'casual': 3, 'weekend': 3,
+    'errands': 2, 'active': 2, 'hiking': 2, 'gym': 1,
+}
+DEFAULT_FORMALITY = 5
+
+OUTERWEAR_BELOW_F = 65   # outerwear becomes a required slot below this
+TEMP_TOLERANCE_F = 15    # items rated this far outside the temperature are dropped
+FORMALITY_TOLERANCE = 2  # prefilter window around the target formality
+
+# Score = weighted mean item fit + weighted mean pairwise color harmony
+#         - penalty for a wide formality spread
+ITEM_WEIGHT = 0.6
+HARMONY_WEIGHT = 0.4
+SPREAD_WEIGHT = 0.1
+
+DEFAULT_TOP_K = 3
+DEFAULT_PER_SLOT = 20
+DEFAULT_MAX_SPREAD = 3
+DEFAULT_MIN_HARMONY = 0.5
+POOL_FACTOR = 8  # outfits kept per requested outfit, to pick distinct ones from
+
+GENERATOR_VERSION = 'v1.0'
+
+
+def season_for(date):
+    """Return the (northern hemisphere) season of a date."""
+    return ('winter', 'winter', 'spring', 'spring', 'spring', 'summer',
+            'summer', 'summer', 'fall', 'fall', 'fall', 'winter')[date.month - 1]
+
+
+def occasion_words(occasion):
+    return {word for word in occasion.lower().replace('-', ' ').split() if word}
+
+
+def default_formality(occasion):
+    """Return the target formality implied by an occasion, or DEFAULT_FORMALITY."""
+    levels = [OCCASION_FORMALITY[word] for word in occasion_words(occasion) if word in OCCASION_FORMALITY]
+    return max(levels) if levels else DEFAULT_FORMALITY
+
+
+def temp_fit(item, temp_f):
+    """1.0 inside the item's temperature range, falling to 0 at TEMP_TOLERANCE_F outside."""
+    if temp_f is None:
+        return 1.0
+    bounds = wardrobe_core.temp_range_f(item)
+    if bounds is None:
+        return 1.0
+    distance = max(bounds['min'] - temp_f, temp_f - bounds['max'], 0)
+    return max(0.0, 1 - distance / TEMP_TOLERANCE_F)
+
+
+def occasion_fit(item, words):
+    """1.0 if any of the item's occasions shares a word with the requested occasion."""
+    for occasion in item.get('context', {}).get('occasions', []):
+        if words & occasion_words(occasion):
+            return 1.0
+    return 0.0
+
+
+def item_fit(item, context):
+    """Score how well one item suits the context on its own (0-1)."""
+    formality = item.get('metadata', {}).get('formality', 0)
+    formality_fit = max(0.0, 1 - abs(formality - context['formality']) / 5)
+    return (0.5 * formality_fit
+            + 0.3 * occasion_fit(item, context['words'])
+            + 0.2 * temp_fit(item, context['temp_f']))
+
+
+def active_slots(context):
+    """Return {slot: required} for the slots this context calls for."""
+    slots = {slot: required for slot, (_, required) in SLOTS.items()}
+    temp_f = context['temp_f']
+    if (temp_f is not None and temp_f < OUTERWEAR_BELOW_F) or (
+            temp_f is None and context['season'] in ('fall', 'winter')):
+        slots['outerwear'] = True
+    elif temp_f is not None and temp_f >= OUTERWEAR_BELOW_F + TEMP_TOLERANCE_F:
+        del slots['outerwear']
+    return slots
+
+
+def slot_candidates(wardrobe, slot, context, per_slot):
+    """Return up to per_slot (item, fit) pairs for a slot, best fit first."""
+    target, temp_f = context['formality'], context['temp_f']
+    temp_range = (temp_f - TEMP_TOLERANCE_F, temp_f + TEMP_TOLERANCE_F) if temp_f is not None else None
+    entries = wardrobe.query(type=slot, season=context['season'], temp_range=temp_range,
+                             formality=(math.floor(target - FORMALITY_TOLERANCE),
+                                        math.ceil(target + FORMALITY_TOLERANCE)))
+    items, _ = wardrobe.get_many([entry['id'] for entry in entries])
+
+    scored = []
+    for item in items:
+        if temp_f is not None and temp_fit(item, temp_f) == 0:
+            continue
+        scored.append((item, item_fit(item, context)))
+    scored.sort(key=lambda pair: -pair[1])
+    return scored[:per_slot]
+
+
+class OutfitSearch:
+    """Branch-and-bound search over one candidate list per slot.
+
+    Candidates are global indices into the fit, formality and harmony arrays.
+    """
+
+    def __init__(self, slot_indices, fit, formality, harmony, pool_size,
+                 max_spread=DEFAULT_MAX_SPREAD, min_harmony=DEFAULT_MIN_HARMONY):
+        # Most constrained slot first, best candidates first within a slot
+        self.slots = sorted((sorted(indices, key=lambda i: -fit[i]) for indices in slot_indices), key=len)
+        self.fit = fit
+        self.formality = formality
+        self.harmony = harmony
+        self.pool_size = pool_size
+        self.max_spread = max_spread
+        self.min_harmony = min_harmony
+
+        self.n = len(self.slots)
+        self.n_pairs = self.n * (self.n - 1) // 2
+        # Best possible item fit still to come after each depth
+        best = [max(fit[i] for i in indices) for indices in self.slots]
+        self.rest_fit = [sum(best[depth:]) for depth in range(self.n + 1)]
+
+        self.heap = []  # (score, outfit) min-heap of the best outfits so far
+        self.evaluated = 0
+        self.pruned = 0
+
+    def score(self, fit_sum, harmony_sum, spread):
+        return (ITEM_WEIGHT * fit_sum / self.n
+                + HARMONY_WEIGHT * (harmony_sum / self.n_pairs if self.n_pairs else 1.0)
+                - SPREAD_WEIGHT * spread / max(self.max_spread, 1))
+
+    def threshold(self):
+        """Score an outfit must beat to enter the pool."""
+        return self.heap[0][0] if len(self.heap) >= self.pool_size else -math.inf
+
+    def offer(self, score, outfit):
+        if len(self.heap) < self.pool_size:
+            heapq.heappush(self.heap, (score, outfit))
+        elif score > self.heap[0][0]:
+            heapq.heapreplace(self.heap, (score, outfit))
+
+    def run(self):
+        """Search every slot combination; returns [(score, outfit), ...] best first."""
+        if self.n:
+            self._extend(0, (), 0.0, 0.0, math.inf, -math.inf)
+        return sorted(self.heap, reverse=True)
+
+    def _extend(self, depth, chosen, fit_sum, harmony_sum, f_min, f_max):
+        # Upper bound: the best remaining fits and perfect harmony for every pair
+        # still to come; the spread can only grow.
+        pairs_done = depth * (depth - 1) // 2
+        spread = f_max - f_min if chosen else 0
+        bound = self.score(fit_sum + self.rest_fit[depth], harmony_sum + self.n_pairs - pairs_done, spread)
+        if bound <= self.threshold():
+            self.pruned += 1
+            return
+
+        if depth == self.n - 1 and np is not None and chosen:
+            self._extend_last(chosen, fit_sum, harmony_sum, f_min, f_max)
+            return
+
+        for index in self.slots[depth]:
+            f = self.formality[index]
+            lo, hi = min(f_min, f), max(f_max, f)
+            if hi - lo > self.max_spread:
+                continue
+            row = self.harmony[index]
+            pair_harmony = [row[other] for other in chosen]
+            if pair_harmony and min(pair_harmony) < self.min_harmony:
+                continue
+            if depth == self.n - 1:
+                self.evaluated += 1
+                self.offer(self.score(fit_sum + self.fit[index], harmony_sum + sum(pair_harmony), hi - lo),
+                           chosen + (index,))
+            else:
+                self._extend(depth + 1, chosen + (index,), fit_sum + self.fit[index],
+                             harmony_sum + sum(pair_harmony), lo, hi)
+
+    def _extend_last(self, chosen, fit_sum, harmony_sum, f_min, f_max):
+        """Score every candidate of the last slot at once."""
+        candidates = self.slot_arrays[-1]
+        pair = self.harmony[np.ix_(chosen, candidates)]
+        f = self.formality[candidates]
+        spread = np.maximum(f_max, f) - np.minimum(f_min, f)
+        scores = self.score(fit_sum + self.fit[candidates], harmony_sum + pair.sum(axis=0), spread)
+
+        ok = (spread <= self.max_spread) & (pair.min(axis=0) >= self.min_harmony)
+        self.evaluated += int(ok.sum())
+        ok &= scores > self.threshold()
+        for pos in np.flatnonzero(ok)[np.argsort(-scores[ok])]:
+            score = float(scores[pos])
+            if score <= self.threshold():
+                break
+            self.offer(score, chosen + (int(candidates[pos]),))
+
+    def replacements(self, outfit):
+        """Map each piece of an outfit to the best-fitting other candidate of its
+        slot that keeps the outfit within the spread and harmony limits."""
+        result = {}
+        for index in outfit:
+            others = [other for other in outfit if other != index]
+            levels = [self.formality[other] for other in others]
+            for candidate in next(indices for indices in self.slots if index in indices):
+                if candidate == index:
+                    continue
+                f = self.formality[candidate]
+                if max(levels + [f]) - min(levels + [f]) > self.max_spread:
+                    continue
+                if min(self.harmony[candidate][other] for other in others) < self.min_harmony:
+                    continue
+                result[index] = candidate  # slots are sorted best fit first
+                break
+        return result
+
+    def vectorize(self):
+        """Switch the score inputs to arrays so the last level runs in NumPy."""
+        if np is not None:
+            self.fit = np.asarray(self.fit, dtype=float)
+            self.formality = np.asarray(self.formality, dtype=float)
+            self.harmony = np.asarray(self.harmony, dtype=float)
+            self.slot_arrays = [np.asarray(indices, dtype=np.intp) for indices in self.slots]
+        return self
+
+
+def distinct_outfits(pool, top_k, min_changes=2):
+    """Pick top_k outfits best first, preferring ones that differ in min_changes slots."""
+    picked = []
+    for score, outfit in pool:
+        if all(len(set(outfit) - set(other)) >= min_changes for _, other in picked):
+            picked.append((score, outfit))
+            if len(picked) == top_k:
+                return picked
+    for entry in pool:  # not enough distinct outfits: fill with the next best
+        if len(picked) == top_k:
+            break
+        if entry not in picked:
+            picked.append(entry)
+    return sorted(picked, reverse=True)
+
+
+def generate(context, top_k=DEFAULT_TOP_K, per_slot=DEFAULT_PER_SLOT,
+             max_spread=DEFAULT_MAX_SPREAD, min_harmony=DEFAULT_MIN_HARMONY):
+    """Generate the best outfits for a context.
+
+    context holds occasion, season, formality (target), temp_f (or None) and
+    words (occasion_words of the occasion). Returns (outfits, stats) where each
+    outfit is (score, [(slot, item, fit), ...]) in SLOTS order.
+    """
+    wardrobe = wardrobe_core.Wardrobe.load()
+    candidates = {}
+    for slot, required in active_slots(context).items():
+        scored = slot_candidates(wardrobe, slot, context, per_slot)
+        if scored:
+            candidates[slot] = scored
+        elif required:
+            raise LookupError(f"No {slot} suit this occasion, season and temperature")
+
+    slots = list(candidates)
+    flat = [(slot, item, fit) for slot in slots for item, fit in candidates[slot]]
+    items = [item for _, item, _ in flat]
+    _, _, harmony = color_engine.item_color_matrices(items)
+
+    slot_indices, pos = [], 0
+    for slot in slots:
+        slot_indices.append(list(range(pos, pos + len(candidates[slot]))))
+        pos += len(candidates[slot])
+
+    search = OutfitSearch(
+        slot_indices,
+        fit=[fit for _, _, fit in flat],
+        formality=[item.get('metadata', {}).get('formality', 0) for item in items],
+        harmony=harmony,
+        pool_size=top_k * POOL_FACTOR,
+        max_spread=max_spread,
+        min_harmony=min_harmony,
+    ).vectorize()
+    pool = search.run()
+
+    order = {slot: pos for pos, slot in enumerate(SLOTS)}
+    outfits = []
+    for score, outfit in distinct_outfits(pool, top_k):
+        pieces = sorted((flat[i] for i in outfit), key=lambda piece: order[piece[0]])
+        outfits.append((score, pieces))
+
+    stats = {
+        'wardrobe': len(wardrobe),
+        'candidates': len(flat),
+        'slots': {slot: len(candidates[slot]) for slot in slots},
+        'evaluated': search.evaluated,
+        'pruned': search.pruned,
+    }
+    replaced = search.replacements(pool[0][1] if pool else ())
+    stats['replacements'] = {flat[old][1]['id']: flat[replaced[old]][1]
+                             for old in sorted(replaced, key=lambda i: order[flat[i][0]])}
+    return outfits, stats
+
+
+# ---------------------------------------------------------------------------
+# Recommendation documents
+# ---------------------------------------------------------------------------
+
+def next_recommendation_id(now):
+    """Return the next free rec_YYYYMMDD_NNN ID for a date."""
+    prefix = f"rec_{now:%Y%m%d}_"
+    taken = [rec_id[len(prefix):] for rec_id in wardrobe_core.recommendation_ids() if rec_id.startswith(prefix)]
+    numbers = [int(suffix) for suffix in taken if suffix.isdigit()]
+    return f"{prefix}{max(numbers, default=0) + 1:03d}"
+
+
+def piece_reason(item, context):
+    """Explain why one item was picked."""
+    formality = item.get('metadata', {}).get('formality', 0)
+    reasons = [f"Formality {formality} for a target of {context['formality']:g}"]
+    if occasion_fit(item, context['words']):
+        reasons.append(f"Suited to {context['occasion']}")
+    bounds = wardrobe_core.temp_range_f(item)
+    if context['temp_f'] is not None and bounds:
+        fits = 'within' if temp_fit(item, context['temp_f']) == 1 else 'near'
+        reasons.append(f"Rated {bounds['min']:.0f}-{bounds['max']:.0f}°F, {fits} {context['temp_f']:.0f}°F")
+    return '. '.join(reasons) + '.'
+
+
+def unique(values):
+    return list(dict.fromkeys(value for value in values if value))
+
+
+def outfit_document(pieces, score, context, name=None):
+    """Return one outfit in the recommendation outfit shape."""
+    colors = {item['id']: item.get('metadata', {}).get('colors', {}) for _, item, _ in pieces}
+    main = [item for slot, item, _ in pieces if slot not in ACCENT_SLOTS]
+    accents = [item for slot, item, _ in pieces if slot in ACCENT_SLOTS]
+    levels = [item.get('metadata', {}).get('formality', 0) for _, item, _ in pieces]
+
+    if name is None:
+        name = ' & '.join(f"{colors[item['id']].get('primary', '')} {item['category']}".strip().title()
+                          for item in main[-2:])
+    return {
+        'name': name,
+        'items': [{
+            'id': item['id'],
+            'name': item['name'],
+            'type': item['type'],
+            'category': item['category'],
+            'role': SLOTS[slot][0],
+            'reason': piece_reason(item, context),
+        } for slot, item, _ in pieces],
+        'totalFormality': round(sum(levels) / len(levels), 1),
+        'dominantColors': unique(colors[item['id']].get('primary') for item in main),
+        'accentColors': unique([colors[item['id']].get('primary') for item in accents]
+                               + [accent for item in main for accent in colors[item['id']].get('accent', [])]),
+        'score': round(score, 3),
+    }
+
+
+def build_recommendation(outfits, stats, context, now):
+    """Assemble a recommendation document from generated outfits."""
+    primary_score, primary = outfits[0]
+    documents = [outfit_document(pieces, score, context) for score, pieces in outfits]
+    outfit = {'primary': documents[0]}
+    for number, document in enumerate(documents[1:], 1):
+        outfit[f'alternative{number}'] = document
+
+    levels = [item.get('metadata', {}).get('formality', 0) for _, item, _ in primary]
+    suited = sum(1 for _, item, _ in primary if occasion_fit(item, context['words']))
+    slots = [slot for slot, _, _ in primary]
+
+    if context['temp_f'] is None:
+        weather = 'No temperature given; pieces were chosen for the season only.'
+    else:
+        weather = (f"All pieces are rated for {context['temp_f']:.0f}°F or within "
+                   f"{TEMP_TOLERANCE_F}°F of it. ")
+        weather += ('Outerwear is included for warmth.' if 'outerwear' in slots
+                    else 'Warm enough to go without outerwear.')
+
+    weather_doc = {'temperature': context['temperature'], 'unit': context['unit']} \
+        if context['temperature'] is not None else {}
+    rec_context = {'occasion': context['occasion'], 'weather': weather_doc, 'season': context['season']}
+    if context.get('time_of_day'):
+        rec_context['timeOfDay'] = context['time_of_day']
+
+    return {
+        'id': next_recommendation_id(now),
+        'timestamp': now.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'context': rec_context,
+        'outfit': outfit,
+        'reasoning': {
+            'overall': (f"Highest scoring of {stats['evaluated']} valid combinations built from "
+                        f"{stats['candidates']} candidate pieces, rated on formality, occasion and "
+                        f"temperature fit plus how well every pair of pieces harmonizes in color."),
+            'formalityMatch': (f"Target formality: {context['formality']:g}. Achieved: "
+                               f"{documents[0]['totalFormality']} (pieces range {min(levels)}-{max(levels)})."),
+            'colorCoordination': (f"{', '.join(documents[0]['dominantColors']).title() or 'Neutral'} base"
+                                  + (f" with {', '.join(documents[0]['accentColors'])} accents."
+                                     if documents[0]['accentColors'] else '.')
+                                  + " No pair of pieces clashes in hue."),
+            'weatherAppropriateness': weather,
+            'occasionFit': f"{suited} of {len(primary)} pieces are tagged for {context['occasion']}.",
+            'styleNotes': [],
+        },
+        'alternatives': {
+            'variations': [{
+                'type': 'alternative outfit',
+                'description': document['name'],
+                'reason': f"Scores {document['score']:.2f} against {documents[0]['score']:.2f} for the primary outfit.",
+                'formalityChange': round(document['totalFormality'] - documents[0]['totalFormality'], 1),
+            } for document in documents[1:]],
+            'ifNotWearing': {
+                item_id: {
+                    'alternative': alternative['id'],
+                    'name': alternative['name'],
+                    'reason': 'Best-fitting replacement that keeps the formality spread and colors compatible',
+                } for item_id, alternative in stats['replacements'].items()
+            },
+        },
+        'metadata': {
+            'generatedBy': 'outfit_generator',
+            'modelVersion': GENERATOR_VERSION,
+            'confidenceScore': round(primary_score, 2),
+            'basedOnFeedback': [],
+            'wardrobeCoverage': (f"{len(primary)} of {stats['wardrobe']} items used "
+                                 f"({len(primary) / max(stats['wardrobe'], 1):.0%})"),
+        },
+    }
+
+
+def save_recommendation(rec):
+    """Store a recommendation (JSON file, or the database with the SQLite backend)."""
+    if wardrobe_db.backend_enabled():
+        with wardrobe_db.open_db() as conn:
+            wardrobe_db.upsert_recommendation(conn, rec)
+        return f"database ({wardrobe_db.DB_PATH})"
+
+    path = wardrobe_core.recommendation_path(rec['id'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wardrobe_lock.write_json_atomic(path, rec)
+    return path
+
+
+def parse_formality(value):
+    """Parse '7' or '6-8' into a target formality (the midpoint of a range)."""
+    try:
+        if '-' in value:
+            lo, hi = (int(part) for part in value.split('-', 1))
+            return (lo + hi) / 2
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid formality: {value} (use N or MIN-MAX)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate outfits for an occasion from the wardrobe',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Three outfits for a cool fall business meeting, printed as JSON
+  python scripts/outfit_generator.py --occasion "business meeting" --temp 55 --season fall
+
+  # Save the recommendation and render it
+  python scripts/outfit_generator.py --occasion dinner --formality 5-7 --save
+  python scripts/generate_recommendation_html.py rec_20251004_002
+
+  # Celsius, stricter color matching, a wider search
+  python scripts/outfit_generator.py --occasion weekend --temp 24 --unit c \\
+      --min-harmony 0.7 --per-slot 40
+        """
+    )
+
+    parser.add_argument('--occasion', required=True, help='Occasion, e.g. "business meeting"')
+    parser.add_argument('--temp', type=float, help='Temperature (Fahrenheit unless --unit c)')
+    parser.add_argument('--unit', choices=['f', 'c'], default='f', help='Temperature unit (default: f)')
+    parser.add_argument('--season', choices=['spring', 'summer', 'fall', 'winter'],
+                       help='Season (default: from today\'s date)')
+    parser.add_argument('--formality', type=parse_formality,
+                       help='Target formality N or MIN-MAX (default: from the occasion)')
+    parser.add_argument('--time-of-day', help='Time of day to record in the context')
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                       help=f'Number of outfits (default: {DEFAULT_TOP_K})')
+    parser.add_argument('--per-slot', type=int, default=DEFAULT_PER_SLOT,
+                       help=f'Best-fitting candidates kept per slot (default: {DEFAULT_PER_SLOT})')
+    parser.add_argument('--max-spread', type=int, default=DEFAULT_MAX_SPREAD,
+                       help=f'Largest formality gap between pieces (default: {DEFAULT_MAX_SPREAD})')
+    parser.add_argument('--min-harmony', type=float, default=DEFAULT_MIN_HARMONY,
+                       help=f'Lowest color harmony allowed between two pieces, 0-1 '
+                            f'(default: {DEFAULT_MIN_HARMONY})')
+    parser.add_argument('--save', action='store_true',
+                       help='Store the recommendation instead of printing it')
+
+    args = parser.parse_args()
+    if args.top_k < 1 or args.per_slot < 1:
+        parser.error('--top-k and --per-slot must be at least 1')
+
+    now = datetime.now(timezone.utc)
+    unit = 'celsius' if args.unit == 'c' else 'fahrenheit'
+    context = {
+        'occasion': args.occasion,
+        'words': occasion_words(args.occasion),
+        'season': args.season or season_for(now),
+        'formality': args.formality if args.formality is not None else default_formality(args.occasion),
+        'temperature': int(args.temp) if args.temp is not None and args.temp.is_integer() else args.temp,
+        'unit': unit,
+        'temp_f': wardrobe_core.to_fahrenheit(args.temp, unit),
+        'time_of_day': args.time_of_day,
+    }
+
+    start = time.perf_counter()
+    try:
+        outfits, stats = generate(context, args.top_k, args.per_slot, args.max_spread, args.min_harmony)
+    except (FileNotFoundError, LookupError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    if not outfits:
+        print("Error: No outfit satisfies the formality spread and color constraints "
+              "(try --max-spread, --min-harmony or --per-slot)", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Searched {stats['candidates']} candidates "
+          f"({', '.join(f'{n} {slot}' for slot, n in stats['slots'].items())}): "
+          f"{stats['evaluated']} outfits scored, {stats['pruned']} branches pruned in {elapsed:.3f}s",
+          file=sys.stderr)
+
+    rec = build_recommendation(outfits, stats, context, now)
+    if args.save:
+        print(f"✓ Saved {rec['id']} to {save_recommendation(rec)}")
+    else:
+        print(json.dumps(rec, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Query Cache
+Bounded on-disk LRU cache of wardrobe_query.py filter results.
+
+Each result is stored under a hash of its normalized filter arguments (string
+filters lowercased, unset ones dropped, IDs sorted) in data/wardrobe/query_cache/,
+one pickle per result, next to a small manifest.json with the LRU order, the
+hit/miss counters and the fingerprint of the files results depend on:
+wardrobe_index.json, wardrobe_items.json and the wear log. A lookup does not
+rewrite the manifest: it appends one line to usage.log, which the next store,
+invalidation or clear folds into the counters and LRU order (or the lookup that
+grows it past USAGE_FOLD_BYTES, when nothing is stored for a while). Every manifest
+update runs under an exclusive lock on query_cache/.lock, so concurrent queries
+do not drop each other's results. A fingerprint is the
+size, modification time and SHA-1 of each file; the hash is only recomputed when
+the size or modification time changes, so a touched but identical file keeps the
+cache while any edit (by update_wardrobe.py, which also clears the cache when it
+writes, or by hand) empties it.
+
+The least recently used results are evicted beyond MAX_ENTRIES results or
+MAX_BYTES on disk. Only the JSON backend is cached; SQLite answers from its own
+indexes.
+
+Usage:
+    # Hits, misses, hit rate and size
+    python scripts/query_cache.py stats
+
+    # Drop every cached result (counters are kept unless --reset)
+    python scripts/query_cache.py clear --reset
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from contextlib import contextmanager
+
+import wardrobe_lock
+import wardrobe_paths
+
+CACHE_DIR = wardrobe_paths.WARDROBE_DIR / "query_cache"
+MANIFEST = CACHE_DIR / "manifest.json"
+USAGE_LOG = CACHE_DIR / "usage.log"
+LOCK_PATH = CACHE_DIR / ".lock"
+SOURCES = (wardrobe_paths.WARDROBE_INDEX,
+           wardrobe_paths.WARDROBE_ITEMS,
+           wardrobe_paths.WARDROBE_DIR / "wear_log.tsv")
+
+CACHE_VERSION = 1
+MAX_ENTRIES = 64
+MAX_BYTES = 16 * 1024 * 1024
+# Fold the usage log into the manifest once it grows past this many bytes
+USAGE_FOLD_BYTES = 64 * 1024
+
+# Filters the query engine matches case-insensitively
+CASELESS = ('type', 'category', 'color', 'season', 'tag', 'color_near')
+
+
+def cache_key(filters):
+    """Return the cache key of QueryEngine.query() keyword arguments."""
+    normalized = {}
+    for name, value in filters.items():
+        if value is None or (name == 'offset' and not value):
+            continue
+        if name in CASELESS:
+            value = value.lower()
+        elif name == 'ids':
+            value = sorted(set(value))
+        normalized[name] = value
+    return hashlib.sha1(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def file_digest(path):
+    """Return the SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(previous=None):
+    """Return [[size, mtime_ns, sha1], ...] for SOURCES (None for a missing file).
+
+    Hashes are reused from previous for files whose size and mtime are unchanged.
+    """
+    previous = previous or [None] * len(SOURCES)
+    result = []
+    for path, before in zip(SOURCES, previous):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            result.append(None)
+            continue
+        if before and before[:2] == [stat.st_size, stat.st_mtime_ns]:
+            result.append(before)
+        else:
+            result.append([stat.st_size, stat.st_mtime_ns, file_digest(path)])
+    return result
+
+
+def _same_contents(a, b):
+    return [f and f[::2] for f in a] == [f and f[::2] for f in b]
+
+
+def _empty_manifest():
+    return {'version': CACHE_VERSION, 'fingerprint': None, 'entries': {},
+            'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def load_manifest():
+    """Return the manifest, or an empty one if it is missing or unreadable."""
+    try:
+        with open(MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == CACHE_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return _empty_manifest()
+
+
+def save_manifest(manifest):
+    """Write the manifest (best effort: the cache is only an optimization)."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        wardrobe_lock.write_atomic(MANIFEST, json.dumps(manifest, separators=(',', ':')).encode('utf-8'))
+    except OSError as e:
+        print(f"Warning: could not update query cache: {e}", file=sys.stderr)
+
+
+def log_usage(key):
+    """Record a hit on key, or a miss if key is None, without rewriting the manifest."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(USAGE_LOG, 'a', encoding='utf-8') as f:
+            f.write(f"{key or '-'}\t{time.time():.3f}\n")
+            size = f.tell()
+        if size > USAGE_FOLD_BYTES:
+            with updating():
+                pass
+    except OSError as e:
+        print(f"Warning: could not update query cache: {e}", file=sys.stderr)
+
+
+def read_usage(path=None):
+    """Return (key -> last hit time, hits, misses) from a usage log."""
+    used, hits, misses = {}, 0, 0
+    try:
+        with open(path or USAGE_LOG, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) != 2:
+                    continue
+                if parts[0] == '-':
+                    misses += 1
+                    continue
+                hits += 1
+                try:
+                    used[parts[0]] = max(used.get(parts[0], 0.0), float(parts[1]))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return used, hits, misses
+
+
+def _fold_usage(manifest):
+    """Move the usage log into the manifest's counters and LRU times."""
+    folding = USAGE_LOG.with_name(USAGE_LOG.name + '.folding')
+    if not folding.exists():
+        try:
+            os.replace(USAGE_LOG, folding)
+        except FileNotFoundError:
+            return
+    used, hits, misses = read_usage(folding)
+    manifest['hits'] += hits
+    manifest['misses'] += misses
+    for key, when in used.items():
+        entry = manifest['entries'].get(key)
+        if entry is not None:
+            entry['used'] = max(entry['used'], when)
+    folding.unlink()
+
+
+@contextmanager
+def updating():
+    """Yield the manifest under the cache lock, with the usage log folded in, and save it.
+
+    Raises OSError if the cache directory cannot be created or locked.
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with wardrobe_lock.exclusive(LOCK_PATH):
+        manifest = load_manifest()
+        _fold_usage(manifest)
+        yield manifest
+        save_manifest(manifest)
+
+
+def _result_path(key):
+    return CACHE_DIR / f"{key}.pickle"
+
+
+def _drop(manifest, keys):
+    for key in keys:
+        manifest['entries'].pop(key, None)
+        try:
+            _result_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _validate(manifest):
+    """Empty the manifest's entries if the source files changed. Returns True if it changed."""
+    current = fingerprint(manifest['fingerprint'])
+    if current == manifest['fingerprint']:
+        return False
+    if manifest['fingerprint'] is None or not _same_contents(current, manifest['fingerprint']):
+        if manifest['entries']:
+            manifest['invalidations'] += 1
+        _drop(manifest, list(manifest['entries']))
+    manifest['fingerprint'] = current
+    return True
+
+
+def lookup(filters):
+    """Return the cached result of a query, or None on a miss (counted either way).
+
+    Only appends to the usage log; the manifest is rewritten just when the
+    source files changed, so the new fingerprint is hashed once.
+    """
+    manifest = load_manifest()
+    if fingerprint(manifest['fingerprint']) != manifest['fingerprint']:
+        try:
+            with updating() as manifest:
+                _validate(manifest)
+        except OSError as e:
+            print(f"Warning: could not update query cache: {e}", file=sys.stderr)
+            return None
+
+    key = cache_key(filters)
+    result = None
+    if key in manifest['entries']:
+        try:
+            with open(_result_path(key), 'rb') as f:
+                result = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass  # replaced by the store() that follows the miss
+    log_usage(key if result is not None else None)
+    return result
+
+
+def store(filters, result):
+    """Cache the result of a query, evicting least recently used results."""
+    key = cache_key(filters)
+    data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) > MAX_BYTES:
+        return
+    try:
+        with updating() as manifest:
+            _validate(manifest)
+            wardrobe_lock.write_atomic(_result_path(key), data)
+            manifest['entries'][key] = {'used': time.time(), 'bytes': len(data), 'count': len(result)}
+
+            by_age = sorted(manifest['entries'], key=lambda k: manifest['entries'][k]['used'])
+            total = sum(entry['bytes'] for entry in manifest['entries'].values())
+            evict = []
+            while len(by_age) - len(evict) > MAX_ENTRIES or total > MAX_BYTES:
+                oldest = by_age[len(evict)]
+                total -= manifest['entries'][oldest]['bytes']
+                evict.append(oldest)
+            _drop(manifest, evict)
+    except OSError as e:
+        print(f"Warning: could not update query cache: {e}", file=sys.stderr)
+
+
+def invalidate():
+    """Drop every cached result; called after writes to the wardrobe files."""
+    if not load_manifest()['entries']:
+        return
+    try:
+        with updating() as manifest:
+            if manifest['entries']:
+                _drop(manifest, list(manifest['entries']))
+                manifest['invalidations'] += 1
+            manifest['fingerprint'] = None
+    except OSError as e:
+        print(f"Warning: could not update query cache: {e}", file=sys.stderr)
+
+
+def stats():
+    """Return the counters and size of the cache, including lookups not yet folded in."""
+    manifest = load_manifest()
+    _, hits, misses = read_usage()
+    manifest['hits'] += hits
+    manifest['misses'] += misses
+    lookups = manifest['hits'] + manifest['misses']
+    return {
+        'entries': len(manifest['entries']),
+        'bytes': sum(entry['bytes'] for entry in manifest['entries'].values()),
+        'hits': manifest['hits'],
+        'misses': manifest['misses'],
+        'hitRate': round(manifest['hits'] / lookups, 4) if lookups else None,
+        'invalidations': manifest['invalidations'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Inspect or clear the wardrobe_query.py result cache',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Is the cache earning its keep?
+  python scripts/query_cache.py stats
+
+  # Start over, counters included
+  python scripts/query_cache.py clear --reset
+
+  # Bypass the cache for one query
+  python scripts/wardrobe_query.py --type tops --no-cache
+        """
+    )
+    parser.add_argument('command', choices=['stats', 'clear'], help='Action to perform')
+    parser.add_argument('--reset', action='store_true', help='With clear: also zero the hit/miss counters')
+    parser.add_argument('--json', action='store_true', help='Output stats as JSON')
+    args = parser.parse_args()
+
+    if args.command == 'clear':
+        try:
+            with updating() as manifest:
+                count = len(manifest['entries'])
+                _drop(manifest, list(manifest['entries']))
+                if args.reset:
+                    manifest.update(_empty_manifest())
+        except OSError as e:
+            print(f"Error: could not clear the query cache: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Cleared {count} cached result(s)")
+        return
+
+    summary = stats()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    hit_rate = f"{summary['hitRate']:.1%}" if summary['hitRate'] is not None else 'n/a'
+    print(f"Cached results: {summary['entries']} ({summary['bytes'] / 1024:.1f} KB, "
+          f"max {MAX_ENTRIES} / {MAX_BYTES // (1024 * 1024)} MB)")
+    print(f"Hits:           {summary['hits']}")
+    print(f"Misses:         {summary['misses']}")
+    print(f"Hit rate:       {hit_rate}")
+    print(f"Invalidations:  {summary['invalidations']}")
+
+
+if __name__ == '__main__':
+    main()
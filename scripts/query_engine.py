@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Query Engine
+Precomputed inverted index over wardrobe_index.json for fast filtering.
+
+Each filterable field (type, category, primary color, season, tag) maps a normalized
+value to the set of row positions holding it, and formality is kept as a sorted
+column for range lookups. Temperature ranges (tempRange, in Fahrenheit) live in a
+centered interval tree, which finds the items wearable at a temperature or
+overlapping a range in O(log n + k). lastWorn and wearCount are sorted columns
+too, so "not worn since" is a bisect and sorting by either (with a limit) walks
+the column instead of sorting the result. A query intersects the matching postings
+smallest first, so its cost follows the size of the result rather than the size
+of the wardrobe.
+
+The engine is built once from wardrobe_index.json and cached next to it as
+wardrobe_index.engine.pickle, with the entries themselves in the columnar
+wardrobe_index.snapshot (see index_snapshot.py) so loading the cache does not
+recreate every entry. Both are rebuilt automatically whenever the index file
+changes size or modification time. Wear events still pending in the
+wear log are overlaid at query time, so the columns stay current between
+compactions without rebuilding the engine.
+
+Usage:
+    # Rebuild the cached engine and show posting statistics
+    python scripts/query_engine.py
+"""
+
+import heapq
+import json
+import pickle
+import sys
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from pathlib import Path
+
+import color_engine
+import index_snapshot
+import wardrobe_lock
+import wardrobe_paths
+
+WARDROBE_INDEX = wardrobe_paths.WARDROBE_INDEX
+
+ENGINE_VERSION = 4
+POSTING_FIELDS = ('type', 'category', 'color', 'season', 'tag')
+SORT_KEYS = ('last-worn', 'wear-count')
+# Index fields accepted by query(order=...)
+ORDER_FIELDS = ('id', 'name', 'type', 'category', 'primaryColor', 'formality', 'wearCount', 'lastWorn')
+
+# Default CIEDE2000 radius for color_near queries
+DEFAULT_MAX_DELTA = 15
+
+
+def order_entries(entries, order):
+    """Sort entries in place by fields ('name', or '-formality' for descending).
+
+    Missing values sort last either way; ties keep their original order.
+    """
+    for field in reversed(order):
+        descending = field.startswith('-')
+        field = field.lstrip('-')
+        if descending:
+            entries.sort(key=lambda entry: (entry.get(field) is not None, entry.get(field)), reverse=True)
+        else:
+            entries.sort(key=lambda entry: (entry.get(field) is None, entry.get(field)))
+    return entries
+
+
+def engine_path(index_path):
+    """Return the cache path for the engine built from index_path."""
+    index_path = Path(index_path)
+    return index_path.with_name(index_path.stem + '.engine.pickle')
+
+
+def build_interval_tree(intervals):
+    """Build a centered interval tree over (low, high, pos) intervals.
+
+    Returns a flat list of nodes (root first) of the form
+    (center, left, right, low_keys, low_pos, neg_high_keys, high_pos): the
+    intervals containing center sorted by low bound and by descending high bound
+    (stored negated so bisect works), plus the indices of the child nodes holding
+    the intervals entirely below and above center (-1 when empty).
+    """
+    nodes = []
+
+    def build(subset):
+        if not subset:
+            return -1
+        points = sorted(point for low, high, _ in subset for point in (low, high))
+        center = points[len(points) // 2]
+        here = [iv for iv in subset if iv[0] <= center <= iv[1]]
+        node = len(nodes)
+        nodes.append(None)  # filled in once the children are built
+        left = build([iv for iv in subset if iv[1] < center])
+        right = build([iv for iv in subset if iv[0] > center])
+        by_low = sorted((low, pos) for low, _, pos in here)
+        by_high = sorted((-high, pos) for _, high, pos in here)
+        nodes[node] = (center, left, right,
+                       [k for k, _ in by_low], [p for _, p in by_low],
+                       [k for k, _ in by_high], [p for _, p in by_high])
+        return node
+
+    build(list(intervals))
+    return nodes
+
+
+def stab_interval_tree(nodes, point):
+    """Return the positions of every interval containing point."""
+    found = []
+    node = 0 if nodes else -1
+    while node != -1:
+        center, left, right, low_keys, low_pos, neg_high_keys, high_pos = nodes[node]
+        if point < center:
+            found.extend(low_pos[:bisect_right(low_keys, point)])
+            node = left
+        elif point > center:
+            found.extend(high_pos[:bisect_right(neg_high_keys, -point)])
+            node = right
+        else:
+            found.extend(low_pos)
+            break
+    return found
+
+
+class QueryEngine:
+    """Inverted index over a list of wardrobe index entries."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.id_pos = {}
+        self.postings = {field: {} for field in POSTING_FIELDS}
+
+        formality_rows = []
+        temp_rows = []
+        worn_rows = []
+        count_rows = []
+        for pos, entry in enumerate(entries):
+            self.id_pos[entry['id']] = pos
+            self._add(pos, 'type', entry.get('type', ''))
+            self._add(pos, 'category', entry.get('category', ''))
+            self._add(pos, 'color', entry.get('primaryColor', ''))
+            for season in entry.get('seasons', []):
+                self._add(pos, 'season', season)
+            for tag in entry.get('tags', []):
+                self._add(pos, 'tag', tag)
+            formality_rows.append((entry.get('formality', 0), pos))
+            temp_range = entry.get('tempRange')
+            if temp_range:
+                temp_rows.append((temp_range['min'], temp_range['max'], pos))
+            # Never-worn items sort first ('' precedes every ISO date)
+            worn_rows.append((entry.get('lastWorn') or '', pos))
+            count_rows.append((entry.get('wearCount', 0), pos))
+
+        # Sorted formality column: parallel key/position lists for bisect
+        formality_rows.sort()
+        self.formality_keys = [f for f, _ in formality_rows]
+        self.formality_pos = [p for _, p in formality_rows]
+        self.formality = [entry.get('formality', 0) for entry in entries]
+
+        # Interval tree for stabbing queries plus the sorted low bounds, so an
+        # overlap query is "contains the range start" + "starts inside the range"
+        self.temp_tree = build_interval_tree(temp_rows)
+        temp_rows.sort()
+        self.temp_low_keys = [low for low, _, _ in temp_rows]
+        self.temp_low_pos = [pos for _, _, pos in temp_rows]
+
+        # Sorted wear columns: least recently / least often worn first
+        worn_rows.sort()
+        self.worn_keys = [k for k, _ in worn_rows]
+        self.worn_pos = [p for _, p in worn_rows]
+        count_rows.sort()
+        self.count_keys = [k for k, _ in count_rows]
+        self.count_pos = [p for _, p in count_rows]
+
+    def _add(self, pos, field, value):
+        self.postings[field].setdefault((value or '').lower(), set()).add(pos)
+
+    def _color_postings(self, color):
+        """Union the postings of every color value containing the query substring."""
+        needle = color.lower()
+        matches = [posting for value, posting in self.postings['color'].items() if needle in value]
+        if len(matches) == 1:
+            return matches[0]
+        return set().union(*matches)
+
+    def _color_near_postings(self, color_near, max_delta):
+        """Union the postings of every color value within max_delta of color_near.
+
+        Each distinct color value is compared once, however many items share it.
+        """
+        target = color_engine.lab(color_near)
+        if target is None:
+            return set()
+        matches = [posting for value, posting in self.postings['color'].items()
+                   if color_engine.lab(value) is not None
+                   and color_engine.delta_e(target, color_engine.lab(value)) <= max_delta]
+        return set().union(*matches)
+
+    def _temp_postings(self, low, high):
+        """Positions of items whose tempRange overlaps [low, high] (Fahrenheit)."""
+        result = set(stab_interval_tree(self.temp_tree, low))
+        start = bisect_right(self.temp_low_keys, low)
+        end = bisect_right(self.temp_low_keys, high)
+        result.update(self.temp_low_pos[start:end])
+        return result
+
+    def _pending_positions(self, pending):
+        """Map positions with pending wear to their (count, latest date)."""
+        return {self.id_pos[item_id]: wear for item_id, wear in (pending or {}).items()
+                if item_id in self.id_pos}
+
+    def _wear_key(self, sort_by, pos, wear):
+        """Return the sort key of a position, with pending wear applied."""
+        entry = self.entries[pos]
+        if sort_by == 'wear-count':
+            return entry.get('wearCount', 0) + (wear[0] if wear else 0)
+        last_worn = entry.get('lastWorn') or ''
+        return max(last_worn, wear[1]) if wear else last_worn
+
+    def _not_worn_postings(self, since, pending):
+        """Positions of items not worn on or after since (never-worn included)."""
+        result = set(self.worn_pos[:bisect_left(self.worn_keys, since)])
+        for pos, (_, latest) in pending.items():
+            if latest >= since:
+                result.discard(pos)
+        return result
+
+    def _sorted_positions(self, result, sort_by, limit, pending):
+        """Return up to limit positions from result (None = all) ordered by sort_by."""
+        if result is not None and len(result) * 8 < len(self.entries):
+            # Small result: sorting it beats walking the column
+            order = sorted(result, key=lambda pos: (self._wear_key(sort_by, pos, pending.get(pos)), pos))
+            return order[:limit]
+
+        keys, positions = ((self.count_keys, self.count_pos) if sort_by == 'wear-count'
+                           else (self.worn_keys, self.worn_pos))
+        # Walk the stored column, skipping items with pending wear, and merge
+        # those back in at their current keys
+        stored = ((key, pos) for key, pos in zip(keys, positions) if pos not in pending)
+        moved = sorted((self._wear_key(sort_by, pos, wear), pos) for pos, wear in pending.items())
+        ordered = (pos for _, pos in heapq.merge(stored, moved))
+        if result is not None:
+            ordered = (pos for pos in ordered if pos in result)
+        return list(islice(ordered, limit))
+
+    def _with_wear(self, pos, pending):
+        """Return the entry at pos with any pending wear folded into a copy."""
+        entry = self.entries[pos]
+        wear = pending.get(pos)
+        if wear is None:
+            return entry
+        count, latest = wear
+        last_worn = entry.get('lastWorn')
+        return dict(entry, wearCount=entry.get('wearCount', 0) + count,
+                    lastWorn=latest if last_worn is None or latest > last_worn else last_worn)
+
+    def query(self, **filters):
+        """Return matching index entries in wardrobe order (see iter_query)."""
+        return list(self.iter_query(**filters))
+
+    def iter_query(self, type=None, category=None, color=None, formality=None,
+                   season=None, tag=None, ids=None, color_near=None, max_delta=None,
+                   temp=None, temp_range=None, not_worn_since=None, sort_by=None,
+                   order=None, offset=0, limit=None, pending=None):
+        """Yield matching index entries in wardrobe order.
+
+        Args mirror the wardrobe_query.py flags. formality is a (min, max) tuple;
+        color_near matches primary colors within max_delta (CIEDE2000) of a color.
+        temp matches items rated for that temperature and temp_range, a (min, max)
+        tuple, items whose range overlaps it (both in Fahrenheit); items without a
+        tempRange never match either. not_worn_since is an ISO date; items last
+        worn before it, or never, match. sort_by ('last-worn' or 'wear-count')
+        orders the result least recently / least often worn first; order is a
+        list of ORDER_FIELDS to sort by instead ('-' prefix for descending, see
+        order_entries). offset skips that many entries and limit keeps the next
+        ones. pending is the wear log summary (item_id -> (count, latest date))
+        to overlay on the stored wear fields.
+
+        Entries are produced as the positions are walked, so unsorted queries
+        can be consumed before the whole result is materialized.
+        """
+        pending = self._pending_positions(pending)
+        postings = []
+        if type:
+            postings.append(self.postings['type'].get(type.lower(), set()))
+        if category:
+            postings.append(self.postings['category'].get(category.lower(), set()))
+        if color:
+            postings.append(self._color_postings(color))
+        if color_near:
+            postings.append(self._color_near_postings(color_near, max_delta or DEFAULT_MAX_DELTA))
+        if season:
+            postings.append(self.postings['season'].get(season.lower(), set()))
+        if tag:
+            postings.append(self.postings['tag'].get(tag.lower(), set()))
+        if ids:
+            postings.append({self.id_pos[i] for i in ids if i in self.id_pos})
+        if temp is not None:
+            postings.append(self._temp_postings(temp, temp))
+        if temp_range:
+            postings.append(self._temp_postings(*temp_range))
+        if not_worn_since:
+            postings.append(self._not_worn_postings(not_worn_since, pending))
+
+        # Formality is a range over the sorted column; only materialize it when
+        # it is the most selective filter, otherwise check candidates directly.
+        range_lo = range_hi = 0
+        if formality:
+            min_f, max_f = formality
+            range_lo = bisect_left(self.formality_keys, min_f)
+            range_hi = bisect_right(self.formality_keys, max_f)
+
+        if not postings and not formality:
+            return self._finish(None, sort_by, order, offset, limit, pending)
+
+        postings.sort(key=len)
+        if formality and (not postings or range_hi - range_lo < len(postings[0])):
+            result = set(self.formality_pos[range_lo:range_hi])
+            check_formality = False
+        else:
+            result = set(postings.pop(0))
+            check_formality = bool(formality)
+
+        for posting in postings:
+            if not result:
+                break
+            result &= posting
+
+        if check_formality:
+            min_f, max_f = formality
+            result = {pos for pos in result if min_f <= self.formality[pos] <= max_f}
+
+        return self._finish(result, sort_by, order, offset, limit, pending)
+
+    def _finish(self, result, sort_by, order, offset, limit, pending):
+        """Order and page a set of matching positions (None = all) into entries."""
+        count = len(self.entries)
+        stop = None if limit is None else offset + limit
+        if order:
+            positions = range(count) if result is None else sorted(result)
+            entries = order_entries([self._with_wear(pos, pending) for pos in positions], order)
+            return iter(entries[offset:stop])
+        if sort_by:
+            positions = self._sorted_positions(result, sort_by, stop, pending)[offset:]
+        elif result is None:
+            positions = range(min(offset, count), count if stop is None else min(stop, count))
+        else:
+            positions = sorted(result)[offset:stop]
+        return (self._with_wear(pos, pending) for pos in positions)
+
+    def to_state(self):
+        """Return the plain-data state used for persistence."""
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an engine from to_state() output without re-indexing."""
+        engine = cls.__new__(cls)
+        engine.__dict__.update(state)
+        return engine
+
+    def stats(self):
+        """Return the number of distinct values per posting field."""
+        return {field: len(values) for field, values in self.postings.items()}
+
+
+def build_engine(index_path=None, snapshot=None):
+    """Build an engine from the index file and persist it next to the index.
+
+    With a wardrobe_lock snapshot, the index file it pinned is read.
+    """
+    index_path = Path(index_path or WARDROBE_INDEX)
+    if snapshot is None:
+        signature = wardrobe_paths.file_signature(index_path)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index_data = json.load(f)
+    else:
+        signature = snapshot.signature(index_path)
+        index_data = json.loads(snapshot.read_bytes(index_path).decode('utf-8'))
+
+    # Indexes created from older templates use an "index" key
+    engine = QueryEngine(index_data.get('items', index_data.get('index', [])))
+    if snapshot is not None and snapshot.signature(index_path) != _disk_signature(index_path):
+        return engine  # an older generation: do not replace the caches of the current one
+    try:
+        written = index_snapshot.write_snapshot(index_path, engine.entries, signature)
+    except OSError as e:
+        print(f"Warning: could not write index snapshot: {e}", file=sys.stderr)
+        written = None
+    save_engine(engine, index_path, signature, in_snapshot=written is not None)
+    return engine
+
+
+def _disk_signature(path):
+    try:
+        return wardrobe_paths.file_signature(path)
+    except FileNotFoundError:
+        return None
+
+
+def save_engine(engine, index_path, signature, in_snapshot=False):
+    """Persist an engine to its cache file (best effort).
+
+    With in_snapshot, the entries are left out and read back from the index
+    snapshot on load.
+    """
+    cache_path = engine_path(index_path)
+    state = engine.to_state()
+    if in_snapshot:
+        state['entries'] = None
+    try:
+        # Concurrent readers may rebuild the cache too, so this must be atomic
+        with wardrobe_lock.atomic_file(cache_path) as f:
+            pickle.dump({'version': ENGINE_VERSION, 'source': signature, 'state': state},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"Warning: could not cache query engine: {e}", file=sys.stderr)
+
+
+def load_engine(index_path=None, snapshot=None):
+    """Load the cached engine, rebuilding it if the index has changed.
+
+    With a wardrobe_lock snapshot, the cache must match the index file it pinned.
+    """
+    index_path = Path(index_path or WARDROBE_INDEX)
+    cache_path = engine_path(index_path)
+
+    if cache_path.exists():
+        try:
+            if snapshot is None:
+                signature = wardrobe_paths.file_signature(index_path)
+            else:
+                signature = snapshot.signature(index_path)
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if (cached.get('version') == ENGINE_VERSION
+                    and tuple(cached.get('source', ())) == signature):
+                state = cached['state']
+                if state['entries'] is None:
+                    state['entries'] = index_snapshot.load_snapshot(index_path, signature)
+                if state['entries'] is not None:
+                    return QueryEngine.from_state(state)
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+            pass
+
+    return build_engine(index_path, snapshot)
+
+
+def main():
+    engine = build_engine()
+    print(f"Built query engine for {len(engine.entries)} items: {engine_path(WARDROBE_INDEX)}")
+    for field, count in engine.stats().items():
+        print(f"  {field:10} {count} distinct values")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Search Index
+Persistent BM25 full-text search over the descriptive text of each item.
+
+The searchable text of an item is its name (counted twice), metadata.material,
+notes, aiAnalysis.detectedFeatures and aiAnalysis.stylingNotes. Text is lowercased,
+split into words, stripped of common stop words and of plural "s", and kept as an
+inverted index (term -> {item ID: weighted term frequency}) with per-item lengths.
+
+The index is stored next to the wardrobe index as wardrobe_index.search.pickle,
+together with a hash of every item's raw record. When wardrobe_items.json (or the
+SQLite database) changes, only records whose hash differs are decoded and
+re-tokenized, and removed items are dropped. An unchanged items file is detected
+from its size and modification time without reading it, and an unchanged
+database from the change count its triggers keep (wardrobe_db.items_generation).
+
+Usage:
+    # Bring the search index up to date and show its size
+    python scripts/search_index.py
+
+    # Search from the query tool, combined with any filters
+    python scripts/wardrobe_query.py --search "zipper pockets stretch" --type bottoms
+"""
+
+import hashlib
+import json
+import math
+import pickle
+import re
+import sys
+from pathlib import Path
+
+import index_sync
+import item_offsets
+import wardrobe_core
+import wardrobe_db
+import wardrobe_lock
+
+SEARCH_VERSION = 1
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Weight of each text field in the term frequencies
+FIELD_WEIGHTS = (
+    (('name',), 2),
+    (('metadata', 'material'), 1),
+    (('notes',), 1),
+    (('aiAnalysis', 'detectedFeatures'), 1),
+    (('aiAnalysis', 'stylingNotes'), 1),
+)
+
+WORD = re.compile(r'[^\W_]+')
+STOP_WORDS = frozenset(
+    'a an and are as at be but by for from has have in into is it its of on or so '
+    'that the this to was were will with'.split()
+)
+
+
+def search_path(index_path=None):
+    """Return the search index path for a wardrobe index file."""
+    index_path = Path(index_path or wardrobe_core.WARDROBE_INDEX)
+    return index_path.with_name(index_path.stem + '.search.pickle')
+
+
+def stem(word):
+    """Strip a plural ending ("pockets" -> "pocket", "accessories" -> "accessory")."""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Split text into normalized search terms."""
+    return [stem(word) for word in WORD.findall(text.casefold()) if word not in STOP_WORDS]
+
+
+def item_text_terms(item):
+    """Return {term: weighted frequency} for an item's searchable fields."""
+    terms = {}
+    for path, weight in FIELD_WEIGHTS:
+        value = item
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if not value:
+            continue
+        text = ' '.join(value) if isinstance(value, list) else str(value)
+        for term in tokenize(text):
+            terms[term] = terms.get(term, 0) + weight
+    return terms
+
+
+class SearchIndex:
+    """BM25 inverted index over item text, updatable one item at a time."""
+
+    def __init__(self):
+        self.docs = {}       # item ID -> (record hash, {term: tf}, length)
+        self.postings = {}   # term -> {item ID: tf}
+        self.total_length = 0
+        self.source = None   # source_signature() of the items the index reflects
+
+    def add(self, item_id, record_hash, terms):
+        self.remove(item_id)
+        length = sum(terms.values())
+        self.docs[item_id] = (record_hash, terms, length)
+        self.total_length += length
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[item_id] = tf
+
+    def remove(self, item_id):
+        doc = self.docs.pop(item_id, None)
+        if doc is None:
+            return
+        _, terms, length = doc
+        self.total_length -= length
+        for term in terms:
+            posting = self.postings[term]
+            del posting[item_id]
+            if not posting:
+                del self.postings[term]
+
+    def search(self, text, allowed=None):
+        """Return [(item_id, score), ...] best first for a free-text query.
+
+        allowed optionally restricts results to a set of item IDs.
+        """
+        n = len(self.docs)
+        if not n:
+            return []
+        average = self.total_length / n or 1
+        scores = {}
+        for term in set(tokenize(text)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for item_id, tf in posting.items():
+                if allowed is not None and item_id not in allowed:
+                    continue
+                length = self.docs[item_id][2]
+                scores[item_id] = scores.get(item_id, 0.0) + idf * tf * (K1 + 1) / (
+                    tf + K1 * (1 - B + B * length / average))
+        return sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))
+
+    def to_state(self):
+        """Return the plain-data state used for persistence."""
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls.__new__(cls)
+        index.__dict__.update(state)
+        return index
+
+
+def source_signature(items_path, conn=None, snapshot=None):
+    """Return what the index is stamped with: the items file signature, or the database generation.
+
+    With a wardrobe_lock snapshot, the signature of the items file it pinned is returned.
+    """
+    if conn is not None:
+        return ['sqlite'] + wardrobe_db.items_generation(conn)
+    if wardrobe_db.backend_enabled():
+        with wardrobe_db.open_db() as conn:
+            return source_signature(items_path, conn)
+    if snapshot is not None:
+        signature = snapshot.signature(items_path)
+        if signature is None:
+            raise FileNotFoundError(f"Items file not found: {items_path}")
+        return list(signature)
+    return list(wardrobe_core.file_signature(items_path))
+
+
+def _pinned_sources(items_path, snapshot):
+    """Return (signature, [(item_id, record_hash)], load) for the items file a snapshot pinned."""
+    signature = source_signature(items_path, snapshot=snapshot)
+    raw = snapshot.read_bytes(items_path)
+    offsets = item_offsets.load_sidecar(items_path, signature) or item_offsets.scan_offsets(raw)
+    if offsets is None:
+        raise ValueError(f"Could not locate item records in {items_path}")
+
+    ordered = sorted(offsets.items(), key=lambda kv: kv[1][0])
+    hashes = [(item_id, hashlib.sha1(raw[off:off + length]).hexdigest()) for item_id, (off, length) in ordered]
+
+    def load(item_ids):
+        return {item_id: json.loads(raw[off:off + length].decode('utf-8'))
+                for item_id in item_ids for off, length in [offsets[item_id]]}
+
+    return signature, hashes, load
+
+
+def _record_sources(items_path, snapshot=None):
+    """Return (signature, [(item_id, record_hash)], load) for the current backend.
+
+    load(item_ids) returns {item_id: item} for the given records. With a
+    wardrobe_lock snapshot, the JSON records are read from the pinned items file.
+    """
+    if wardrobe_db.backend_enabled():
+        with wardrobe_db.open_db() as conn:
+            # Read before the rows: a write in between only makes the next check re-hash
+            signature = source_signature(items_path, conn)
+            rows = conn.execute('SELECT id, data FROM items ORDER BY position').fetchall()
+        data = {row['id']: row['data'] for row in rows}
+        hashes = [(item_id, hashlib.sha1(text.encode('utf-8')).hexdigest()) for item_id, text in data.items()]
+        return signature, hashes, lambda item_ids: {i: json.loads(data[i]) for i in item_ids}
+    if snapshot is not None:
+        return _pinned_sources(items_path, snapshot)
+
+    signature = source_signature(items_path)
+    hashes, _ = index_sync.record_hashes(items_path)
+
+    def load(item_ids):
+        found = item_offsets.read_items(items_path, item_ids)
+        if found is None:  # sidecar went stale meanwhile
+            wanted = set(item_ids)
+            found = {item['id']: item for item in item_offsets.load_items_document(items_path)['items']
+                     if item['id'] in wanted}
+        return found
+
+    return signature, hashes, load
+
+
+def load_index(index_path=None):
+    """Return the stored search index, or an empty one."""
+    try:
+        with open(search_path(index_path), 'rb') as f:
+            stored = pickle.load(f)
+        if stored.get('version') == SEARCH_VERSION:
+            return SearchIndex.from_state(stored['state'])
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError):
+        pass
+    return SearchIndex()
+
+
+def save_index(search, index_path=None):
+    """Persist the search index (best effort)."""
+    try:
+        with wardrobe_lock.atomic_file(search_path(index_path)) as f:
+            pickle.dump({'version': SEARCH_VERSION, 'state': search.to_state()},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"Warning: could not save search index: {e}", file=sys.stderr)
+
+
+def update_index(index_path=None, items_path=None, snapshot=None):
+    """Return an up-to-date search index, re-tokenizing only changed items.
+
+    With a wardrobe_lock snapshot, the index reflects the items file it pinned
+    and is only persisted if that is still the file on disk.
+    Returns (search_index, changed) where changed counts re-indexed and removed items.
+    """
+    items_path = Path(items_path or wardrobe_core.WARDROBE_ITEMS)
+    search = load_index(index_path)
+
+    if search.source == source_signature(items_path, snapshot=snapshot):
+        return search, 0
+
+    signature, hashes, load = _record_sources(items_path, snapshot)
+    current = dict(hashes)
+    stale = [item_id for item_id, record_hash in hashes
+             if search.docs.get(item_id, (None,))[0] != record_hash]
+    removed = [item_id for item_id in search.docs if item_id not in current]
+
+    for item_id in removed:
+        search.remove(item_id)
+    for item_id, item in load(stale).items():
+        search.add(item_id, current[item_id], item_text_terms(item))
+
+    changed = len(stale) + len(removed)
+    if changed or search.source != signature:
+        search.source = signature
+        if snapshot is None or source_signature(items_path) == signature:
+            save_index(search, index_path)
+    return search, changed
+
+
+def main():
+    try:
+        search, changed = update_index()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Search index: {len(search.docs)} items, {len(search.postings)} terms "
+          f"({changed} updated): {search_path()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Telemetry
+Per-phase timings of script invocations, logged locally and summarized on demand.
+
+Pass --timings to wardrobe_query.py, get_item_details.py, update_wardrobe.py or
+generate_recommendation_html.py (or set WARDROBE_TIMINGS=1 for every invocation) to
+append one JSON line per run to data/telemetry.jsonl. A line records the script,
+its arguments and query shape (the options given), the time from process start to
+argument parsing, and the wall time, CPU time, bytes read and written and item
+counts of each phase (load, filter, render, output, write, ...). With --timings
+the same breakdown is also printed to stderr.
+
+Nothing is recorded unless enabled; disabled phases cost one function call.
+Bytes read and written come from /proc/self/io and are omitted where it does not exist.
+
+Usage:
+    # Slowest invocations, most frequent query shapes and per-phase percentiles
+    python scripts/telemetry.py report
+
+    # Only wardrobe_query.py runs since a date, as JSON
+    python scripts/telemetry.py report --script wardrobe_query --since 2025-10-01 --json
+
+    # Start over
+    python scripts/telemetry.py clear
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import wardrobe_paths
+
+TELEMETRY_LOG = wardrobe_paths.DATA_DIR / "telemetry.jsonl"
+
+ENV_VAR = 'WARDROBE_TIMINGS'
+PERCENTILES = (50, 90, 99)
+
+# State of the current invocation; None while telemetry is disabled
+_state = None
+
+
+def _io_counters():
+    """Return (bytes read, bytes written) by this process so far, or None."""
+    try:
+        with open('/proc/self/io', 'rb') as f:
+            fields = dict(line.split(b': ', 1) for line in f.read().splitlines())
+        return int(fields[b'rchar']), int(fields[b'wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _process_age():
+    """Return seconds since this process started (interpreter start-up included), or None."""
+    try:
+        with open('/proc/self/stat', 'rb') as f:
+            # Fields after the parenthesized command name; starttime is field 22
+            start_ticks = int(f.read().rsplit(b')', 1)[1].split()[19])
+        with open('/proc/uptime', 'rb') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def requested(args=None):
+    """Return True if --timings was given or the environment variable is set."""
+    return bool(getattr(args, 'timings', False)) or os.environ.get(ENV_VAR, '') not in ('', '0')
+
+
+def query_shape(args, parser):
+    """Return the sorted option names set to a non-default value, e.g. '--season --type'."""
+    shape = []
+    for action in parser._actions:
+        if not action.option_strings or action.dest in ('help', 'timings'):
+            continue
+        value = getattr(args, action.dest, None)
+        if value is not None and value is not False and value != action.default:
+            shape.append(max(action.option_strings, key=len))
+    return ' '.join(sorted(shape))
+
+
+def enable(script, args=None, parser=None):
+    """Start recording this invocation if telemetry was requested.
+
+    The record is appended to the log when the process exits.
+    """
+    global _state
+    if _state is not None or not requested(args):
+        return
+    _state = {
+        'script': script,
+        'argv': sys.argv[1:],
+        'shape': query_shape(args, parser) if args is not None and parser is not None else '',
+        'print': bool(getattr(args, 'timings', False)),
+        'started': time.time(),
+        'wall': time.perf_counter(),
+        'io': _io_counters(),
+        'startup': {'wall': _process_age(), 'cpu': time.process_time()},
+        'phases': {},
+        'counts': {},
+    }
+    atexit.register(_finish)
+
+
+@contextmanager
+def phase(name):
+    """Accumulate the wall/CPU time and I/O of a block under a phase name."""
+    if _state is None:
+        yield
+        return
+    wall, cpu, io = time.perf_counter(), time.process_time(), _io_counters()
+    try:
+        yield
+    finally:
+        stats = _state['phases'].setdefault(name, {'calls': 0, 'wall': 0.0, 'cpu': 0.0})
+        stats['calls'] += 1
+        stats['wall'] += time.perf_counter() - wall
+        stats['cpu'] += time.process_time() - cpu
+        end_io = _io_counters()
+        if io is not None and end_io is not None:
+            stats['read'] = stats.get('read', 0) + end_io[0] - io[0]
+            stats['written'] = stats.get('written', 0) + end_io[1] - io[1]
+
+
+def count(name, value):
+    """Add to a named item count (e.g. matched, items, written) of this invocation."""
+    if _state is not None:
+        _state['counts'][name] = _state['counts'].get(name, 0) + value
+
+
+def _round(value):
+    return None if value is None else round(value, 6)
+
+
+def _finish():
+    """Write the record of this invocation (registered with atexit)."""
+    if _state is None:
+        return
+    sys.stdout.flush()
+    io = _io_counters()
+    record = {
+        'timestamp': datetime.fromtimestamp(_state['started'], timezone.utc).replace(tzinfo=None).isoformat() + 'Z',
+        'script': _state['script'],
+        'shape': _state['shape'],
+        'argv': _state['argv'],
+        'wall': _round(time.perf_counter() - _state['wall']),
+        'cpu': _round(time.process_time() - _state['startup']['cpu']),
+        'startup': {key: _round(value) for key, value in _state['startup'].items()},
+        'phases': {name: {key: _round(value) if isinstance(value, float) else value
+                          for key, value in stats.items()}
+                   for name, stats in _state['phases'].items()},
+        'counts': _state['counts'],
+    }
+    if io is not None and _state['io'] is not None:
+        record['read'] = io[0] - _state['io'][0]
+        record['written'] = io[1] - _state['io'][1]
+
+    try:
+        with open(TELEMETRY_LOG, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+    except OSError as e:
+        print(f"Warning: could not write telemetry: {e}", file=sys.stderr)
+
+    if _state['print']:
+        print_record(record)
+
+
+def print_record(record):
+    """Print one invocation's phase breakdown to stderr."""
+    startup = record['startup']
+    lines = [f"timings: {record['script']} wall {record['wall'] * 1000:.1f}ms, cpu {record['cpu'] * 1000:.1f}ms"
+             + (f", start-up {startup['wall'] * 1000:.1f}ms" if startup.get('wall') is not None else '')]
+    for name, stats in record['phases'].items():
+        io = ''
+        if 'read' in stats:
+            io = f"  read {stats['read']}B  written {stats['written']}B"
+        lines.append(f"  {name:12} wall {stats['wall'] * 1000:9.2f}ms  cpu {stats['cpu'] * 1000:9.2f}ms{io}")
+    if record['counts']:
+        lines.append('  counts: ' + ', '.join(f"{name} {value}" for name, value in record['counts'].items()))
+    print('\n'.join(lines), file=sys.stderr)
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def read_log(log_path=None, script=None, since=None):
+    """Return logged records, optionally for one script and from a date on."""
+    log_path = Path(log_path or TELEMETRY_LOG)
+    if not log_path.exists():
+        return []
+    records = []
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # partial line from an interrupted write
+            if script and record.get('script') != script:
+                continue
+            if since and record.get('timestamp', '') < since:
+                continue
+            records.append(record)
+    return records
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * pct // 100) - 1)]
+
+
+def summarize(records, limit=10):
+    """Aggregate records into slowest invocations, frequent shapes and phase percentiles."""
+    shapes = {}
+    phases = {}
+    for record in records:
+        key = f"{record['script']} {record['shape']}".strip()
+        shapes.setdefault(key, []).append(record['wall'])
+        for name, stats in record.get('phases', {}).items():
+            phases.setdefault(f"{record['script']}:{name}", []).append(stats['wall'])
+
+    slowest = sorted(records, key=lambda record: -record['wall'])[:limit]
+    frequent = sorted(shapes.items(), key=lambda pair: (-len(pair[1]), -sum(pair[1])))[:limit]
+    return {
+        'invocations': len(records),
+        'slowest': [{'timestamp': record['timestamp'], 'script': record['script'],
+                     'wall': record['wall'], 'argv': record['argv']} for record in slowest],
+        'frequent': [{'shape': shape, 'count': len(walls), 'total': round(sum(walls), 6),
+                      **{f"p{pct}": percentile(walls, pct) for pct in PERCENTILES}}
+                     for shape, walls in frequent],
+        'phases': {name: {'count': len(walls),
+                          **{f"p{pct}": percentile(walls, pct) for pct in PERCENTILES},
+                          'max': max(walls)}
+                   for name, walls in sorted(phases.items())},
+    }
+
+
+def ms(seconds):
+    return f"{seconds * 1000:.1f}ms"
+
+
+def print_report(summary):
+    print(f"{summary['invocations']} invocation(s)\n")
+
+    print("Slowest invocations:")
+    for record in summary['slowest']:
+        print(f"  {ms(record['wall']):>10}  {record['timestamp'][:19]}  {record['script']} {' '.join(record['argv'])}")
+
+    print("\nMost frequent shapes:")
+    for shape in summary['frequent']:
+        print(f"  {shape['count']:>6}x  p50 {ms(shape['p50']):>9}  p90 {ms(shape['p90']):>9}  "
+              f"total {ms(shape['total']):>10}  {shape['shape']}")
+
+    print("\nPhases:")
+    for name, stats in summary['phases'].items():
+        print(f"  {name:40} n={stats['count']:<6} p50 {ms(stats['p50']):>9}  p90 {ms(stats['p90']):>9}  "
+              f"p99 {ms(stats['p99']):>9}  max {ms(stats['max']):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Summarize logged script timings',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Record timings for one query, then for every invocation
+  python scripts/wardrobe_query.py --type tops --timings
+  export WARDROBE_TIMINGS=1
+
+  # Slowest invocations, most frequent shapes and phase percentiles
+  python scripts/telemetry.py report --limit 5
+        """
+    )
+    parser.add_argument('command', choices=['report', 'clear'], help='Action to perform')
+    parser.add_argument('--script', help='Only invocations of this script (e.g. wardrobe_query)')
+    parser.add_argument('--since', help='Only invocations on/after this date (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, default=10, help='Entries per list (default: 10)')
+    parser.add_argument('--json', action='store_true', help='Output JSON')
+    args = parser.parse_args()
+
+    if args.command == 'clear':
+        try:
+            TELEMETRY_LOG.unlink()
+        except FileNotFoundError:
+            pass
+        print(f"Cleared {TELEMETRY_LOG}")
+        return
+
+    records = read_log(script=args.script, since=args.since)
+    if not records:
+        print(f"No telemetry recorded in {TELEMETRY_LOG} (use --timings or {ENV_VAR}=1)", file=sys.stderr)
+        sys.exit(1)
+
+    summary = summarize(records, args.limit)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+
+if __name__ == '__main__':
+    main()
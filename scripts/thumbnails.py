@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Thumbnails
+Content-hashed cache of resized wardrobe photos for the recommendation pages.
+
+Each source image under images/ is resized to a few widths (and optionally WebP)
+into images/.thumbnails/, named by the SHA-256 of the source file, so identical
+photos share thumbnails and a replaced photo gets new ones. manifest.json maps
+each source path to its signature (size and modification time) and variants;
+unchanged images are skipped without being re-read. Generation runs across a
+process pool.
+
+generate_recommendation_html.py references cached thumbnails through srcset and
+falls back to the full image when an image has none (or has changed since).
+
+Requires Pillow for generation (pip install Pillow); rendering works without it.
+
+Usage:
+    # Generate thumbnails for every image under images/
+    python scripts/thumbnails.py warm
+
+    # Also write WebP variants, using 4 worker processes
+    python scripts/thumbnails.py warm --webp --workers 4
+
+    # Show cache status
+    python scripts/thumbnails.py status
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import wardrobe_core
+import wardrobe_lock
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional: only needed to generate thumbnails
+    Image = None
+
+IMAGES_DIR = wardrobe_core.BASE_PATH / "images"
+THUMBNAILS_DIR = IMAGES_DIR / ".thumbnails"
+MANIFEST_PATH = THUMBNAILS_DIR / "manifest.json"
+
+DEFAULT_WIDTHS = (320, 640)
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff'}
+MIME_TYPES = {'jpg': 'image/jpeg', 'png': 'image/png', 'webp': 'image/webp'}
+
+# Rendered width of .item-image in recommendation.html
+SIZES = '(max-width: 600px) 90vw, 360px'
+
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def relative_path(path):
+    """Return a path relative to the project root, as stored in imagePath."""
+    return Path(path).relative_to(wardrobe_core.BASE_PATH).as_posix()
+
+
+def load_manifest():
+    """Return the thumbnail manifest (cached while unchanged), or {}."""
+    if not MANIFEST_PATH.exists():
+        return {}
+    try:
+        return wardrobe_core.cached_json(MANIFEST_PATH)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    wardrobe_lock.write_json_atomic(MANIFEST_PATH, manifest, sort_keys=True)
+
+
+def variants(image_path):
+    """Return {mime_type: [(path, width), ...]} of cached thumbnails for an image.
+
+    image_path is an imagePath value (relative to the project root). Returns {}
+    when there are no thumbnails or the source changed since they were made.
+    """
+    entry = load_manifest().get(image_path)
+    if not entry or not entry.get('variants'):
+        return {}
+    try:
+        if list(wardrobe_core.file_signature(wardrobe_core.BASE_PATH / image_path)) != entry['source']:
+            return {}
+    except OSError:
+        return {}
+
+    grouped = {}
+    for width, path, mime in entry['variants']:
+        grouped.setdefault(mime, []).append((path, width))
+    return grouped
+
+
+def is_fresh(entry, source_path):
+    """True if a manifest entry still describes source_path and its files exist."""
+    if not entry:
+        return False
+    try:
+        if list(wardrobe_core.file_signature(source_path)) != entry['source']:
+            return False
+    except OSError:
+        return False
+    return all((wardrobe_core.BASE_PATH / path).exists() for _, path, _ in entry['variants'])
+
+
+def _save_image(image, out_path, fmt):
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with wardrobe_lock.atomic_file(out_path) as f:
+        if fmt == 'jpg':
+            image.convert('RGB').save(f, 'JPEG', quality=82, optimize=True, progressive=True)
+        elif fmt == 'webp':
+            image.save(f, 'WEBP', quality=80, method=4)
+        else:
+            image.save(f, 'PNG', optimize=True)
+
+
+def make_thumbnails(source_path, widths=DEFAULT_WIDTHS, webp=False):
+    """Create the thumbnails for one image. Returns its manifest entry.
+
+    Variants already present under the content hash are reused, not re-encoded.
+    """
+    source_path = Path(source_path)
+    signature = list(wardrobe_core.file_signature(source_path))
+    digest = file_sha256(source_path)
+
+    with Image.open(source_path) as opened:
+        image = ImageOps.exif_transpose(opened)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        formats = ['png' if has_alpha else 'jpg'] + (['webp'] if webp else [])
+
+        entry_variants = []
+        for width in sorted(widths):
+            if width >= image.width:
+                continue
+            resized = None
+            for fmt in formats:
+                out_path = THUMBNAILS_DIR / digest[:2] / f"{digest}-{width}.{fmt}"
+                if not out_path.exists():
+                    if resized is None:
+                        height = max(1, round(image.height * width / image.width))
+                        resized = image.resize((width, height), Image.LANCZOS)
+                    _save_image(resized, out_path, fmt)
+                entry_variants.append([width, relative_path(out_path), MIME_TYPES[fmt]])
+
+        return {'source': signature, 'sha256': digest, 'width': image.width,
+                'widths': sorted(widths), 'webp': webp, 'variants': entry_variants}
+
+
+def _warm_one(args):
+    source_path, widths, webp = args
+    try:
+        return relative_path(source_path), make_thumbnails(source_path, widths, webp), None
+    except Exception as e:  # report unreadable images without stopping the run
+        return relative_path(source_path), None, f"{type(e).__name__}: {e}"
+
+
+def find_images(root=None):
+    """Yield every image file under images/ (excluding the thumbnail cache)."""
+    root = Path(root or IMAGES_DIR)
+    for path in sorted(root.rglob('*')):
+        if THUMBNAILS_DIR in path.parents:
+            continue
+        if path.suffix.lower() in IMAGE_EXTENSIONS and path.is_file():
+            yield path
+
+
+def warm(widths=DEFAULT_WIDTHS, webp=False, workers=None):
+    """Generate missing thumbnails for the whole images/ tree.
+
+    Returns (generated, skipped, failed) counts.
+    """
+    THUMBNAILS_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = dict(load_manifest())
+    sources = list(find_images())
+
+    todo = []
+    for path in sources:
+        entry = manifest.get(relative_path(path))
+        if (entry and entry.get('widths') == sorted(widths) and entry.get('webp') == webp
+                and is_fresh(entry, path)):
+            continue
+        todo.append((path, tuple(widths), webp))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo) or 1))
+    if workers == 1:
+        results = [_warm_one(task) for task in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_warm_one, todo))
+
+    failed = 0
+    for rel_path, entry, error in results:
+        if error:
+            failed += 1
+            print(f"Error: {rel_path}: {error}", file=sys.stderr)
+        else:
+            manifest[rel_path] = entry
+
+    # Forget images that no longer exist
+    current = {relative_path(path) for path in sources}
+    manifest = {rel_path: entry for rel_path, entry in manifest.items() if rel_path in current}
+    save_manifest(manifest)
+
+    return len(results) - failed, len(sources) - len(todo), failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate and inspect the wardrobe thumbnail cache',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Pre-warm thumbnails for every image under images/
+  python scripts/thumbnails.py warm
+
+  # Larger sizes plus WebP variants
+  python scripts/thumbnails.py warm --widths 320,640,1280 --webp
+
+  # How many images have thumbnails
+  python scripts/thumbnails.py status
+        """
+    )
+
+    parser.add_argument('command', choices=['warm', 'status'], help='Action to perform')
+    parser.add_argument('--widths', default=','.join(str(w) for w in DEFAULT_WIDTHS),
+                       help=f"Comma-separated thumbnail widths in pixels (default: "
+                            f"{','.join(str(w) for w in DEFAULT_WIDTHS)})")
+    parser.add_argument('--webp', action='store_true', help='Also write WebP variants')
+    parser.add_argument('--workers', '-j', type=int, help='Worker processes (default: CPU count)')
+
+    args = parser.parse_args()
+
+    if args.command == 'warm':
+        if Image is None:
+            print("Error: Pillow is required to generate thumbnails (pip install Pillow)", file=sys.stderr)
+            sys.exit(1)
+        try:
+            widths = sorted({int(w) for w in args.widths.split(',') if w.strip()})
+        except ValueError:
+            parser.error('--widths must be comma-separated integers')
+
+        start = time.perf_counter()
+        generated, skipped, failed = warm(widths, args.webp, args.workers)
+        elapsed = time.perf_counter() - start
+        print(f"Thumbnails: {generated} image(s) processed, {skipped} unchanged, {failed} failed "
+              f"({elapsed:.2f}s)")
+        sys.exit(1 if failed else 0)
+
+    elif args.command == 'status':
+        manifest = load_manifest()
+        sources = list(find_images())
+        fresh = sum(1 for path in sources if is_fresh(manifest.get(relative_path(path)), path))
+        print(f"{fresh} of {len(sources)} image(s) have current thumbnails in {THUMBNAILS_DIR}")
+
+
+if __name__ == '__main__':
+    main()
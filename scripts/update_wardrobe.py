@@ -13,6 +13,21 @@ Usage:
     # Update last worn date
     python scripts/update_wardrobe.py --mark-worn item_20251004_001 item_20251004_002
 
+    # Merge logged wear events into wardrobe_items.json
+    python scripts/update_wardrobe.py --compact-wear-log
+
+    # Apply many operations at once (JSONL file or - for stdin)
+    python scripts/update_wardrobe.py --batch ops.jsonl
+
+    # Report index drift / rebuild only the index entries that changed
+    python scripts/update_wardrobe.py --check-index
+    python scripts/update_wardrobe.py --rebuild-index
+
+    # Write only if nobody changed the wardrobe since version 12 (see wardrobe_lock.py)
+    python scripts/update_wardrobe.py --remove item_20251004_001 --if-version 12
+
+Runs hold the wardrobe write lock, so concurrent sessions apply one after another.
+
 Note: Adding items is better done through the StyleBot agent's *add-item command
       which includes AI vision analysis. This script is for programmatic updates.
 """
@@ -20,33 +35,77 @@ Note: Adding items is better done through the StyleBot agent's *add-item command
 import json
 import argparse
 import sys
-from pathlib import Path
 from datetime import datetime
 
-# Set base path to project root
-BASE_PATH = Path(__file__).parent.parent
-WARDROBE_INDEX = BASE_PATH / "data" / "wardrobe" / "wardrobe_index.json"
-WARDROBE_ITEMS = BASE_PATH / "data" / "wardrobe" / "wardrobe_items.json"
+import index_sync
+import item_offsets
+import query_cache
+import telemetry
+import wardrobe_core
+import wardrobe_db
+import wardrobe_lock
+import wear_log
+
+WARDROBE_INDEX = wardrobe_core.WARDROBE_INDEX
+WARDROBE_ITEMS = wardrobe_core.WARDROBE_ITEMS
 
 
-def load_json(filepath):
-    """Load JSON file."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+def load_documents():
+    """Load wardrobe_items.json and the index document."""
+    with telemetry.phase('read'):
+        items_data = wardrobe_core.load_json(WARDROBE_ITEMS)
+        index_data = wardrobe_core.load_index_document(WARDROBE_INDEX)
+    telemetry.count('items', len(items_data['items']))
+    return items_data, index_data
 
 
 def save_json(filepath, data):
-    """Save JSON file with proper formatting."""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    """Save JSON file via a temp file and rename, so readers never see a partial write."""
+    with telemetry.phase('write'):
+        wardrobe_lock.write_json_atomic(filepath, data)
+    query_cache.invalidate()
+
+
+def save_items(data):
+    """Save wardrobe_items.json and regenerate its offsets sidecar."""
+    with telemetry.phase('write'):
+        item_offsets.write_items_file(WARDROBE_ITEMS, data)
+    query_cache.invalidate()
+
+
+def set_field_value(item, field_path, value):
+    """Set a dot-notation field on an item, creating parents. Returns the old value."""
+    field_parts = field_path.split('.')
+    current = item
+
+    # Navigate to parent of field
+    for part in field_parts[:-1]:
+        if part not in current:
+            current[part] = {}
+        current = current[part]
+
+    # Set the value
+    final_field = field_parts[-1]
+    old_value = current.get(final_field)
+    current[final_field] = value
+    return old_value
 
 
-def find_item_by_id(items, item_id):
-    """Find item in list by ID."""
-    for idx, item in enumerate(items):
-        if item.get('id') == item_id:
-            return idx, item
-    return None, None
+def affects_index(field_path):
+    """Return True if changing field_path changes the item's index entry."""
+    field_parts = field_path.split('.')
+    if field_parts[0] in ['name', 'type', 'category', 'formality', 'seasons', 'tags']:
+        return True
+    if field_parts[0] == 'metadata':
+        if len(field_parts) == 1 or field_parts[1] == 'formality':
+            return True
+        if field_parts[1] == 'colors' and (len(field_parts) == 2 or field_parts[2] == 'primary'):
+            return True
+    if field_parts[0] == 'context' and (len(field_parts) == 1 or field_parts[1] in ['seasons', 'weather']):
+        return True
+    if field_parts[0] == 'tracking' and (len(field_parts) == 1 or field_parts[1] in ['wearCount', 'lastWorn']):
+        return True
+    return False
 
 
 def update_item_field(item_id, field_path, value):
@@ -57,30 +116,25 @@ def update_item_field(item_id, field_path, value):
         field_path: Dot-notation path to field (e.g., 'metadata.formality' or 'tracking.wearCount')
         value: New value
     """
+    if wardrobe_db.backend_enabled():
+        return update_item_field_db(item_id, field_path, value)
+
+    # Merge pending wear events first so tracking edits are not folded over later
+    if field_path.split('.')[0] == 'tracking':
+        wear_log.compact()
+
     # Load data
-    items_data = load_json(WARDROBE_ITEMS)
-    index_data = load_json(WARDROBE_INDEX)
+    items_data, index_data = load_documents()
 
     # Find item in full wardrobe
-    idx, item = find_item_by_id(items_data['items'], item_id)
+    idx = wardrobe_core.item_positions(items_data['items']).get(item_id)
     if idx is None:
         print(f"Error: Item {item_id} not found in wardrobe_items.json", file=sys.stderr)
         return False
+    item = items_data['items'][idx]
 
     # Update field using dot notation
-    field_parts = field_path.split('.')
-    current = item
-
-    # Navigate to parent of field
-    for part in field_parts[:-1]:
-        if part not in current:
-            current[part] = {}
-        current = current[part]
-
-    # Set the value
-    final_field = field_parts[-1]
-    old_value = current.get(final_field)
-    current[final_field] = value
+    old_value = set_field_value(item, field_path, value)
 
     # Update lastUpdated timestamp
     if 'tracking' not in item:
@@ -88,40 +142,17 @@ def update_item_field(item_id, field_path, value):
     item['tracking']['lastUpdated'] = datetime.utcnow().isoformat() + 'Z'
 
     # Save full wardrobe
-    save_json(WARDROBE_ITEMS, items_data)
+    save_items(items_data)
 
     # Update index if necessary (only certain fields are in index)
-    index_fields = ['name', 'type', 'category', 'formality', 'seasons', 'tags']
-
-    # Check if updated field affects index
-    update_index = False
-    if field_parts[0] in index_fields:
-        update_index = True
-    elif field_parts[0] == 'metadata' and len(field_parts) > 1:
-        if field_parts[1] in ['formality']:
-            update_index = True
-        elif field_parts[1] == 'colors' and len(field_parts) > 2 and field_parts[2] == 'primary':
-            update_index = True
+    update_index = affects_index(field_path)
 
     if update_index:
         # Find and update in index
-        idx_idx, idx_item = find_item_by_id(index_data['items'], item_id)
+        idx_idx = wardrobe_core.item_positions(index_data['items']).get(item_id)
         if idx_idx is not None:
             # Rebuild index entry from full item
-            metadata = item.get('metadata', {})
-            colors = metadata.get('colors', {})
-            context = item.get('context', {})
-
-            index_data['items'][idx_idx] = {
-                'id': item['id'],
-                'name': item['name'],
-                'type': item['type'],
-                'category': item['category'],
-                'primaryColor': colors.get('primary', ''),
-                'formality': metadata.get('formality', 0),
-                'seasons': context.get('seasons', []),
-                'tags': item.get('tags', [])
-            }
+            index_data['items'][idx_idx] = wardrobe_core.index_entry(item)
 
             save_json(WARDROBE_INDEX, index_data)
             print(f"Updated index for {item_id}")
@@ -130,24 +161,49 @@ def update_item_field(item_id, field_path, value):
     return True
 
 
+def update_item_field_db(item_id, field_path, value):
+    """Update a single field using the SQLite backend (one row rewrite)."""
+    with wardrobe_db.open_db() as conn:
+        item = wardrobe_db.get_item(conn, item_id)
+        if item is None:
+            print(f"Error: Item {item_id} not found in {wardrobe_db.DB_PATH.name}", file=sys.stderr)
+            return False
+
+        old_value = set_field_value(item, field_path, value)
+        item.setdefault('tracking', {})['lastUpdated'] = datetime.utcnow().isoformat() + 'Z'
+        wardrobe_db.upsert_item(conn, item)
+
+    print(f"Updated {item_id}: {field_path} = {value} (was: {old_value})")
+    return True
+
+
 def remove_item(item_id):
     """Remove an item from both wardrobe and index."""
+    if wardrobe_db.backend_enabled():
+        with wardrobe_db.open_db() as conn:
+            item = wardrobe_db.get_item(conn, item_id)
+            if item is None:
+                print(f"Error: Item {item_id} not found in {wardrobe_db.DB_PATH.name}", file=sys.stderr)
+                return False
+            wardrobe_db.delete_item(conn, item_id)
+        print(f"Removed item: {item.get('name', item_id)} ({item_id})")
+        return True
+
     # Load data
-    items_data = load_json(WARDROBE_ITEMS)
-    index_data = load_json(WARDROBE_INDEX)
+    items_data, index_data = load_documents()
 
     # Find and remove from full wardrobe
-    idx, item = find_item_by_id(items_data['items'], item_id)
+    idx = wardrobe_core.item_positions(items_data['items']).get(item_id)
     if idx is None:
         print(f"Error: Item {item_id} not found in wardrobe_items.json", file=sys.stderr)
         return False
 
-    item_name = item.get('name', item_id)
+    item_name = items_data['items'][idx].get('name', item_id)
     items_data['items'].pop(idx)
-    save_json(WARDROBE_ITEMS, items_data)
+    save_items(items_data)
 
     # Find and remove from index
-    idx_idx, idx_item = find_item_by_id(index_data['items'], item_id)
+    idx_idx = wardrobe_core.item_positions(index_data['items']).get(item_id)
     if idx_idx is not None:
         index_data['items'].pop(idx_idx)
         save_json(WARDROBE_INDEX, index_data)
@@ -158,43 +214,363 @@ def remove_item(item_id):
     return True
 
 
-def mark_items_worn(item_ids, wear_date=None):
-    """Mark items as worn by updating wearCount and lastWorn.
+def mark_items_worn(item_ids, wear_date=None, outfit_id=None):
+    """Mark items as worn by logging a wear event for each one.
+
+    Events are appended to wear_log.tsv rather than rewriting wardrobe_items.json.
+    Readers fold them into wearCount/lastWorn, and compaction merges them into the
+    items file once the log grows past wear_log.COMPACT_THRESHOLD.
 
     Args:
         item_ids: List of item IDs to mark as worn
         wear_date: Date worn (ISO format). Defaults to current UTC time.
+        outfit_id: Optional outfit/recommendation ID the items were worn in
     """
     if wear_date is None:
         wear_date = datetime.utcnow().isoformat() + 'Z'
 
-    # Load data
-    items_data = load_json(WARDROBE_ITEMS)
+    if wardrobe_db.backend_enabled():
+        return mark_items_worn_db(item_ids, wear_date, outfit_id)
 
-    updated_count = 0
+    # Validate IDs against the index
+    wardrobe = wardrobe_core.Wardrobe.load()
+
+    logged = []
     for item_id in item_ids:
-        idx, item = find_item_by_id(items_data['items'], item_id)
-        if idx is None:
+        entry = wardrobe.entry(item_id)
+        if entry is None:
             print(f"Warning: Item {item_id} not found, skipping", file=sys.stderr)
             continue
 
-        # Update tracking
-        if 'tracking' not in item:
-            item['tracking'] = {}
+        logged.append(item_id)
+        print(f"Marked {entry.get('name', item_id)} as worn")
+
+    if logged:
+        wear_log.append_events(logged, wear_date, outfit_id)
+        query_cache.invalidate()
+        print(f"\nLogged {len(logged)} wear event(s)")
+
+        if wear_log.pending_size() > wear_log.COMPACT_THRESHOLD:
+            merged = wear_log.compact()
+            print(f"Compacted {merged} wear event(s) into wardrobe_items.json")
+
+    return len(logged) > 0
+
 
-        tracking = item['tracking']
-        tracking['wearCount'] = tracking.get('wearCount', 0) + 1
-        tracking['lastWorn'] = wear_date
-        tracking['lastUpdated'] = datetime.utcnow().isoformat() + 'Z'
+def mark_items_worn_db(item_ids, wear_date, outfit_id=None):
+    """Mark items as worn using the SQLite backend."""
+    updated = []
+    with wardrobe_db.open_db() as conn:
+        for item_id in item_ids:
+            item = wardrobe_db.get_item(conn, item_id)
+            if item is None:
+                print(f"Warning: Item {item_id} not found, skipping", file=sys.stderr)
+                continue
 
-        updated_count += 1
-        print(f"Marked {item.get('name', item_id)} as worn (total: {tracking['wearCount']})")
+            tracking = item.setdefault('tracking', {})
+            tracking['wearCount'] = tracking.get('wearCount', 0) + 1
+            tracking['lastWorn'] = wear_date
+            tracking['lastUpdated'] = datetime.utcnow().isoformat() + 'Z'
+            wardrobe_db.upsert_item(conn, item)
 
-    if updated_count > 0:
-        save_json(WARDROBE_ITEMS, items_data)
-        print(f"\nUpdated {updated_count} item(s)")
+            updated.append(item_id)
+            print(f"Marked {item.get('name', item_id)} as worn (total: {tracking['wearCount']})")
 
-    return updated_count > 0
+    if updated:
+        # Keep the full wear history alongside the database as well
+        wear_log.append_events(updated, wear_date, outfit_id, log_path=wear_log.WEAR_HISTORY)
+        print(f"\nUpdated {len(updated)} item(s)")
+
+    return len(updated) > 0
+
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+BATCH_OPS = ['update', 'remove', 'mark-worn']
+
+
+def read_batch(source):
+    """Read batch operations from a JSONL file path (or '-' for stdin).
+
+    Returns a list of (line_number, op_dict) and a list of parse errors.
+    """
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+    ops = []
+    errors = []
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            op = json.loads(line)
+        except ValueError as e:
+            errors.append({'line': line_number, 'status': 'error', 'message': f"Invalid JSON: {e}"})
+            continue
+        if not isinstance(op, dict):
+            errors.append({'line': line_number, 'status': 'error', 'message': 'Operation must be a JSON object'})
+            continue
+        ops.append((line_number, op))
+    return ops, errors
+
+
+def validate_op(op):
+    """Return an error message for a malformed operation, or None."""
+    kind = op.get('op', '').replace('_', '-')
+    if kind not in BATCH_OPS:
+        return f"Unknown op {op.get('op')!r} (expected one of: {', '.join(BATCH_OPS)})"
+    if kind in ['update', 'remove'] and not op.get('id'):
+        return f"{kind} requires 'id'"
+    if kind == 'update' and (not op.get('field') or 'value' not in op):
+        return "update requires 'field' and 'value'"
+    if kind == 'mark-worn' and not (op.get('ids') or op.get('id')):
+        return "mark-worn requires 'ids' (or 'id')"
+    return None
+
+
+def touches_tracking(op):
+    """Return True if a batch operation updates a tracking.* field."""
+    return (op.get('op', '').replace('_', '-') == 'update'
+            and str(op.get('field', '')).split('.')[0] == 'tracking')
+
+
+def apply_batch(items_data, index_data, ops):
+    """Apply operations in order to loaded data, in memory.
+
+    Returns (results, ok, index_changed, wear). Nothing is written; on any failure
+    the caller discards the modified data. mark-worn operations do not touch the
+    items: wear lists them as {'ids', 'date', 'outfit', 'folded'} for the wear log.
+    A later tracking.* update of a worn item folds its earlier events into the
+    item first (moving their IDs to 'folded'), as compaction would.
+    """
+    items = items_data['items']
+    positions = wardrobe_core.item_positions(items)
+    removed = set()
+    reindex = set()
+    results = []
+    wear = []
+    now = datetime.utcnow().isoformat() + 'Z'
+
+    def fold_worn(item):
+        for worn in wear:
+            if item['id'] in worn['ids']:
+                worn['ids'].remove(item['id'])
+                worn['folded'].append(item['id'])
+                item['tracking'] = wear_log.fold_tracking(item.get('tracking'), 1, worn['date'])
+                reindex.add(item['id'])
+
+    def lookup(item_id):
+        pos = positions.get(item_id)
+        return None if pos is None or item_id in removed else items[pos]
+
+    for line_number, op in ops:
+        result = {'line': line_number, 'op': op.get('op')}
+        error = validate_op(op)
+
+        if error is None:
+            kind = op['op'].replace('_', '-')
+            if kind == 'update':
+                item = lookup(op['id'])
+                if item is None:
+                    error = f"Item {op['id']} not found"
+                else:
+                    if touches_tracking(op):
+                        fold_worn(item)
+                    old_value = set_field_value(item, op['field'], op['value'])
+                    item.setdefault('tracking', {})['lastUpdated'] = now
+                    if affects_index(op['field']):
+                        reindex.add(op['id'])
+                    result.update(id=op['id'], message=f"{op['field']} = {op['value']} (was: {old_value})")
+
+            elif kind == 'remove':
+                item = lookup(op['id'])
+                if item is None:
+                    error = f"Item {op['id']} not found"
+                else:
+                    removed.add(op['id'])
+                    result.update(id=op['id'], message=f"Removed {item.get('name', op['id'])}")
+
+            elif kind == 'mark-worn':
+                ids = op.get('ids') or [op['id']]
+                missing = [item_id for item_id in ids if lookup(item_id) is None]
+                if missing:
+                    error = f"Item(s) not found: {', '.join(missing)}"
+                else:
+                    wear_date = op.get('date') or now
+                    wear.append({'ids': list(ids), 'date': wear_date, 'outfit': op.get('outfit'), 'folded': []})
+                    result.update(ids=ids, date=wear_date, outfit=op.get('outfit'),
+                                  message=f"Marked {len(ids)} item(s) as worn")
+
+        if error is not None:
+            result.update(status='error', message=error)
+        else:
+            result['status'] = 'ok'
+        results.append(result)
+
+    ok = all(result['status'] == 'ok' for result in results)
+    if not ok:
+        return results, False, False, []
+
+    # Rebuild only the affected index entries
+    index_changed = bool(removed)
+    if removed:
+        items_data['items'] = [item for item in items if item['id'] not in removed]
+    index_items = index_data['items']
+    if reindex or removed:
+        kept = []
+        for entry in index_items:
+            if entry['id'] in removed:
+                continue
+            if entry['id'] in reindex:
+                entry = wardrobe_core.index_entry(items[positions[entry['id']]])
+                index_changed = True
+            kept.append(entry)
+        index_data['items'] = kept
+
+    return results, True, index_changed, wear
+
+
+def apply_batch_db(ops):
+    """Apply operations in one SQLite transaction. Returns (results, ok)."""
+    results = []
+    now = datetime.utcnow().isoformat() + 'Z'
+
+    class Rollback(Exception):
+        pass
+
+    try:
+        with wardrobe_db.open_db() as conn:
+            for line_number, op in ops:
+                result = {'line': line_number, 'op': op.get('op')}
+                error = validate_op(op)
+
+                if error is None:
+                    kind = op['op'].replace('_', '-')
+                    if kind == 'update':
+                        item = wardrobe_db.get_item(conn, op['id'])
+                        if item is None:
+                            error = f"Item {op['id']} not found"
+                        else:
+                            old_value = set_field_value(item, op['field'], op['value'])
+                            item.setdefault('tracking', {})['lastUpdated'] = now
+                            wardrobe_db.upsert_item(conn, item)
+                            result.update(id=op['id'], message=f"{op['field']} = {op['value']} (was: {old_value})")
+
+                    elif kind == 'remove':
+                        if not wardrobe_db.delete_item(conn, op['id']):
+                            error = f"Item {op['id']} not found"
+                        else:
+                            result.update(id=op['id'], message=f"Removed {op['id']}")
+
+                    elif kind == 'mark-worn':
+                        ids = op.get('ids') or [op['id']]
+                        found = [(item_id, wardrobe_db.get_item(conn, item_id)) for item_id in ids]
+                        missing = [item_id for item_id, item in found if item is None]
+                        if missing:
+                            error = f"Item(s) not found: {', '.join(missing)}"
+                        else:
+                            wear_date = op.get('date') or now
+                            for item_id, item in found:
+                                tracking = item.setdefault('tracking', {})
+                                tracking['wearCount'] = tracking.get('wearCount', 0) + 1
+                                tracking['lastWorn'] = wear_date
+                                tracking['lastUpdated'] = now
+                                wardrobe_db.upsert_item(conn, item)
+                            result.update(ids=ids, date=wear_date, outfit=op.get('outfit'),
+                                          message=f"Marked {len(ids)} item(s) as worn")
+
+                if error is not None:
+                    result.update(status='error', message=error)
+                else:
+                    result['status'] = 'ok'
+                results.append(result)
+
+            if any(result['status'] != 'ok' for result in results):
+                raise Rollback()
+    except Rollback:
+        return results, False
+
+    return results, True
+
+
+def run_batch(source):
+    """Apply a JSONL batch of operations atomically. Returns True on success."""
+    ops, parse_errors = read_batch(source)
+
+    if wardrobe_db.backend_enabled():
+        results, ok = apply_batch_db(ops) if not parse_errors else ([], False)
+    else:
+        # Merge pending wear events first so tracking edits are not folded over later
+        if not parse_errors and any(touches_tracking(op) for _, op in ops):
+            wear_log.compact()
+
+        # Load each file once
+        items_data, index_data = load_documents()
+        results, ok, index_changed, wear = apply_batch(items_data, index_data, ops)
+
+    results = sorted(parse_errors + results, key=lambda r: r['line'])
+    ok = ok and not parse_errors
+
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False), file=sys.stdout if result['status'] == 'ok' else sys.stderr)
+
+    if not ok:
+        failed = sum(1 for result in results if result['status'] != 'ok')
+        print(f"\nBatch rejected: {failed} of {len(results)} operation(s) failed; no changes written",
+              file=sys.stderr)
+        return False
+
+    if wardrobe_db.backend_enabled():
+        # Keep the full wear history alongside the database as well
+        for result in results:
+            if result.get('ids'):
+                wear_log.append_events(result['ids'], result['date'], result.get('outfit'),
+                                       log_path=wear_log.WEAR_HISTORY)
+    else:
+        # Write each file once, atomically; worn items only get wear log events
+        items_changed = any(worn['folded'] for worn in wear) or any(
+            op.get('op', '').replace('_', '-') != 'mark-worn' for _, op in ops)
+        if items_changed:
+            save_items(items_data)
+        if index_changed:
+            save_json(WARDROBE_INDEX, index_data)
+
+        for worn in wear:
+            if worn['ids']:
+                wear_log.append_events(worn['ids'], worn['date'], worn['outfit'])
+            if worn['folded']:
+                wear_log.append_events(worn['folded'], worn['date'], worn['outfit'],
+                                       log_path=wear_log.WEAR_HISTORY)
+        if any(worn['ids'] for worn in wear):
+            query_cache.invalidate()
+            if wear_log.pending_size() > wear_log.COMPACT_THRESHOLD:
+                merged = wear_log.compact()
+                print(f"Compacted {merged} wear event(s) into wardrobe_items.json")
+
+    print(f"\nApplied {len(results)} operation(s)")
+    return True
+
+
+def sync_index(write):
+    """Check (and optionally rebuild) the index. Returns False on unfixed drift."""
+    if wardrobe_db.backend_enabled():
+        print("SQLite backend keeps index columns in sync on every write; nothing to check")
+        return True
+
+    if not WARDROBE_ITEMS.exists():
+        print(f"Error: Items file not found: {WARDROBE_ITEMS}", file=sys.stderr)
+        return False
+
+    report = index_sync.sync_index(write=write)
+    if write:
+        query_cache.invalidate()
+    drift = index_sync.print_report(report)
+    return write or not drift
 
 
 def main():
@@ -212,11 +588,26 @@ Examples:
   # Mark items as worn (increments wearCount, updates lastWorn)
   python scripts/update_wardrobe.py --mark-worn item_20251004_001 item_20251004_002
 
+  # Record which outfit they were worn in
+  python scripts/update_wardrobe.py --mark-worn item_20251004_001 --outfit rec_20251005_001
+
+  # Merge logged wear events into wardrobe_items.json
+  python scripts/update_wardrobe.py --compact-wear-log
+
   # Remove an item
   python scripts/update_wardrobe.py --remove item_20251004_001
 
   # Update item name
   python scripts/update_wardrobe.py --update item_20251004_001 --field name --value "New Item Name"
+
+  # Find index entries that are missing, orphaned or out of date (exit 1 on drift)
+  python scripts/update_wardrobe.py --check-index
+
+  # Re-project only the items whose records changed since the last rebuild
+  python scripts/update_wardrobe.py --rebuild-index
+
+  # Refuse the edit if another session changed the wardrobe since version 12 was read
+  python scripts/update_wardrobe.py --update item_20251004_001 --field name --value "Linen Shirt" --if-version 12
         """
     )
 
@@ -226,6 +617,14 @@ Examples:
     action_group.add_argument('--remove', metavar='ITEM_ID', help='Remove an item')
     action_group.add_argument('--mark-worn', nargs='+', metavar='ITEM_ID',
                              help='Mark item(s) as worn (increments wearCount)')
+    action_group.add_argument('--compact-wear-log', action='store_true',
+                             help='Merge logged wear events into wardrobe_items.json')
+    action_group.add_argument('--batch', metavar='FILE',
+                             help='Apply update/remove/mark-worn operations from a JSONL file (- for stdin)')
+    action_group.add_argument('--check-index', action='store_true',
+                             help='Report drift between wardrobe_index.json and wardrobe_items.json')
+    action_group.add_argument('--rebuild-index', action='store_true',
+                             help='Incrementally rebuild wardrobe_index.json from wardrobe_items.json')
 
     # Update-specific arguments
     parser.add_argument('--field', help='Field path to update (e.g., metadata.formality)')
@@ -233,14 +632,31 @@ Examples:
 
     # Optional arguments
     parser.add_argument('--date', help='Date for --mark-worn (ISO format, default: now)')
+    parser.add_argument('--outfit', help='Outfit/recommendation ID for --mark-worn')
+    parser.add_argument('--if-version', type=int, metavar='N',
+                        help='Only write if the wardrobe is still at version N (see wardrobe_lock.py)')
+    parser.add_argument('--timings', action='store_true',
+                        help='Log per-phase timings to data/telemetry.jsonl and print them to stderr')
 
     args = parser.parse_args()
+    telemetry.enable('update_wardrobe', args, parser)
 
     # Validate arguments
     if args.update and (not args.field or not args.value):
         parser.error('--update requires both --field and --value')
 
-    # Execute action
+    # Hold the write lock from the first read to the last write
+    try:
+        with wardrobe_lock.writer(args.if_version):
+            success = run_action(args)
+    except wardrobe_lock.ConflictError as e:
+        print(f"Error: Conflict: {e}; nothing was written", file=sys.stderr)
+        sys.exit(1)
+    sys.exit(0 if success else 1)
+
+
+def run_action(args):
+    """Execute the requested action. Returns True on success."""
     if args.update:
         # Try to convert value to appropriate type
         value = args.value
@@ -257,16 +673,34 @@ Examples:
                     value = value.lower() == 'true'
                 # Otherwise keep as string
 
-        success = update_item_field(args.update, args.field, value)
-        sys.exit(0 if success else 1)
+        with telemetry.phase('update'):
+            return update_item_field(args.update, args.field, value)
 
     elif args.remove:
-        success = remove_item(args.remove)
-        sys.exit(0 if success else 1)
+        with telemetry.phase('remove'):
+            return remove_item(args.remove)
 
     elif args.mark_worn:
-        success = mark_items_worn(args.mark_worn, args.date)
-        sys.exit(0 if success else 1)
+        with telemetry.phase('mark-worn'):
+            success = mark_items_worn(args.mark_worn, args.date, args.outfit)
+        telemetry.count('worn', len(args.mark_worn))
+        return success
+
+    elif args.batch:
+        with telemetry.phase('batch'):
+            return run_batch(args.batch)
+
+    elif args.compact_wear_log:
+        with telemetry.phase('compact'):
+            merged = wear_log.compact()
+        query_cache.invalidate()
+        telemetry.count('events', merged)
+        print(f"Compacted {merged} wear event(s) into wardrobe_items.json")
+        return True
+
+    elif args.check_index or args.rebuild_index:
+        with telemetry.phase('sync-index'):
+            return sync_index(write=args.rebuild_index)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Core
+Shared in-process library behind the wardrobe scripts.
+
+Provides the project paths, cached JSON loads keyed by file size and modification
+time, the canonical index projection, and a Wardrobe model with O(1) lookup by ID.
+Full item records are decoded lazily: a lookup decodes only that record (through
+the offsets sidecar) and keeps it for later calls. A long-lived Python caller can
+reuse one Wardrobe for thousands of lookups without re-parsing or spawning
+subprocesses:
+
+    import sys; sys.path.insert(0, 'scripts')
+    from wardrobe_core import Wardrobe
+
+    wardrobe = Wardrobe.load()
+    for entry in wardrobe.query(type='tops', season='fall', formality=(5, 7)):
+        item = wardrobe.get(entry['id'])
+
+Set WARDROBE_DATA_DIR to point every script at a different data directory.
+Treat returned records as read-only: they are shared with the cache.
+"""
+
+import json
+import mmap
+import threading
+from pathlib import Path
+
+import index_fields
+import item_offsets
+import query_engine
+import search_index
+import wardrobe_db
+import wardrobe_lock
+import wardrobe_paths
+import wear_log
+
+# Project paths (defined in wardrobe_paths, re-exported for the scripts)
+BASE_PATH = wardrobe_paths.BASE_PATH
+DATA_DIR = wardrobe_paths.DATA_DIR
+WARDROBE_DIR = wardrobe_paths.WARDROBE_DIR
+WARDROBE_INDEX = wardrobe_paths.WARDROBE_INDEX
+WARDROBE_ITEMS = wardrobe_paths.WARDROBE_ITEMS
+RECOMMENDATIONS_DIR = wardrobe_paths.RECOMMENDATIONS_DIR
+FEEDBACK_DIR = wardrobe_paths.FEEDBACK_DIR
+TEMPLATES_DIR = wardrobe_paths.TEMPLATES_DIR
+
+file_signature = wardrobe_paths.file_signature
+
+
+class FileCache:
+    """Parsed-file cache that reloads an entry only when its size or mtime changes."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, loader):
+        """Return loader(path), reusing the previous result while the file is unchanged."""
+        signature = file_signature(path)
+        key = (str(path), loader)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+        value = loader(path)
+        with self._lock:
+            self._entries[key] = (signature, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_file_cache = FileCache()
+
+
+def load_json(filepath):
+    """Load JSON file (uncached; safe to modify the result)."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def cached_json(filepath):
+    """Load JSON file, reusing the parsed result while the file is unchanged."""
+    return _file_cache.get(filepath, load_json)
+
+
+# Canonical index projection (defined in index_fields, re-exported for the scripts)
+INDEX_VERSION = index_fields.INDEX_VERSION
+index_entry = index_fields.index_entry
+to_fahrenheit = index_fields.to_fahrenheit
+temp_range_f = index_fields.temp_range_f
+
+
+def index_entries(index_data):
+    """Return the entry list of an index document.
+
+    Indexes created from older templates keep their entries under "index" rather
+    than "items"; both are accepted.
+    """
+    if 'items' in index_data:
+        return index_data['items']
+    return index_data.get('index', [])
+
+
+def load_index_document(filepath):
+    """Load an index file for editing, normalizing a legacy "index" key to "items"."""
+    index_data = load_json(filepath)
+    if 'items' not in index_data and 'index' in index_data:
+        index_data['items'] = index_data.pop('index')
+    return index_data
+
+
+def item_positions(items):
+    """Return an id -> list position map for a list of items or index entries."""
+    return {item['id']: pos for pos, item in enumerate(items)}
+
+
+class LazyItems:
+    """Read-only id -> item mapping that decodes records on first access.
+
+    Backed by the offsets sidecar and a memory map of wardrobe_items.json (the
+    handle pinned by the snapshot, if given). Raises LookupError from open() when
+    the sidecar is stale, so callers can fall back.
+    """
+
+    def __init__(self, items_path, offsets, handle=None):
+        self.items_path = Path(items_path)
+        self.offsets = offsets
+        self._decoded = {}
+        self._owns_file = handle is None
+        self._file = open(self.items_path, 'rb') if handle is None else handle
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if offsets else None
+
+    @classmethod
+    def open(cls, items_path, snapshot=None):
+        signature = snapshot.signature(items_path) if snapshot is not None else None
+        offsets = item_offsets.load_sidecar(items_path, signature)
+        if offsets is None:
+            raise LookupError(f"Offsets sidecar for {items_path} is missing or stale")
+        return cls(items_path, offsets, snapshot.handle(items_path) if snapshot is not None else None)
+
+    def __contains__(self, item_id):
+        return item_id in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __iter__(self):
+        return iter(self.offsets)
+
+    def get(self, item_id):
+        item = self._decoded.get(item_id)
+        if item is None and item_id in self.offsets:
+            offset, length = self.offsets[item_id]
+            item = json.loads(self._mm[offset:offset + length].decode('utf-8'))
+            if item.get('id') != item_id:
+                raise LookupError(f"Offsets sidecar for {self.items_path} does not match the file")
+            self._decoded[item_id] = item
+        return item
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        if self._owns_file:
+            self._file.close()
+
+
+class Wardrobe:
+    """In-memory wardrobe model with O(1) lookup by ID.
+
+    The index, query engine and item records are each materialized on first use,
+    from the files pinned when the Wardrobe was created (see
+    wardrobe_lock.open_snapshot), so they all belong to one version even if a
+    writer replaces the files in between. Use Wardrobe.load() to reuse an instance
+    while the data files are unchanged.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, index_path=None, items_path=None, snapshot=None):
+        self.index_path = Path(index_path or WARDROBE_INDEX)
+        self.items_path = Path(items_path or WARDROBE_ITEMS)
+        self.use_db = wardrobe_db.backend_enabled()
+        self.snapshot = snapshot or wardrobe_lock.open_snapshot()
+        self.version = self.snapshot.version  # wardrobe_lock version the files belong to
+        self._pending = None
+        self._index = None
+        self._engine = None
+        self._items = None      # LazyItems or plain dict once fully parsed
+        self._all_items = None  # full ordered list, only when everything was loaded
+        self._search = None
+
+    @classmethod
+    def load(cls, index_path=None, items_path=None):
+        """Return a cached Wardrobe, rebuilt only when a data file has changed.
+
+        Never waits for the write lock: the files are pinned at one committed
+        version (see wardrobe_lock.open_snapshot).
+        """
+        index_path = Path(index_path or WARDROBE_INDEX)
+        items_path = Path(items_path or WARDROBE_ITEMS)
+        key = (str(index_path), str(items_path), wardrobe_db.backend_enabled())
+        snapshot = wardrobe_lock.open_snapshot()
+        stamp = (snapshot.version,) + tuple(snapshot.signature(p) for p in (
+            index_path, items_path, wear_log.WEAR_LOG, wardrobe_db.DB_PATH))
+
+        with cls._instances_lock:
+            cached = cls._instances.get(key)
+            if cached is not None and cached[0] == stamp:
+                snapshot.close()
+                return cached[1]
+
+        wardrobe = cls(index_path, items_path, snapshot)
+        with cls._instances_lock:
+            cls._instances[key] = (stamp, wardrobe)
+        return wardrobe
+
+    @classmethod
+    def clear_caches(cls):
+        """Forget cached wardrobes and parsed files, as in a freshly started process."""
+        with cls._instances_lock:
+            cls._instances.clear()
+        _file_cache.clear()
+
+    # -- index ---------------------------------------------------------------
+
+    @property
+    def index(self):
+        """All index entries, in wardrobe order."""
+        if self._index is None:
+            if self.use_db:
+                with wardrobe_db.open_db() as conn:
+                    self._index = wardrobe_db.load_index_entries(conn)
+            else:
+                self._index = self.engine.entries
+        return self._index
+
+    @property
+    def engine(self):
+        """The inverted-index query engine for this wardrobe."""
+        if self._engine is None:
+            if self.use_db:
+                self._engine = query_engine.QueryEngine(self.index)
+            else:
+                self._engine = query_engine.load_engine(self.index_path, self.snapshot)
+        return self._engine
+
+    def query(self, **filters):
+        """Filter index entries (see QueryEngine.iter_query for arguments).
+
+        Wear fields include events still pending in the wear log.
+        """
+        return list(self.iter_query(**filters))
+
+    def iter_query(self, **filters):
+        """Yield the entries query() returns as they are found."""
+        if self.use_db:
+            with wardrobe_db.open_db() as conn:
+                yield from wardrobe_db.iter_query_index(conn, **filters)
+            return
+        yield from self.engine.iter_query(pending=self.pending_wear(), **filters)
+
+    def pending_wear(self):
+        """Return the wear log summary (item_id -> (count, latest)) of this version."""
+        if self._pending is None:
+            try:
+                raw = self.snapshot.read_bytes(wear_log.WEAR_LOG)
+            except FileNotFoundError:
+                raw = b''
+            self._pending = wear_log.summarize(wear_log.parse_events(raw.decode('utf-8').splitlines()))
+        return self._pending
+
+    def search(self, text, **filters):
+        """Rank index entries by BM25 relevance to free text.
+
+        Accepts the query() filters to restrict the candidates. Returns
+        [(entry, score), ...] best first; only matching items are returned, as
+        query() entries (pending wear included) of this version.
+        """
+        if self._search is None:
+            self._search, _ = search_index.update_index(self.index_path, self.items_path, self.snapshot)
+        allowed = None
+        if any(value is not None for value in filters.values()):
+            allowed = {entry['id'] for entry in self.query(**filters)}
+        ranked = self._search.search(text, allowed)
+        if not ranked:
+            return []
+        entries = {entry['id']: entry for entry in self.query(ids=[item_id for item_id, _ in ranked])}
+        return [(entries[item_id], score) for item_id, score in ranked if item_id in entries]
+
+    @property
+    def ids(self):
+        return list(self.engine.id_pos)
+
+    def __contains__(self, item_id):
+        return item_id in self.engine.id_pos
+
+    def __len__(self):
+        return len(self.index)
+
+    def entry(self, item_id):
+        """Return the index entry for an ID, or None."""
+        pos = self.engine.id_pos.get(item_id)
+        return None if pos is None else self.engine.entries[pos]
+
+    # -- full records --------------------------------------------------------
+
+    def _item_source(self):
+        if self._items is None:
+            try:
+                self._items = LazyItems.open(self.items_path, self.snapshot)
+            except LookupError:
+                self._load_all()
+        return self._items
+
+    def _load_all(self):
+        data = item_offsets.load_items_document(self.items_path, self.snapshot)
+        self._all_items = data['items']
+        self._items = {item['id']: item for item in self._all_items}
+
+    def get(self, item_id):
+        """Return one full item (with pending wear applied), or None."""
+        found, _ = self.get_many([item_id])
+        return found[0] if found else None
+
+    def get_many(self, item_ids):
+        """Return (found_items, not_found_ids), preserving the requested order."""
+        if self.use_db:
+            with wardrobe_db.open_db() as conn:
+                by_id = {item['id']: item for item in wardrobe_db.load_items(conn, item_ids)}
+            return ([by_id[i] for i in item_ids if i in by_id],
+                    [i for i in item_ids if i not in by_id])
+
+        source = self._item_source()
+        try:
+            raw = [source.get(i) for i in item_ids]
+        except (LookupError, ValueError):
+            # Sidecar no longer matches the file: parse it fully instead
+            self._load_all()
+            raw = [self._items.get(i) for i in item_ids]
+
+        found = wear_log.apply_pending([item for item in raw if item is not None], self.pending_wear())
+        not_found = [i for i, item in zip(item_ids, raw) if item is None]
+        return found, not_found
+
+    def items(self):
+        """Return every full item in wardrobe order (parses the whole file once)."""
+        if self.use_db:
+            with wardrobe_db.open_db() as conn:
+                return wardrobe_db.load_items(conn)
+        if self._all_items is None:
+            self._load_all()
+        return wear_log.apply_pending(self._all_items, self.pending_wear())
+
+    def image_map(self):
+        """Return a mapping of item_id -> imagePath."""
+        if self.use_db:
+            with wardrobe_db.open_db() as conn:
+                return wardrobe_db.image_map(conn)
+        if self._all_items is None:
+            self._load_all()
+        return {item['id']: item.get('imagePath', '') for item in self._all_items}
+
+
+# ---------------------------------------------------------------------------
+# Recommendations and feedback
+# ---------------------------------------------------------------------------
+
+def recommendation_path(rec_id):
+    """Return the JSON path for a recommendation ID."""
+    return RECOMMENDATIONS_DIR / f"{rec_id}.json"
+
+
+def load_recommendation(rec_id, cached=True):
+    """Return a recommendation document, or None if it does not exist.
+
+    Pass cached=False when streaming through many recommendations once.
+    """
+    if wardrobe_db.backend_enabled():
+        with wardrobe_db.open_db() as conn:
+            rec = wardrobe_db.get_recommendation(conn, rec_id)
+        if rec is not None:
+            return rec
+
+    rec_path = recommendation_path(rec_id)
+    if not rec_path.exists():
+        return None
+    return cached_json(rec_path) if cached else load_json(rec_path)
+
+
+def recommendation_ids():
+    """Return the IDs of all stored recommendations, sorted."""
+    ids = {path.stem for path in RECOMMENDATIONS_DIR.glob('rec_*.json')}
+    if wardrobe_db.backend_enabled():
+        with wardrobe_db.open_db() as conn:
+            ids.update(wardrobe_db.recommendation_ids(conn))
+    return sorted(ids)
+
+
+def iter_feedback(recommendation_id=None):
+    """Yield feedback documents, optionally only those for one recommendation."""
+    for path in sorted(FEEDBACK_DIR.glob('feedback_*.json')):
+        feedback = cached_json(path)
+        if recommendation_id is None or feedback.get('recommendationId') == recommendation_id:
+            yield feedback
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Query Daemon
+Optional resident process that keeps wardrobe data parsed in memory.
+
+The daemon holds a wardrobe_core.Wardrobe (index, query engine and decoded items),
+recommendations and feedback in memory and answers filter and detail requests over a local Unix
+domain socket. Each file is re-read only when its size or modification time changes,
+so edits made by update_wardrobe.py (or by hand) are picked up on the next request.
+
+wardrobe_query.py, get_item_details.py and generate_recommendation_html.py use the
+daemon automatically when it is running and read the files directly when it is not.
+
+Usage:
+    # Run the daemon (in the foreground; append & to background it)
+    python scripts/wardrobe_daemon.py serve
+
+    # Check whether it is running / stop it
+    python scripts/wardrobe_daemon.py status
+    python scripts/wardrobe_daemon.py stop
+
+Protocol: one JSON request per line, one JSON response per line.
+    {"op": "filter", "filters": {"type": "tops", "formality": [5, 7]}, "detailed": false}
+    {"op": "details", "ids": ["item_20251004_001"]}
+    {"op": "recommendation", "id": "rec_20251005_001"}
+    {"op": "feedback", "recommendationId": "rec_20251005_001"}
+    {"op": "image_map"}
+"""
+
+import json
+import os
+import socket
+import socketserver
+import argparse
+import sys
+import threading
+from pathlib import Path
+
+import wardrobe_core
+
+SOCKET_PATH = Path(os.environ.get('WARDROBE_SOCKET', wardrobe_core.DATA_DIR / ".wardrobe.sock"))
+
+CLIENT_TIMEOUT = 5.0
+
+
+class WardrobeState:
+    """Answers requests from the stat-keyed caches in wardrobe_core."""
+
+    def handle(self, request):
+        """Dispatch a request dict and return the response dict."""
+        op = request.get('op')
+
+        if op == 'ping':
+            return {'ok': True, 'pid': os.getpid()}
+
+        wardrobe = wardrobe_core.Wardrobe.load()
+
+        if op == 'filter':
+            filters = dict(request.get('filters') or {})
+            if filters.get('formality'):
+                filters['formality'] = tuple(filters['formality'])
+            entries = wardrobe.query(**filters)
+            if request.get('detailed'):
+                items, _ = wardrobe.get_many([entry['id'] for entry in entries])
+                return {'ok': True, 'items': items}
+            return {'ok': True, 'items': entries}
+
+        if op == 'details':
+            items, not_found = wardrobe.get_many(request.get('ids') or [])
+            return {'ok': True, 'items': items, 'not_found': not_found}
+
+        if op == 'image_map':
+            return {'ok': True, 'image_map': wardrobe.image_map()}
+
+        if op == 'recommendation':
+            rec = wardrobe_core.load_recommendation(request.get('id'))
+            if rec is None:
+                return {'ok': False, 'error': f"Recommendation not found: {request.get('id')}"}
+            return {'ok': True, 'recommendation': rec}
+
+        if op == 'feedback':
+            return {'ok': True, 'feedback': list(wardrobe_core.iter_feedback(request.get('recommendationId')))}
+
+        return {'ok': False, 'error': f"Unknown op: {op}"}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Read newline-delimited JSON requests and write one JSON response per line."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if request.get('op') == 'shutdown':
+                    response = {'ok': True}
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    response = self.server.state.handle(request)
+            except Exception as e:  # report the failure to the client instead of dying
+                response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+def request(op, **payload):
+    """Send one request to the daemon.
+
+    Returns the response dict, or None if the daemon is not running (or Unix
+    sockets are unavailable), in which case callers read the files directly.
+    """
+    if not hasattr(socket, 'AF_UNIX') or not SOCKET_PATH.exists():
+        return None
+
+    message = dict(payload, op=op)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CLIENT_TIMEOUT)
+            sock.connect(str(SOCKET_PATH))
+            sock.sendall(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as f:
+                line = f.readline()
+    except OSError:
+        return None
+
+    if not line:
+        return None
+    try:
+        response = json.loads(line)
+    except ValueError:
+        return None
+    return response if response.get('ok') else None
+
+
+def serve():
+    """Run the daemon in the foreground until stopped."""
+    if not hasattr(socket, 'AF_UNIX'):
+        print("Error: Unix domain sockets are not available on this platform", file=sys.stderr)
+        sys.exit(1)
+
+    if SOCKET_PATH.exists():
+        if request('ping') is not None:
+            print(f"Error: Daemon already running on {SOCKET_PATH}", file=sys.stderr)
+            sys.exit(1)
+        SOCKET_PATH.unlink()  # stale socket from a previous run
+
+    server = socketserver.ThreadingUnixStreamServer(str(SOCKET_PATH), RequestHandler)
+    server.daemon_threads = True
+    server.state = WardrobeState()
+
+    print(f"Wardrobe daemon listening on {SOCKET_PATH} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            SOCKET_PATH.unlink()
+        except FileNotFoundError:
+            pass
+    print("Wardrobe daemon stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Resident wardrobe query daemon',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Start the daemon in the background
+  python scripts/wardrobe_daemon.py serve &
+
+  # Queries now go through the daemon automatically
+  python scripts/wardrobe_query.py --type tops --season fall
+
+  # Stop it
+  python scripts/wardrobe_daemon.py stop
+        """
+    )
+
+    parser.add_argument('command', choices=['serve', 'status', 'stop'], help='Action to perform')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve()
+
+    elif args.command == 'status':
+        response = request('ping')
+        if response is None:
+            print("Wardrobe daemon is not running")
+            sys.exit(1)
+        print(f"Wardrobe daemon running on {SOCKET_PATH} (pid {response['pid']})")
+
+    elif args.command == 'stop':
+        if request('shutdown') is None:
+            print("Wardrobe daemon is not running")
+            sys.exit(1)
+        print("Stopping wardrobe daemon")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Wardrobe SQLite Backend
+Keep items, index columns, recommendations and feedback in one local SQLite file.
+
+The JSON files in data/ remain the default storage. Set WARDROBE_BACKEND=sqlite to
+make the scripts read and write data/wardrobe/wardrobe.db instead. Edits then touch
+a single row rather than rewriting wardrobe_items.json and wardrobe_index.json.
+
+Usage:
+    # Copy the current JSON files into wardrobe.db
+    python scripts/wardrobe_db.py import
+
+    # Write wardrobe.db back out in the JSON layout
+    python scripts/wardrobe_db.py export
+
+    # Show row counts
+    python scripts/wardrobe_db.py stats
+"""
+
+import json
+import os
+import sqlite3
+import argparse
+from contextlib import contextmanager
+
+import color_engine
+import index_fields
+import item_offsets
+import query_engine
+import wardrobe_lock
+import wardrobe_paths
+import wear_log
+
+DB_PATH = wardrobe_paths.WARDROBE_DIR / "wardrobe.db"
+WARDROBE_INDEX = wardrobe_paths.WARDROBE_INDEX
+WARDROBE_ITEMS = wardrobe_paths.WARDROBE_ITEMS
+RECOMMENDATIONS_DIR = wardrobe_paths.RECOMMENDATIONS_DIR
+FEEDBACK_DIR = wardrobe_paths.FEEDBACK_DIR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT,
+    type TEXT COLLATE NOCASE,
+    category TEXT COLLATE NOCASE,
+    primary_color TEXT COLLATE NOCASE,
+    formality INTEGER,
+    image_path TEXT,
+    entry TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_type ON items(type);
+CREATE INDEX IF NOT EXISTS idx_items_category ON items(category);
+CREATE INDEX IF NOT EXISTS idx_items_formality ON items(formality);
+CREATE INDEX IF NOT EXISTS idx_items_position ON items(position);
+CREATE INDEX IF NOT EXISTS idx_items_temp ON items(
+    json_extract(entry, '$.tempRange.min'), json_extract(entry, '$.tempRange.max'));
+CREATE INDEX IF NOT EXISTS idx_items_last_worn ON items(
+    COALESCE(json_extract(entry, '$.lastWorn'), ''), position);
+CREATE INDEX IF NOT EXISTS idx_items_wear_count ON items(
+    COALESCE(json_extract(entry, '$.wearCount'), 0), position);
+
+CREATE TABLE IF NOT EXISTS item_seasons (
+    item_id TEXT NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+    season TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (item_id, season)
+);
+CREATE INDEX IF NOT EXISTS idx_item_seasons_season ON item_seasons(season);
+
+CREATE TABLE IF NOT EXISTS item_tags (
+    item_id TEXT NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (item_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_item_tags_tag ON item_tags(tag);
+
+CREATE TABLE IF NOT EXISTS recommendations (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS feedback (
+    id TEXT PRIMARY KEY,
+    recommendation_id TEXT,
+    timestamp TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_recommendation ON feedback(recommendation_id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('instance', json_quote(lower(hex(randomblob(8)))));
+
+-- Counts every change to the items table (see items_generation)
+CREATE TRIGGER IF NOT EXISTS items_generation_insert AFTER INSERT ON items BEGIN
+    INSERT INTO meta (key, value) VALUES ('items_generation', 1)
+    ON CONFLICT (key) DO UPDATE SET value = value + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS items_generation_update AFTER UPDATE ON items BEGIN
+    INSERT INTO meta (key, value) VALUES ('items_generation', 1)
+    ON CONFLICT (key) DO UPDATE SET value = value + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS items_generation_delete AFTER DELETE ON items BEGIN
+    INSERT INTO meta (key, value) VALUES ('items_generation', 1)
+    ON CONFLICT (key) DO UPDATE SET value = value + 1;
+END;
+"""
+
+
+def backend_enabled():
+    """Return True when the scripts should use the SQLite backend."""
+    return os.environ.get('WARDROBE_BACKEND', 'json').lower() == 'sqlite'
+
+
+@contextmanager
+def open_db(db_path=None):
+    """Open the wardrobe database, creating the schema if needed.
+
+    Commits on success, rolls back on error and always closes the connection.
+    """
+    conn = sqlite3.connect(str(db_path or DB_PATH))
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.executescript(SCHEMA)
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Items
+# ---------------------------------------------------------------------------
+
+def upsert_item(conn, item, position=None):
+    """Insert or replace a single item row and its season/tag rows."""
+    entry = index_fields.index_entry(item)
+
+    if position is None:
+        row = conn.execute('SELECT position FROM items WHERE id = ?', (item['id'],)).fetchone()
+        if row is not None:
+            position = row['position']
+        else:
+            position = conn.execute('SELECT COALESCE(MAX(position), -1) + 1 FROM items').fetchone()[0]
+
+    conn.execute(
+        'INSERT OR REPLACE INTO items '
+        '(id, position, name, type, category, primary_color, formality, image_path, entry, data) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        (item['id'], position, entry['name'], entry['type'], entry['category'],
+         entry['primaryColor'], entry['formality'], item.get('imagePath', ''),
+         json.dumps(entry, ensure_ascii=False), json.dumps(item, ensure_ascii=False))
+    )
+
+    conn.execute('DELETE FROM item_seasons WHERE item_id = ?', (item['id'],))
+    conn.executemany('INSERT OR IGNORE INTO item_seasons (item_id, season) VALUES (?, ?)',
+                     [(item['id'], season) for season in entry['seasons']])
+
+    conn.execute('DELETE FROM item_tags WHERE item_id = ?', (item['id'],))
+    conn.executemany('INSERT OR IGNORE INTO item_tags (item_id, tag) VALUES (?, ?)',
+                     [(item['id'], tag) for tag in entry['tags']])
+
+
+def items_generation(conn):
+    """Return [database id, change count] for the items table.
+
+    The count is bumped by triggers on every insert, update or delete, whoever
+    makes it, so a cache built from the item rows is current while this is
+    unchanged. The random database id tells a re-created database apart.
+    """
+    meta = {row['key']: json.loads(row['value']) for row in conn.execute(
+        "SELECT key, value FROM meta WHERE key IN ('instance', 'items_generation')")}
+    return [meta.get('instance'), meta.get('items_generation', 0)]
+
+
+def get_item(conn, item_id):
+    """Return a single full item, or None if it does not exist."""
+    row = conn.execute('SELECT data FROM items WHERE id = ?', (item_id,)).fetchone()
+    return json.loads(row['data']) if row else None
+
+
+def delete_item(conn, item_id):
+    """Delete an item. Returns True if a row was removed."""
+    cur = conn.execute('DELETE FROM items WHERE id = ?', (item_id,))
+    return cur.rowcount > 0
+
+
+def load_items(conn, item_ids=None):
+    """Load full items, optionally restricted to the given IDs (in wardrobe order)."""
+    if item_ids is None:
+        rows = conn.execute('SELECT data FROM items ORDER BY position').fetchall()
+    else:
+        ids = list(dict.fromkeys(item_ids))
+        if not ids:
+            return []
+        placeholders = ','.join('?' * len(ids))
+        rows = conn.execute(
+            f'SELECT data FROM items WHERE id IN ({placeholders}) ORDER BY position', ids
+        ).fetchall()
+    return [json.loads(row['data']) for row in rows]
+
+
+def load_index_entries(conn):
+    """Load all index entries in wardrobe order."""
+    rows = conn.execute('SELECT entry FROM items ORDER BY position').fetchall()
+    return [json.loads(row['entry']) for row in rows]
+
+
+# Wear columns as indexed (idx_items_last_worn / idx_items_wear_count)
+LAST_WORN = "COALESCE(json_extract(entry, '$.lastWorn'), '')"
+WEAR_COUNT = "COALESCE(json_extract(entry, '$.wearCount'), 0)"
+
+
+def query_index(conn, **filters):
+    """Filter index entries using the indexed columns (see iter_query_index)."""
+    return list(iter_query_index(conn, **filters))
+
+
+def iter_query_index(conn, type=None, category=None, color=None, formality=None,
+                     season=None, tag=None, ids=None, color_near=None, max_delta=None,
+                     temp=None, temp_range=None, not_worn_since=None, sort_by=None,
+                     order=None, offset=0, limit=None):
+    """Yield index entries matching the filters as rows are fetched.
+
+    Args mirror the wardrobe_query.py flags. formality and temp_range are
+    (min, max) tuples; temperatures are in Fahrenheit. sort_by, order, offset
+    and limit behave as in QueryEngine.iter_query.
+    """
+    clauses = []
+    params = []
+
+    if type:
+        clauses.append('type = ?')
+        params.append(type)
+    if category:
+        clauses.append('category = ?')
+        params.append(category)
+    if color:
+        clauses.append('instr(lower(primary_color), ?) > 0')
+        params.append(color.lower())
+    if color_near:
+        # Compare each distinct stored color once, then filter on the matches
+        target = color_engine.lab(color_near)
+        max_delta = max_delta or query_engine.DEFAULT_MAX_DELTA
+        values = [row[0] for row in conn.execute('SELECT DISTINCT primary_color FROM items')]
+        near = [value for value in values
+                if target is not None and color_engine.lab(value) is not None
+                and color_engine.delta_e(target, color_engine.lab(value)) <= max_delta]
+        clauses.append(f"primary_color IN ({','.join('?' * len(near))})" if near else '0')
+        params.extend(near)
+    if formality:
+        clauses.append('formality BETWEEN ? AND ?')
+        params.extend(formality)
+    if season:
+        clauses.append('id IN (SELECT item_id FROM item_seasons WHERE season = ?)')
+        params.append(season)
+    if tag:
+        clauses.append('id IN (SELECT item_id FROM item_tags WHERE tag = ?)')
+        params.append(tag)
+    if ids:
+        clauses.append(f"id IN ({','.join('?' * len(ids))})")
+        params.extend(ids)
+    # Temperature: the item's range must overlap [low, high]
+    temp_bounds = [(temp, temp)] if temp is not None else []
+    if temp_range:
+        temp_bounds.append(tuple(temp_range))
+    for low, high in temp_bounds:
+        clauses.append("json_extract(entry, '$.tempRange.min') <= ? "
+                       "AND json_extract(entry, '$.tempRange.max') >= ?")
+        params.extend((high, low))
+    if not_worn_since:
+        clauses.append(f"{LAST_WORN} < ?")
+        params.append(not_worn_since)
+
+    sql = 'SELECT entry FROM items'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    if order:
+        # Missing values last in either direction, as in query_engine.order_entries
+        terms = []
+        for field in order:
+            if field.lstrip('-') not in query_engine.ORDER_FIELDS:
+                raise ValueError(f"cannot order by {field!r}")
+            value = f"json_extract(entry, '$.{field.lstrip('-')}')"
+            terms.append(f"{value} IS NULL, {value}{' DESC' if field.startswith('-') else ''}")
+        sql += f" ORDER BY {', '.join(terms)}, position"
+    elif sort_by:
+        sql += f" ORDER BY {WEAR_COUNT if sort_by == 'wear-count' else LAST_WORN}, position"
+    else:
+        sql += ' ORDER BY position'
+    if limit is not None or offset:
+        sql += ' LIMIT ? OFFSET ?'
+        params.extend((-1 if limit is None else limit, offset or 0))
+
+    for row in conn.execute(sql, params):
+        yield json.loads(row['entry'])
+
+
+def image_map(conn):
+    """Return a mapping of item_id -> imagePath."""
+    return {row['id']: row['image_path'] or ''
+            for row in conn.execute('SELECT id, image_path FROM items')}
+
+
+# ---------------------------------------------------------------------------
+# Recommendations and feedback
+# ---------------------------------------------------------------------------
+
+def upsert_recommendation(conn, rec):
+    """Insert or replace a recommendation document."""
+    conn.execute('INSERT OR REPLACE INTO recommendations (id, timestamp, data) VALUES (?, ?, ?)',
+                 (rec['id'], rec.get('timestamp'), json.dumps(rec, ensure_ascii=False)))
+
+
+def get_recommendation(conn, rec_id):
+    """Return a recommendation document, or None if it does not exist."""
+    row = conn.execute('SELECT data FROM recommendations WHERE id = ?', (rec_id,)).fetchone()
+    return json.loads(row['data']) if row else None
+
+
+def recommendation_ids(conn):
+    """Return the IDs of all stored recommendations."""
+    return [row[0] for row in conn.execute('SELECT id FROM recommendations ORDER BY id')]
+
+
+def upsert_feedback(conn, feedback):
+    """Insert or replace a feedback document."""
+    conn.execute(
+        'INSERT OR REPLACE INTO feedback (id, recommendation_id, timestamp, data) VALUES (?, ?, ?, ?)',
+        (feedback['id'], feedback.get('recommendationId'), feedback.get('timestamp'),
+         json.dumps(feedback, ensure_ascii=False))
+    )
+
+
+# ---------------------------------------------------------------------------
+# JSON import / export
+# ---------------------------------------------------------------------------
+
+def _load_json(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_json(filepath, data):
+    wardrobe_lock.write_json_atomic(filepath, data)
+
+
+def import_json(conn):
+    """Replace the database contents with the current JSON files.
+
+    Wear events still pending in the wear log are compacted into the items file
+    first (under the wardrobe write lock), so the imported wear fields are current.
+    Returns a dict of row counts per table.
+    """
+    counts = {'items': 0, 'recommendations': 0, 'feedback': 0}
+
+    conn.execute('DELETE FROM items')
+    conn.execute('DELETE FROM recommendations')
+    conn.execute('DELETE FROM feedback')
+
+    with wardrobe_lock.writer():
+        if WARDROBE_ITEMS.exists():
+            wear_log.compact()
+            items_data = _load_json(WARDROBE_ITEMS)
+            for position, item in enumerate(items_data.get('items', [])):
+                upsert_item(conn, item, position)
+                counts['items'] += 1
+            if '_schema' in items_data:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('items_schema', ?)",
+                             (json.dumps(items_data['_schema'], ensure_ascii=False),))
+
+        if WARDROBE_INDEX.exists():
+            index_data = _load_json(WARDROBE_INDEX)
+            if '_schema' in index_data:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('index_schema', ?)",
+                             (json.dumps(index_data['_schema'], ensure_ascii=False),))
+
+    for rec_path in sorted(RECOMMENDATIONS_DIR.glob('rec_*.json')):
+        upsert_recommendation(conn, _load_json(rec_path))
+        counts['recommendations'] += 1
+
+    for fb_path in sorted(FEEDBACK_DIR.glob('feedback_*.json')):
+        upsert_feedback(conn, _load_json(fb_path))
+        counts['feedback'] += 1
+
+    return counts
+
+
+def export_json(conn):
+    """Write the database contents back out in the JSON file layout.
+
+    The items and index files are replaced under the wardrobe write lock. Returns
+    a dict of counts per exported document type.
+    """
+    meta = {row['key']: json.loads(row['value']) for row in conn.execute('SELECT key, value FROM meta')}
+
+    with wardrobe_lock.writer():
+        items_data = {'items': load_items(conn)}
+        if 'items_schema' in meta:
+            items_data['_schema'] = meta['items_schema']
+        item_offsets.write_items_file(WARDROBE_ITEMS, items_data)
+
+        index_data = {'items': load_index_entries(conn)}
+        if 'index_schema' in meta:
+            index_data['_schema'] = meta['index_schema']
+        _save_json(WARDROBE_INDEX, index_data)
+
+    recs = conn.execute('SELECT id, data FROM recommendations ORDER BY id').fetchall()
+    for row in recs:
+        _save_json(RECOMMENDATIONS_DIR / f"{row['id']}.json", json.loads(row['data']))
+
+    feedback = conn.execute('SELECT id, data FROM feedback ORDER BY id').fetchall()
+    for row in feedback:
+        _save_json(FEEDBACK_DIR / f"{row['id']}.json", json.loads(row['data']))
+
+    return {'items': len(items_data['items']), 'recommendations': len(recs), 'feedback': len(feedback)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Manage the SQLite wardrobe backend',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Import the JSON files into data/wardrobe/wardrobe.db
+  python scripts/wardrobe_db.py import
+
+  # Export the database back to the JSON files
+  python scripts/wardrobe_db.py export
+
+  # Use the database from the other scripts
+  WARDROBE_BACKEND=sqlite python scripts/wardrobe_query.py --type tops
+        """
+    )
+
+    parser.add_argument('command', choices=['import', 'export', 'stats'], help='Action to perform')
+    parser.add_argument('--db', help=f'Database path (default: {DB_PATH})')
+
+    args = parser.parse_args()
+
+    with open_db(args.db) as conn:
+        if args.command == 'import':
+            counts = import_json(conn)
+            print(f"Imported {counts['items']} item(s), {counts['recommendations']} recommendation(s), "
+                  f"{counts['feedback']} feedback file(s)")
+
+        elif args.command == 'export':
+            counts = export_json(conn)
+            print(f"Exported {counts['items']} item(s), {counts['recommendations']} recommendation(s), "
+                  f"{counts['feedback']} feedback file(s)")
+
+        elif args.command == 'stats':
+            for table in ['items', 'item_seasons', 'item_tags', 'recommendations', 'feedback']:
+                count = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                print(f"{table:20} {count}")
+
+
+if __name__ == '__main__':
+    main()
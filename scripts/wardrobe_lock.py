@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Write Lock
+Serialized writers and consistent, lock-free readers for the wardrobe files.
+
+Writers (update_wardrobe.py, wear log compaction, wardrobe_db.py export) hold an
+exclusive advisory lock on data/wardrobe/.wardrobe.lock for the whole
+read-modify-write, so concurrent sessions queue up instead of overwriting each
+other's edits. Every file is written to a temp file and renamed into place, so a
+reader sees either the old or the new file, never a partial one.
+
+Each completed write bumps a version counter stored in wardrobe.version.json
+together with the size and modification time of wardrobe_index.json,
+wardrobe_items.json and wear_log.tsv at that version; the version file is renamed
+into place last, so it always describes one complete generation. Before a writer
+replaces anything it hard-links the files of the current generation into
+.generations/<version>/, and removes them again after committing.
+
+Readers never take the lock and never wait for it. open_snapshot() opens the three
+files and checks them against the version file; if a writer is between renames
+it opens the linked copies of the committed generation instead. The open handles
+pin that generation: later reads go through them, so a writer replacing the files
+afterwards cannot mix two versions into one read. Callers that read first and
+write later can pass the version they read (update_wardrobe.py --if-version N);
+the write is refused with a conflict if another writer got there first.
+
+On platforms without fcntl the lock is skipped; atomic renames and the version
+counter still apply.
+
+Usage:
+    # Show the current version and whether a writer is active
+    python scripts/wardrobe_lock.py
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import wardrobe_paths
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks
+    fcntl = None
+
+WARDROBE_DIR = wardrobe_paths.WARDROBE_DIR
+LOCK_PATH = WARDROBE_DIR / ".wardrobe.lock"
+VERSION_PATH = WARDROBE_DIR / "wardrobe.version.json"
+GENERATIONS_DIR = WARDROBE_DIR / ".generations"
+TRACKED = (wardrobe_paths.WARDROBE_INDEX,
+           wardrobe_paths.WARDROBE_ITEMS,
+           WARDROBE_DIR / "wear_log.tsv")
+
+# A reader re-reads the version file only when a writer committed while it was
+# opening the files; after this many commits in a row it reads the files as they are
+SNAPSHOT_ATTEMPTS = 10
+
+# Re-entrancy: a nested writer() in the same process reuses the held lock
+_held = threading.local()
+
+
+class ConflictError(Exception):
+    """The wardrobe changed since the version a writer expected."""
+
+
+class Discard(Exception):
+    """Raise inside atomic_file() to drop what was written and keep the old file."""
+
+
+@contextmanager
+def atomic_file(filepath, mode='wb', encoding=None):
+    """Open a private temp file next to filepath and rename it into place on success.
+
+    Readers see the old file or the new one, never a partial write. On an error
+    (or Discard) the temp file is removed and filepath is left as it was. The new
+    file keeps filepath's permissions, or gets 0o644 if it did not exist.
+    """
+    filepath = Path(filepath)
+    fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, prefix=filepath.name + '.', suffix='.tmp')
+    try:
+        try:
+            os.chmod(tmp_path, filepath.stat().st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp_path, filepath)
+    except Discard:
+        os.unlink(tmp_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_atomic(filepath, data):
+    """Write bytes to filepath atomically (see atomic_file)."""
+    with atomic_file(filepath) as f:
+        f.write(data)
+
+
+def write_json_atomic(filepath, data, compact=False, sort_keys=False):
+    """Write JSON atomically: indented like the data files, or compact for caches."""
+    with atomic_file(filepath, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(data, f, separators=(',', ':'), ensure_ascii=False, sort_keys=sort_keys)
+        else:
+            json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=sort_keys)
+
+
+def signatures():
+    """Return [size, mtime_ns] (or None if missing) for each tracked file."""
+    result = []
+    for path in TRACKED:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            result.append(None)
+        else:
+            result.append([stat.st_size, stat.st_mtime_ns])
+    return result
+
+
+def read_version():
+    """Return the last committed {'version': n, 'files': signatures}."""
+    try:
+        with open(VERSION_PATH, 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        return {'version': int(record['version']), 'files': record.get('files')}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {'version': 0, 'files': None}
+
+
+def _commit(version, files):
+    write_json_atomic(VERSION_PATH, {'version': version, 'files': files})
+
+
+def writer_active():
+    """Return True if another process holds the write lock (never blocks)."""
+    if fcntl is None or getattr(_held, 'depth', 0):
+        return False
+    try:
+        with open(LOCK_PATH, 'rb') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(f, fcntl.LOCK_UN)
+    except FileNotFoundError:
+        pass
+    return False
+
+
+def generation_paths(version):
+    """Return where a writer keeps the tracked files of version while replacing them."""
+    directory = GENERATIONS_DIR / str(version)
+    return tuple(directory / path.name for path in TRACKED)
+
+
+class Snapshot:
+    """Open handles on one generation of the tracked files.
+
+    Reads of a tracked path go through its handle (limited to the size it had
+    when pinned, since wear_log.tsv is appended in place); other paths are read
+    from disk.
+    """
+
+    def __init__(self, version, handles, pinned):
+        self.version = version
+        self._handles = {str(path): handle for path, handle in zip(TRACKED, handles)}
+        self._signatures = {str(path): signature for path, signature in zip(TRACKED, pinned)}
+        self._lock = threading.Lock()
+
+    def holds(self, path):
+        return str(path) in self._handles
+
+    def handle(self, path):
+        """Return the open binary file for a tracked path (None if it did not exist)."""
+        return self._handles.get(str(path))
+
+    def signature(self, path):
+        """Return the (size, mtime_ns) of path as pinned, or None if it did not exist."""
+        if self.holds(path):
+            signature = self._signatures[str(path)]
+            return None if signature is None else tuple(signature)
+        try:
+            return wardrobe_paths.file_signature(path)
+        except FileNotFoundError:
+            return None
+
+    def read_bytes(self, path):
+        """Return the pinned contents of path (raises FileNotFoundError if missing)."""
+        if not self.holds(path):
+            return Path(path).read_bytes()
+        handle = self.handle(path)
+        if handle is None:
+            raise FileNotFoundError(path)
+        with self._lock:
+            handle.seek(0)
+            return handle.read(self._signatures[str(path)][0])
+
+    def close(self):
+        for handle in self._handles.values():
+            if handle is not None:
+                handle.close()
+
+
+def _open_all(paths):
+    handles = []
+    for path in paths:
+        try:
+            handles.append(open(path, 'rb'))
+        except FileNotFoundError:
+            handles.append(None)
+    return handles
+
+
+def _close_all(handles):
+    for handle in handles:
+        if handle is not None:
+            handle.close()
+
+
+def _fstat_signature(handle):
+    if handle is None:
+        return None
+    stat = os.fstat(handle.fileno())
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _pin_linked(handles, files):
+    """Return the pinned signatures if linked handles hold the generation in files.
+
+    The wear log link may have grown since (appends go to the same inode), so only
+    its first recorded bytes belong to the generation.
+    """
+    found = [_fstat_signature(handle) for handle in handles]
+    if found[:2] != files[:2]:
+        return None
+    if files[2] is None:
+        return found[:2] + [None]
+    if found[2] is None or found[2][0] < files[2][0]:
+        return None
+    return found[:2] + [files[2]]
+
+
+def open_snapshot():
+    """Open the index, items and wear log of one committed version, without waiting.
+
+    Returns a Snapshot whose version is the version the files belong to. Files
+    that were edited outside the tools (no writer active) are read as they are.
+    """
+    for _ in range(SNAPSHOT_ATTEMPTS):
+        record = read_version()
+        handles = _open_all(TRACKED)
+        found = [_fstat_signature(handle) for handle in handles]
+        if found == record['files'] or record['files'] is None:
+            return Snapshot(record['version'], handles, found)
+        if not writer_active():
+            if read_version()['version'] == record['version']:
+                return Snapshot(record['version'], handles, found)
+            _close_all(handles)
+            continue
+        _close_all(handles)
+
+        # A writer is between renames: read the generation it linked aside
+        handles = _open_all(generation_paths(record['version']))
+        pinned = _pin_linked(handles, record['files'])
+        if pinned is not None:
+            if pinned[2] is None:
+                _close_all(handles[2:])
+                handles[2] = None
+            return Snapshot(record['version'], handles, pinned)
+        # The writer committed and removed it meanwhile: start over
+        _close_all(handles)
+
+    handles = _open_all(TRACKED)
+    return Snapshot(read_version()['version'], handles, [_fstat_signature(h) for h in handles])
+
+
+def current_version():
+    """Return the version of the files on disk, without waiting for a writer."""
+    snapshot = open_snapshot()
+    snapshot.close()
+    return snapshot.version
+
+
+def _link_generation(version):
+    """Hard-link the tracked files of version into generation_paths(version).
+
+    Writers replace files by renaming, so the links keep the old contents for
+    readers that arrive while the writer is mid-commit. Best effort: without hard
+    links readers fall back to re-reading the version file.
+    """
+    shutil.rmtree(GENERATIONS_DIR, ignore_errors=True)  # left by an interrupted writer
+    target = GENERATIONS_DIR / str(version)
+    staging = Path(tempfile.mkdtemp(dir=WARDROBE_DIR, prefix='.generation.'))
+    try:
+        for source, link in zip(TRACKED, generation_paths(version)):
+            if source.exists():
+                os.link(source, staging / link.name)
+        GENERATIONS_DIR.mkdir(exist_ok=True)
+        os.replace(staging, target)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+@contextmanager
+def exclusive(path):
+    """Hold an exclusive advisory lock on path (created if needed) for the block."""
+    with open(path, 'a+b') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+        # Closing the file releases the lock
+
+
+@contextmanager
+def writer(expected_version=None):
+    """Hold the exclusive write lock around a read-modify-write of the wardrobe files.
+
+    Yields the current version. Raises ConflictError before anything is written
+    if expected_version is given and the wardrobe has moved past it. On exit the
+    version is bumped if any tracked file changed.
+    """
+    if getattr(_held, 'depth', 0):
+        _held.depth += 1
+        try:
+            yield read_version()['version']
+        finally:
+            _held.depth -= 1
+        return
+
+    WARDROBE_DIR.mkdir(parents=True, exist_ok=True)
+    with exclusive(LOCK_PATH):
+        _held.depth = 1
+        try:
+            record = read_version()
+            if record['files'] != signatures():
+                # Changed outside the tools since the last commit: that is a new version
+                record = {'version': record['version'] + 1, 'files': signatures()}
+                _commit(record['version'], record['files'])
+            if expected_version is not None and expected_version != record['version']:
+                raise ConflictError(f"wardrobe is at version {record['version']}, expected {expected_version}")
+            _link_generation(record['version'])
+            try:
+                yield record['version']
+            finally:
+                files = signatures()
+                if files != record['files']:
+                    _commit(record['version'] + 1, files)
+                shutil.rmtree(GENERATIONS_DIR, ignore_errors=True)
+        finally:
+            _held.depth = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Show the wardrobe version and write lock state',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Current version, for update_wardrobe.py --if-version
+  python scripts/wardrobe_lock.py --json
+        """
+    )
+    parser.add_argument('--json', action='store_true', help='Output JSON')
+    args = parser.parse_args()
+
+    record = read_version()
+    status = {
+        'version': record['version'],
+        'consistent': record['files'] == signatures(),
+        'writerActive': writer_active(),
+    }
+    if args.json:
+        print(json.dumps(status, indent=2))
+        return
+    print(f"Version:        {status['version']}")
+    print(f"Files match:    {'yes' if status['consistent'] else 'no (changed since the last commit)'}")
+    print(f"Writer active:  {'yes' if status['writerActive'] else 'no'}")
+    if fcntl is None:
+        print("Note: advisory locks are not available on this platform", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Paths
+Project paths and the file signature shared by every wardrobe module.
+
+Kept free of project imports so low-level modules (wardrobe_db, wear_log,
+item_offsets, ...) can use it without importing wardrobe_core, which imports them.
+Set WARDROBE_DATA_DIR to point every script at a different data directory.
+"""
+
+import os
+from pathlib import Path
+
+# Set base path to project root
+BASE_PATH = Path(__file__).parent.parent
+DATA_DIR = Path(os.environ.get('WARDROBE_DATA_DIR', BASE_PATH / "data"))
+WARDROBE_DIR = DATA_DIR / "wardrobe"
+WARDROBE_INDEX = WARDROBE_DIR / "wardrobe_index.json"
+WARDROBE_ITEMS = WARDROBE_DIR / "wardrobe_items.json"
+RECOMMENDATIONS_DIR = DATA_DIR / "recommendations"
+FEEDBACK_DIR = DATA_DIR / "feedback"
+TEMPLATES_DIR = BASE_PATH / "templates"
+
+
+def file_signature(path):
+    """Return a cheap (size, mtime_ns) signature used to detect changed files."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
@@ -6,25 +6,38 @@ Efficiently filter and search wardrobe items without loading the full wardrobe f
 Usage:
     python scripts/wardrobe_query.py --type tops --formality 5-7 --season summer
     python scripts/wardrobe_query.py --category "button-up shirt" --color navy
+    python scripts/wardrobe_query.py --color-near charcoal --max-delta 12
+    python scripts/wardrobe_query.py --type outerwear --temp 48
+    python scripts/wardrobe_query.py --search "zipper pockets stretch" --type bottoms
+    python scripts/wardrobe_query.py --not-worn-since 60d --sort-by last-worn --limit 10
+    python scripts/wardrobe_query.py --type tops --sort=-formality,name --offset 20 --limit 20
+    python scripts/wardrobe_query.py --detailed --fields id,name,metadata.formality --format ndjson
     python scripts/wardrobe_query.py --ids item_20251004_001 item_20251004_002
     python scripts/wardrobe_query.py --all --detailed
+    python scripts/wardrobe_query.py --batch < queries.jsonl
 """
 
 import json
 import argparse
+import re
 import sys
-from pathlib import Path
+from datetime import datetime, timedelta
+from itertools import islice
 
-# Set base path to project root
-BASE_PATH = Path(__file__).parent.parent
-WARDROBE_INDEX = BASE_PATH / "data" / "wardrobe" / "wardrobe_index.json"
-WARDROBE_ITEMS = BASE_PATH / "data" / "wardrobe" / "wardrobe_items.json"
+import color_engine
+import query_cache
+import query_engine
+import search_index
+import telemetry
+import wardrobe_core
+import wardrobe_daemon
+import wardrobe_db
 
+WARDROBE_INDEX = wardrobe_core.WARDROBE_INDEX
+WARDROBE_ITEMS = wardrobe_core.WARDROBE_ITEMS
 
-def load_index():
-    """Load the lightweight wardrobe index."""
-    with open(WARDROBE_INDEX, 'r', encoding='utf-8') as f:
-        return json.load(f)
+# Full records fetched per get_many() call while streaming --detailed output
+DETAIL_CHUNK = 100
 
 
 def load_full_items(item_ids=None):
@@ -33,15 +46,26 @@ def load_full_items(item_ids=None):
     Args:
         item_ids: Optional list of item IDs to filter by. If None, loads all items.
     """
-    with open(WARDROBE_ITEMS, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    wardrobe = wardrobe_core.Wardrobe.load()
+    if item_ids is not None:
+        found, _ = wardrobe.get_many(item_ids)
+        return found
+    return wardrobe.items()
 
-    if item_ids:
-        # Filter to only requested IDs
-        filtered = [item for item in data['items'] if item['id'] in item_ids]
-        return filtered
 
-    return data['items']
+def iter_collect(items, collected):
+    """Yield items unchanged, appending each to the collected list."""
+    for item in items:
+        collected.append(item)
+        yield item
+
+
+def iter_detailed(wardrobe, entries, chunk_size=DETAIL_CHUNK):
+    """Yield the full records of a stream of index entries, fetched chunk by chunk."""
+    entries = iter(entries)
+    for chunk in iter(lambda: list(islice(entries, chunk_size)), []):
+        found, _ = wardrobe.get_many([entry['id'] for entry in chunk])
+        yield from found
 
 
 def parse_formality_range(formality_str):
@@ -54,53 +78,148 @@ def parse_formality_range(formality_str):
         return f, f
 
 
-def filter_index(index_data, args):
-    """Filter index based on provided arguments."""
-    items = index_data['items']
-    filtered = items
-
-    # Filter by type
-    if args.type:
-        filtered = [item for item in filtered if item.get('type', '').lower() == args.type.lower()]
-
-    # Filter by category
-    if args.category:
-        filtered = [item for item in filtered if item.get('category', '').lower() == args.category.lower()]
-
-    # Filter by primary color
-    if args.color:
-        filtered = [item for item in filtered
-                   if args.color.lower() in item.get('primaryColor', '').lower()]
-
-    # Filter by formality range
-    if args.formality:
-        min_f, max_f = parse_formality_range(args.formality)
-        filtered = [item for item in filtered
-                   if min_f <= item.get('formality', 0) <= max_f]
-
-    # Filter by season
-    if args.season:
-        filtered = [item for item in filtered
-                   if args.season.lower() in [s.lower() for s in item.get('seasons', [])]]
+TEMPERATURE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*([cf]?)\s*$', re.IGNORECASE)
+TEMPERATURE_RANGE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*-\s*(-?\d+(?:\.\d+)?)\s*([cf]?)\s*$', re.IGNORECASE)
+
+
+def parse_temperature(value):
+    """Parse '48' or '9c' into degrees Fahrenheit (Fahrenheit unless suffixed with c)."""
+    match = TEMPERATURE.match(value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid temperature: {value} (e.g. 48 or 9c)")
+    return wardrobe_core.to_fahrenheit(float(match.group(1)), match.group(2) or 'f')
+
+
+def parse_temperature_range(value):
+    """Parse '40-55' or '5-12c' into a (min, max) range in degrees Fahrenheit."""
+    match = TEMPERATURE_RANGE.match(value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid temperature range: {value} (e.g. 40-55 or 5-12c)")
+    unit = match.group(3) or 'f'
+    low, high = (wardrobe_core.to_fahrenheit(float(match.group(i)), unit) for i in (1, 2))
+    if low > high:
+        raise argparse.ArgumentTypeError(f"invalid temperature range: {value} (min is above max)")
+    return low, high
+
+
+DAYS_AGO = re.compile(r'^\s*(\d+)\s*d\s*$', re.IGNORECASE)
+
+
+def parse_since(value):
+    """Parse a date ('2025-09-01') or an age in days ('30d') into an ISO date."""
+    match = DAYS_AGO.match(value)
+    if match:
+        return (datetime.utcnow() - timedelta(days=int(match.group(1)))).date().isoformat()
+    try:
+        return datetime.strptime(value.strip(), '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {value} (e.g. 2025-09-01 or 30d)")
+
+
+def parse_count(value):
+    """Parse a non-negative result count (--limit, --offset)."""
+    try:
+        count = int(value)
+    except ValueError:
+        count = -1
+    if count < 0:
+        raise argparse.ArgumentTypeError(f"invalid count: {value}")
+    return count
+
+
+def parse_sort(value):
+    """Parse 'FIELD[,FIELD...]' (prefix '-' for descending) into a list of fields."""
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field.lstrip('-') not in query_engine.ORDER_FIELDS]
+    if not fields or unknown:
+        raise argparse.ArgumentTypeError(
+            f"invalid sort: {value} (fields: {', '.join(query_engine.ORDER_FIELDS)})")
+    return fields
+
+
+def parse_fields(value):
+    """Parse 'id,name,metadata.formality' into a list of dot-notation field paths."""
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    if not fields:
+        raise argparse.ArgumentTypeError(f"invalid fields: {value}")
+    return fields
+
+
+def project(item, fields):
+    """Return a copy of item holding only the given dot-notation fields (missing ones are left out)."""
+    projected = {}
+    for field in fields:
+        parts = field.split('.')
+        value = item
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target = projected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return projected
+
+
+def filter_kwargs(args):
+    """Translate filter flags into QueryEngine.query() keyword arguments."""
+    return {
+        'type': args.type,
+        'category': args.category,
+        'color': args.color,
+        'formality': parse_formality_range(args.formality) if args.formality else None,
+        'season': args.season,
+        'tag': args.tag,
+        'ids': args.ids,
+        'color_near': args.color_near,
+        'max_delta': args.max_delta,
+        'temp': args.temp,
+        'temp_range': args.temp_range,
+        'not_worn_since': args.not_worn_since,
+        'sort_by': args.sort_by,
+        'order': args.sort,
+        'offset': args.offset,
+        'limit': args.limit,
+    }
+
+
+def filter_index(index_data, args, engine=None):
+    """Filter index based on provided arguments.
+
+    Uses the inverted-index engine; pass a prebuilt engine to avoid re-indexing.
+    """
+    if engine is None:
+        engine = query_engine.QueryEngine(wardrobe_core.index_entries(index_data))
+    return engine.query(**filter_kwargs(args))
 
-    # Filter by tags
-    if args.tag:
-        filtered = [item for item in filtered
-                   if args.tag.lower() in [t.lower() for t in item.get('tags', [])]]
 
-    # Filter by IDs
-    if args.ids:
-        id_set = set(args.ids)
-        filtered = [item for item in filtered if item['id'] in id_set]
+def write_ndjson(items, fields=None):
+    """Write one JSON record per line, flushing each as it is produced. Returns the count."""
+    written = 0
+    for item in items:
+        if fields:
+            item = project(item, fields)
+        sys.stdout.write(json.dumps(item) + '\n')
+        sys.stdout.flush()
+        written += 1
+    return written
 
-    return filtered
 
+def format_output(items, detailed=False, output_format='json', fields=None):
+    """Format output based on requested format.
 
-def format_output(items, detailed=False, output_format='json'):
-    """Format output based on requested format."""
+    fields restricts json and ndjson records to those dot-notation paths.
+    """
     if output_format == 'json':
+        if fields:
+            items = [project(item, fields) for item in items]
         print(json.dumps(items, indent=2))
 
+    elif output_format == 'ndjson':
+        write_ndjson(items, fields)
+
     elif output_format == 'summary':
         print(f"\n{'='*80}")
         print(f"Found {len(items)} items")
@@ -112,13 +231,21 @@ def format_output(items, detailed=False, output_format='json'):
             print(f"Type: {item.get('type', 'N/A')} / {item.get('category', 'N/A')}")
             print(f"Color: {item.get('primaryColor', item.get('metadata', {}).get('colors', {}).get('primary', 'N/A'))}")
             print(f"Formality: {item.get('formality', item.get('metadata', {}).get('formality', 'N/A'))}")
+            if 'score' in item:
+                print(f"Relevance: {item['score']}")
 
             if detailed:
                 seasons = item.get('seasons', item.get('context', {}).get('seasons', []))
                 print(f"Seasons: {', '.join(seasons) if seasons else 'N/A'}")
+                temp_range = item.get('tempRange') or wardrobe_core.temp_range_f(item)
+                if temp_range:
+                    print(f"Temperature: {temp_range['min']:g}-{temp_range['max']:g}°F")
                 tags = item.get('tags', [])
                 if tags:
                     print(f"Tags: {', '.join(tags)}")
+                tracking = item.get('tracking', item)
+                last_worn = tracking.get('lastWorn')
+                print(f"Worn: {tracking.get('wearCount', 0)} time(s), last {last_worn[:10] if last_worn else 'never'}")
 
             print(f"{'-'*80}\n")
 
@@ -128,8 +255,199 @@ def format_output(items, detailed=False, output_format='json'):
             print(item.get('id', ''))
 
 
-def main():
-    parser = argparse.ArgumentParser(
+def search_ranked(wardrobe, args):
+    """Return the page of [(entry, score), ...] matching --search, best match first."""
+    filters = filter_kwargs(args)
+    # Results are ranked by relevance, then paged
+    del filters['sort_by'], filters['order'], filters['offset'], filters['limit']
+    stop = None if args.limit is None else args.offset + args.limit
+    return wardrobe.search(args.search, **filters)[args.offset:stop]
+
+
+def search_items(args):
+    """Print items matching --search, best match first, restricted by the filters."""
+    with telemetry.phase('search'):
+        wardrobe = wardrobe_core.Wardrobe.load()
+        ranked = search_ranked(wardrobe, args)
+    scores = {entry['id']: round(score, 4) for entry, score in ranked}
+    telemetry.count('matched', len(ranked))
+
+    if args.detailed:
+        with telemetry.phase('details'):
+            items = load_full_items(list(scores))
+    else:
+        items = [entry for entry, _ in ranked]
+    # Copies: entries and items are shared with the wardrobe cache
+    with telemetry.phase('output'):
+        format_output([dict(item, score=scores[item['id']]) for item in items],
+                      detailed=args.detailed, output_format=args.format, fields=args.fields)
+
+
+# Options that select items; --all states that none are given
+FILTER_OPTIONS = ['type', 'category', 'color', 'color_near', 'formality', 'season', 'tag',
+                  'temp', 'temp_range', 'not_worn_since', 'ids', 'search']
+
+
+def usage_error(args):
+    """Return the message for flags that cannot be combined, or None."""
+    if args.all and any(getattr(args, option) is not None for option in FILTER_OPTIONS):
+        return '--all cannot be combined with filters (it returns every item)'
+    if args.max_delta is not None and not args.color_near:
+        return '--max-delta requires --color-near'
+    if args.sort and args.sort_by:
+        return '--sort and --sort-by cannot be combined'
+    if args.fields and args.format not in ('json', 'ndjson'):
+        return '--fields requires --format json or ndjson'
+    if args.search is not None and (args.sort_by or args.sort):
+        return '--sort/--sort-by cannot be combined with --search (results are ranked by relevance)'
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+BATCH_OPS = ['query', 'details']
+# Options that only make sense for a whole invocation, not per spec
+BATCH_EXCLUDED = ['batch', 'format', 'no_cache', 'timings']
+
+
+def spec_argv(spec):
+    """Translate a batch spec ({"type": "tops", "formality": "5-7", ...}) into arguments."""
+    argv = []
+    for key, value in spec.items():
+        flag = '--' + key.replace('_', '-')
+        if value is None or value is False:
+            continue
+        if value is True:
+            argv.append(flag)
+        elif key == 'ids':
+            argv.extend([flag, *map(str, value if isinstance(value, list) else [value])])
+        elif isinstance(value, list):
+            argv.append(f"{flag}={','.join(map(str, value))}")
+        else:
+            argv.append(f"{flag}={value}")
+    return argv
+
+
+class SpecParser(argparse.ArgumentParser):
+    """Argument parser that raises ValueError instead of exiting."""
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+def parse_spec(spec, parser):
+    """Return (op, args) for a batch spec, or raise ValueError with the problem."""
+    if not isinstance(spec, dict):
+        raise ValueError('Spec must be a JSON object')
+    op = spec.get('op', 'query')
+    if op not in BATCH_OPS:
+        raise ValueError(f"Unknown op {op!r} (expected one of: {', '.join(BATCH_OPS)})")
+    options = {key: value for key, value in spec.items() if key not in ('op', 'tag')}
+    excluded = [key for key in options if key.replace('-', '_') in BATCH_EXCLUDED]
+    if excluded:
+        raise ValueError(f"Not allowed in a batch spec: {', '.join(excluded)}")
+
+    args = parser.parse_args(spec_argv(options))
+    message = usage_error(args)
+    if message:
+        raise ValueError(message)
+    if args.color_near and color_engine.lab(args.color_near) is None:
+        raise ValueError(f"Unrecognized color: {args.color_near}")
+    if args.search is not None and not search_index.tokenize(args.search):
+        raise ValueError('Search text has no searchable words')
+    return op, args
+
+
+def fetch_records(wardrobe, item_ids, records):
+    """Return the full records of item_ids, decoding each at most once per batch.
+
+    records maps item ID -> record (None if not found) across the whole batch.
+    """
+    missing = list(dict.fromkeys(i for i in item_ids if i not in records))
+    if missing:
+        found, _ = wardrobe.get_many(missing)
+        records.update(dict.fromkeys(missing))
+        records.update((item['id'], item) for item in found)
+        telemetry.count('records', len(found))
+    return [records[i] for i in item_ids if records[i] is not None]
+
+
+def answer_spec(wardrobe, op, args, records):
+    """Answer one parsed batch spec. Returns the result fields."""
+    if op == 'details':
+        if not args.ids:
+            raise ValueError("details requires 'ids'")
+        items = fetch_records(wardrobe, args.ids, records)
+        result = {'notFound': [i for i in args.ids if records[i] is None]}
+    elif args.search is not None:
+        ranked = search_ranked(wardrobe, args)
+        scores = {entry['id']: round(score, 4) for entry, score in ranked}
+        entries = [entry for entry, _ in ranked]
+        if args.detailed:
+            entries = fetch_records(wardrobe, list(scores), records)
+        items = [dict(item, score=scores[item['id']]) for item in entries]
+        result = {}
+    else:
+        items = wardrobe.query(**filter_kwargs(args))
+        if args.detailed:
+            items = fetch_records(wardrobe, [entry['id'] for entry in items], records)
+        result = {}
+
+    if args.fields:
+        items = [project(item, args.fields) for item in items]
+    return dict(result, count=len(items), items=items)
+
+
+def answer_line(wardrobe, line, parser, records):
+    """Answer one line of a batch. Returns its result fields."""
+    try:
+        spec = json.loads(line)
+    except ValueError as e:
+        return {'status': 'error', 'message': f"Invalid JSON: {e}"}
+
+    result = {'tag': spec['tag']} if isinstance(spec, dict) and 'tag' in spec else {}
+    try:
+        op, args = parse_spec(spec, parser)
+        result['status'] = 'ok'
+        with telemetry.phase(op):
+            result.update(answer_spec(wardrobe, op, args, records))
+    except ValueError as e:
+        result.update(status='error', message=str(e))
+    return result
+
+
+def run_batch(source):
+    """Answer JSONL query specs in order, one tagged result line each. Returns True if all succeeded.
+
+    The wardrobe is loaded once for the whole batch, and full records fetched
+    for --detailed or details specs are shared between specs.
+    """
+    parser = build_parser(SpecParser)
+    wardrobe = wardrobe_core.Wardrobe.load()
+    records = {}
+    ok = True
+
+    stream = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            result = dict(line=line_number, **answer_line(wardrobe, line, parser, records))
+            ok = ok and result['status'] == 'ok'
+            telemetry.count('specs', 1)
+            sys.stdout.write(json.dumps(result) + '\n')
+            sys.stdout.flush()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return ok
+
+
+def build_parser(parser_class=argparse.ArgumentParser):
+    """Return the argument parser (also used to read --batch specs)."""
+    parser = parser_class(
         description='Query wardrobe items efficiently',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
@@ -140,6 +458,28 @@ Examples:
   # Find navy button-up shirts
   python scripts/wardrobe_query.py --category "button-up shirt" --color navy
 
+  # Items whose primary color looks like navy (perceptual match, not substring)
+  python scripts/wardrobe_query.py --color-near navy --max-delta 20
+
+  # Outerwear wearable at 48°F, or rated for some part of 5-12°C
+  python scripts/wardrobe_query.py --type outerwear --temp 48
+  python scripts/wardrobe_query.py --temp-range 5-12c --season fall
+
+  # Full-text search over names, notes, materials and AI analysis, best match first
+  python scripts/wardrobe_query.py --search "zipper pockets stretch" --type bottoms
+
+  # The 10 formal items that have gone longest without being worn
+  python scripts/wardrobe_query.py --formality 7-10 --not-worn-since 60d --sort-by last-worn --limit 10
+
+  # Least-worn tops
+  python scripts/wardrobe_query.py --type tops --sort-by wear-count --limit 5 --format summary
+
+  # Second page of tops, most formal first, alphabetical within a level
+  python scripts/wardrobe_query.py --type tops --sort=-formality,name --offset 20 --limit 20
+
+  # Stream only a few fields of every full record, one JSON object per line
+  python scripts/wardrobe_query.py --detailed --fields id,name,metadata.formality --format ndjson
+
   # Get specific items by ID with full details
   python scripts/wardrobe_query.py --ids item_20251004_001 item_20251004_002 --detailed
 
@@ -148,6 +488,9 @@ Examples:
 
   # Get just IDs of all jeans (for piping)
   python scripts/wardrobe_query.py --category jeans --format ids
+
+  # Answer one query per JSONL line in a single process (see README for the spec format)
+  python scripts/wardrobe_query.py --batch queries.jsonl
         """
     )
 
@@ -155,37 +498,137 @@ Examples:
     parser.add_argument('--type', help='Filter by type (tops, bottoms, shoes, outerwear, accessories)')
     parser.add_argument('--category', help='Filter by category (e.g., "button-up shirt", "jeans", "sneakers")')
     parser.add_argument('--color', help='Filter by primary color')
+    parser.add_argument('--color-near', metavar='COLOR',
+                       help='Filter by primary colors perceptually close to COLOR (e.g., "navy", "heathered gray")')
+    parser.add_argument('--max-delta', type=float, metavar='N',
+                       help=f'Maximum color difference (CIEDE2000) for --color-near '
+                            f'(default: {query_engine.DEFAULT_MAX_DELTA})')
     parser.add_argument('--formality', help='Filter by formality range (e.g., "5-7" or "6")')
     parser.add_argument('--season', help='Filter by season (spring, summer, fall, winter)')
     parser.add_argument('--tag', help='Filter by tag')
+    parser.add_argument('--temp', type=parse_temperature, metavar='TEMP',
+                       help='Items rated for this temperature (°F, or e.g. "9c")')
+    parser.add_argument('--temp-range', type=parse_temperature_range, metavar='MIN-MAX',
+                       help='Items rated for any part of this range (e.g. "40-55" or "5-12c")')
+    parser.add_argument('--not-worn-since', type=parse_since, metavar='DATE',
+                       help='Items not worn since DATE (e.g. "2025-09-01" or "30d"), including never-worn items')
     parser.add_argument('--ids', nargs='+', help='Get specific items by ID(s)')
-    parser.add_argument('--all', action='store_true', help='Return all items (no filtering)')
+    parser.add_argument('--search', metavar='TEXT',
+                       help='Rank items by relevance to free text (name, notes, material, AI analysis)')
+    parser.add_argument('--all', action='store_true',
+                       help='Return all items (the default without filters; rejected with any filter)')
 
     # Output options
     parser.add_argument('--detailed', action='store_true', help='Include full item details (requires loading wardrobe_items.json)')
-    parser.add_argument('--format', choices=['json', 'summary', 'ids'], default='json',
-                       help='Output format (default: json)')
+    parser.add_argument('--format', choices=['json', 'ndjson', 'summary', 'ids'], default='json',
+                       help='Output format (default: json; ndjson streams one record per line)')
+    parser.add_argument('--fields', type=parse_fields, metavar='FIELDS',
+                       help='Only output these comma-separated fields (e.g. "id,name,metadata.formality")')
+    parser.add_argument('--sort-by', choices=query_engine.SORT_KEYS,
+                       help='Order by last-worn (never/longest ago first) or wear-count (least worn first) '
+                            'instead of wardrobe order')
+    parser.add_argument('--sort', type=parse_sort, metavar='FIELDS',
+                       help='Order by index fields, "-" for descending (e.g. --sort=-formality,name); '
+                            f'one of {", ".join(query_engine.ORDER_FIELDS)}')
+    parser.add_argument('--offset', type=parse_count, default=0, metavar='N', help='Skip the first N items')
+    parser.add_argument('--limit', type=parse_count, metavar='N', help='Return at most N items')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Bypass the on-disk result cache (see query_cache.py)')
+    parser.add_argument('--batch', nargs='?', const='-', metavar='FILE',
+                       help='Answer JSONL query specs from FILE (default: stdin), one tagged result line each')
+    parser.add_argument('--timings', action='store_true',
+                       help='Log per-phase timings to data/telemetry.jsonl and print them to stderr')
+    return parser
 
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
+    telemetry.enable('wardrobe_query', args, parser)
+
+    if args.batch is not None:
+        if telemetry.query_shape(args, parser) != '--batch':
+            parser.error('--batch takes its options from each spec; only --timings may be added')
+        try:
+            ok = run_batch(args.batch)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0 if ok else 1)
+
+    message = usage_error(args)
+    if message:
+        parser.error(message)
+    if args.color_near and color_engine.lab(args.color_near) is None:
+        print(f"Error: Unrecognized color: {args.color_near}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.search is not None:
+        if not search_index.tokenize(args.search):
+            print("Error: Search text has no searchable words", file=sys.stderr)
+            sys.exit(1)
+        search_items(args)
+        return
 
-    # If --all and not --detailed, just return index
-    if args.all and not args.detailed:
-        index_data = load_index()
-        items = index_data['items']
-        format_output(items, detailed=False, output_format=args.format)
+    filters = filter_kwargs(args)
+    use_cache = not args.no_cache and not wardrobe_db.backend_enabled()
+
+    # Repeated queries are answered from the on-disk result cache
+    filtered_items = None
+    if use_cache:
+        with telemetry.phase('cache'):
+            filtered_items = query_cache.lookup(filters)
+        telemetry.count('cache_hits' if filtered_items is not None else 'cache_misses', 1)
+
+    # Answer from the resident daemon when it is running
+    if filtered_items is None and not wardrobe_db.backend_enabled():
+        with telemetry.phase('daemon'):
+            response = wardrobe_daemon.request('filter', filters=filters, detailed=args.detailed)
+        if response is not None:
+            if use_cache and not args.detailed:
+                query_cache.store(filters, response['items'])
+            telemetry.count('matched', len(response['items']))
+            with telemetry.phase('output'):
+                format_output(response['items'], detailed=args.detailed, output_format=args.format,
+                              fields=args.fields)
+            return
+
+    if filtered_items is None and args.format == 'ndjson':
+        # Write each record as the filter produces it instead of collecting the result
+        collected = []
+        with telemetry.phase('stream'):
+            wardrobe = wardrobe_core.Wardrobe.load()
+            items = wardrobe.iter_query(**filters)
+            if use_cache:
+                items = iter_collect(items, collected)
+            if args.detailed:
+                items = iter_detailed(wardrobe, items)
+            written = write_ndjson(items, args.fields)
+        if use_cache:
+            query_cache.store(filters, collected)
+        telemetry.count('matched', written)
         return
 
     # Load and filter index
-    index_data = load_index()
-    filtered_items = filter_index(index_data, args)
+    if filtered_items is None:
+        with telemetry.phase('filter'):
+            wardrobe = wardrobe_core.Wardrobe.load()
+            filtered_items = wardrobe.query(**filters)
+        if use_cache:
+            with telemetry.phase('cache'):
+                query_cache.store(filters, filtered_items)
+    telemetry.count('matched', len(filtered_items))
 
     # If detailed output requested, load full items
     if args.detailed:
         item_ids = [item['id'] for item in filtered_items]
-        full_items = load_full_items(item_ids)
-        format_output(full_items, detailed=True, output_format=args.format)
+        with telemetry.phase('details'):
+            full_items = load_full_items(item_ids)
+        with telemetry.phase('output'):
+            format_output(full_items, detailed=True, output_format=args.format, fields=args.fields)
     else:
-        format_output(filtered_items, detailed=False, output_format=args.format)
+        with telemetry.phase('output'):
+            format_output(filtered_items, detailed=False, output_format=args.format, fields=args.fields)
 
 
 if __name__ == '__main__':
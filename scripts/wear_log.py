@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Wardrobe Wear Log
+Append-only log of wear events with periodic compaction into wardrobe_items.json.
+
+Marking items as worn appends one tab-separated line per item to
+data/wardrobe/wear_log.tsv (item ID, date, optional outfit/recommendation ID)
+instead of rewriting the items file. Readers fold the pending events over the stored
+tracking fields, so wearCount and lastWorn are always current. Compaction merges the
+pending events into wardrobe_items.json (and the wearCount/lastWorn fields of
+wardrobe_index.json) in one pass and moves them to wear_history.tsv, which keeps
+the full wear history of every item.
+
+Usage:
+    # Merge pending wear events into wardrobe_items.json
+    python scripts/wear_log.py compact
+
+    # Show the wear history of an item
+    python scripts/wear_log.py history item_20251004_001
+
+    # Show how many events are pending
+    python scripts/wear_log.py status
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import item_offsets
+import wardrobe_lock
+import wardrobe_paths
+
+WARDROBE_ITEMS = wardrobe_paths.WARDROBE_ITEMS
+WARDROBE_INDEX = wardrobe_paths.WARDROBE_INDEX
+WEAR_LOG = wardrobe_paths.WARDROBE_DIR / "wear_log.tsv"
+WEAR_HISTORY = wardrobe_paths.WARDROBE_DIR / "wear_history.tsv"
+
+# Compact automatically once the pending log grows past this many bytes
+COMPACT_THRESHOLD = 256 * 1024
+
+
+def format_event(item_id, wear_date, outfit_id=None):
+    """Return the log line for a single wear event."""
+    return f"{item_id}\t{wear_date}\t{outfit_id or ''}\n"
+
+
+def append_events(item_ids, wear_date, outfit_id=None, log_path=None):
+    """Append one wear event per item to the log."""
+    lines = ''.join(format_event(item_id, wear_date, outfit_id) for item_id in item_ids)
+    with open(log_path or WEAR_LOG, 'a', encoding='utf-8') as f:
+        f.write(lines)
+
+
+def read_events(log_path=None):
+    """Return all events in a log file as (item_id, date, outfit_id) tuples."""
+    log_path = Path(log_path or WEAR_LOG)
+    if not log_path.exists():
+        return []
+
+    with open(log_path, 'r', encoding='utf-8') as f:
+        return parse_events(f)
+
+
+def parse_events(lines):
+    """Parse log lines into (item_id, date, outfit_id) tuples, skipping malformed ones."""
+    events = []
+    for line in lines:
+        parts = line.rstrip('\n').split('\t')
+        if len(parts) < 2 or not parts[0]:
+            continue
+        outfit_id = parts[2] if len(parts) > 2 and parts[2] else None
+        events.append((parts[0], parts[1], outfit_id))
+    return events
+
+
+def summarize(events):
+    """Collapse events into item_id -> (count, latest date)."""
+    summary = {}
+    for item_id, wear_date, _ in events:
+        count, latest = summary.get(item_id, (0, None))
+        if latest is None or wear_date > latest:
+            latest = wear_date
+        summary[item_id] = (count + 1, latest)
+    return summary
+
+
+def fold_tracking(tracking, count, latest):
+    """Return a copy of a tracking dict with pending wear events applied."""
+    tracking = dict(tracking or {})
+    tracking['wearCount'] = tracking.get('wearCount', 0) + count
+    last_worn = tracking.get('lastWorn')
+    if last_worn is None or latest > last_worn:
+        tracking['lastWorn'] = latest
+    return tracking
+
+
+def apply_pending(items, pending=None):
+    """Return items with pending wear events folded into their tracking fields.
+
+    Items that have no pending events are returned unchanged; the others are
+    shallow copies, so cached records are never modified.
+    """
+    if pending is None:
+        pending = summarize(read_events())
+    if not pending:
+        return items
+
+    result = []
+    for item in items:
+        if item.get('id') in pending:
+            count, latest = pending[item['id']]
+            item = dict(item, tracking=fold_tracking(item.get('tracking'), count, latest))
+        result.append(item)
+    return result
+
+
+def fold_index(index_path, pending):
+    """Apply pending wear events to the wearCount/lastWorn fields of an index file."""
+    index_path = Path(index_path)
+    if not index_path.exists():
+        return
+
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index_data = json.load(f)
+    # Indexes created from older templates use an "index" key
+    for entry in index_data.get('items', index_data.get('index', [])):
+        if entry.get('id') in pending:
+            count, latest = pending[entry['id']]
+            entry.update(fold_tracking(
+                {'wearCount': entry.get('wearCount', 0), 'lastWorn': entry.get('lastWorn')},
+                count, latest))
+
+    wardrobe_lock.write_json_atomic(index_path, index_data)
+
+
+def pending_size(log_path=None):
+    """Return the size in bytes of the pending log."""
+    try:
+        return os.path.getsize(log_path or WEAR_LOG)
+    except OSError:
+        return 0
+
+
+def compact(items_path=None, log_path=None, history_path=None, index_path=None):
+    """Merge pending events into the items and index files in a single pass.
+
+    Returns the number of events merged. Runs under the wardrobe write lock; the
+    pending log is renamed aside first so events logged during compaction land in
+    a fresh log.
+    """
+    items_path = Path(items_path or WARDROBE_ITEMS)
+    log_path = Path(log_path or WEAR_LOG)
+    history_path = Path(history_path or WEAR_HISTORY)
+    index_path = Path(index_path or WARDROBE_INDEX)
+    compacting_path = log_path.with_name(log_path.name + '.compacting')
+
+    with wardrobe_lock.writer():
+        if not compacting_path.exists():
+            if not log_path.exists():
+                return 0
+            os.replace(log_path, compacting_path)
+
+        events = read_events(compacting_path)
+        if events:
+            pending = summarize(events)
+            now = datetime.utcnow().isoformat() + 'Z'
+
+            data = item_offsets.load_items_document(items_path)
+            for item in data['items']:
+                if item.get('id') in pending:
+                    count, latest = pending[item['id']]
+                    item['tracking'] = fold_tracking(item.get('tracking'), count, latest)
+                    item['tracking']['lastUpdated'] = now
+            item_offsets.write_items_file(items_path, data)
+            fold_index(index_path, pending)
+
+            with open(history_path, 'a', encoding='utf-8') as f:
+                f.writelines(format_event(*event) for event in events)
+
+        compacting_path.unlink()
+    return len(events)
+
+
+def history(item_id):
+    """Return the full wear history of an item (compacted and pending), oldest first."""
+    events = read_events(WEAR_HISTORY) + read_events(WEAR_LOG)
+    return sorted((wear_date, outfit_id) for event_id, wear_date, outfit_id in events
+                  if event_id == item_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Manage the append-only wear log',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Merge pending wear events into wardrobe_items.json
+  python scripts/wear_log.py compact
+
+  # Show when an item was worn
+  python scripts/wear_log.py history item_20251004_001
+        """
+    )
+
+    parser.add_argument('command', choices=['compact', 'history', 'status'], help='Action to perform')
+    parser.add_argument('item_id', nargs='?', help='Item ID (for history)')
+
+    args = parser.parse_args()
+
+    if args.command == 'compact':
+        merged = compact()
+        print(f"Compacted {merged} wear event(s) into {WARDROBE_ITEMS.name}")
+
+    elif args.command == 'history':
+        if not args.item_id:
+            parser.error('history requires an item ID')
+        entries = history(args.item_id)
+        if not entries:
+            print(f"No wear history for {args.item_id}")
+            return
+        for wear_date, outfit_id in entries:
+            print(f"{wear_date}  {outfit_id or ''}".rstrip())
+
+    elif args.command == 'status':
+        events = read_events()
+        print(f"{len(events)} pending wear event(s) for {len(summarize(events))} item(s) "
+              f"({pending_size()} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Shared fixtures: every test runs against a small synthetic wardrobe in a scratch
+data directory, generated with benchmark.generate_dataset().
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / 'scripts'
+
+# The scripts resolve their data paths at import time: point them at a scratch
+# directory (outside the repo, like the benchmark harness does) before any import
+DATA_DIR = Path(tempfile.mkdtemp(prefix='wardrobe-tests-'))
+os.environ['WARDROBE_DATA_DIR'] = str(DATA_DIR)
+os.environ.pop('WARDROBE_BACKEND', None)
+os.environ.pop('WARDROBE_TIMINGS', None)
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import benchmark  # noqa: E402
+import wardrobe_core  # noqa: E402
+import wardrobe_db  # noqa: E402
+
+DATASET_SIZE = 60
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def data_dir():
+    """A freshly generated wardrobe of DATASET_SIZE items."""
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+    DATA_DIR.mkdir()
+    benchmark.generate_dataset(DATASET_SIZE, DATA_DIR)
+    wardrobe_core.Wardrobe.clear_caches()
+    yield DATA_DIR
+    wardrobe_core.Wardrobe.clear_caches()
+
+
+@pytest.fixture
+def sqlite_backend(data_dir, monkeypatch):
+    """Switch the scripts (and subprocesses) to the SQLite backend, imported from the JSON files."""
+    monkeypatch.setenv('WARDROBE_BACKEND', 'sqlite')
+    with wardrobe_db.open_db() as conn:
+        wardrobe_db.import_json(conn)
+    wardrobe_core.Wardrobe.clear_caches()
+    return data_dir
+
+
+@pytest.fixture
+def item_ids(data_dir):
+    return list(wardrobe_core.Wardrobe.load().ids)
+
+
+def run_script(name, *args, input=None):
+    """Run a script in a fresh process; returns the CompletedProcess."""
+    return subprocess.run([sys.executable, str(SCRIPTS_DIR / name), *map(str, args)],
+                          capture_output=True, text=True, input=input, env=dict(os.environ))
+
+
+@pytest.fixture
+def script():
+    return run_script
@@ -0,0 +1,65 @@
+"""Benchmark harness: deterministic datasets, regression flags and a smoke run."""
+
+import json
+
+import benchmark
+import item_offsets
+import update_wardrobe
+
+
+def tree(root):
+    """Return the data files under root, without the offsets sidecar (it records an mtime)."""
+    sidecar = item_offsets.sidecar_path(root / 'wardrobe' / 'wardrobe_items.json')
+    return {path.relative_to(root): path.read_bytes() for path in sorted(root.rglob('*'))
+            if path.is_file() and path != sidecar}
+
+
+def test_dataset_is_deterministic_per_seed(tmp_path):
+    counts = benchmark.generate_dataset(40, tmp_path / 'a')
+    benchmark.generate_dataset(40, tmp_path / 'b')
+    benchmark.generate_dataset(40, tmp_path / 'c', seed=7)
+
+    assert counts['items'] == 40 and counts['recommendations'] and counts['feedback']
+    assert tree(tmp_path / 'a') == tree(tmp_path / 'b')
+    assert tree(tmp_path / 'a') != tree(tmp_path / 'c')
+
+
+def test_generated_files_are_consistent(data_dir, capsys):
+    items_path = data_dir / 'wardrobe' / 'wardrobe_items.json'
+    items = json.loads(items_path.read_text(encoding='utf-8'))['items']
+    offsets = item_offsets.load_sidecar(items_path)
+    assert offsets and set(offsets) == {item['id'] for item in items}
+    assert update_wardrobe.sync_index(write=False)
+
+
+def results(**cases):
+    return {'version': benchmark.RESULTS_VERSION, 'results': {'100': cases}}
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = results(slow={'median': 0.010, 'peakKB': 1000}, noise={'median': 0.0001, 'peakKB': 10})
+    current = results(slow={'median': 0.020, 'peakKB': 1100}, noise={'median': 0.0003, 'peakKB': 60},
+                      new={'median': 1.0, 'peakKB': 1})
+
+    rows = benchmark.compare(current, baseline, threshold=0.25)
+    flagged = {(case, metric) for _, case, metric, *_, regressed in rows if regressed}
+    assert flagged == {('slow', 'median')}
+    assert {case for _, case, *_ in rows} == {'slow', 'noise'}
+
+
+def test_run_and_compare_cli(tmp_path, script):
+    output = tmp_path / 'bench.json'
+    result = script('benchmark.py', 'run', '--sizes', '30', '--repeat', '1',
+                    '--cases', 'filter_index', 'mark_items_worn', '--output', output)
+    assert result.returncode == 0, result.stderr
+    stored = json.loads(output.read_text(encoding='utf-8'))
+    assert set(stored['results']['30']) == {'filter_index', 'mark_items_worn'}
+    assert set(stored['results']['30']['filter_index']) == {'min', 'median', 'max', 'peakKB'}
+
+    result = script('benchmark.py', 'compare', output, output)
+    assert result.returncode == 0, result.stderr
+    assert '0 regression(s)' in result.stdout
+
+    result = script('benchmark.py', 'measure', '--data-dir', tmp_path, '--output', tmp_path / 'm.json')
+    assert result.returncode == 2
+    assert 'WARDROBE_DATA_DIR' in result.stderr
@@ -0,0 +1,79 @@
+"""Perceptual color engine: name resolution, CIEDE2000 and the pairwise matrices."""
+
+import math
+
+import pytest
+
+import color_engine
+import query_engine
+
+# Reference pairs from Sharma, Wu and Dalal's CIEDE2000 test data
+SHARMA_PAIRS = [
+    ((50.0, 2.6772, -79.7751), (50.0, 0.0, -82.7485), 2.0425),
+    ((50.0, 0.0, 0.0), (50.0, -1.0, 2.0), 2.3669),
+    ((50.0, 2.5, 0.0), (73.0, 25.0, -18.0), 27.1492),
+    ((50.0, 2.5, 0.0), (50.0, 3.1736, 0.5854), 1.0),
+    ((2.0776, 0.0795, -1.135), (0.9033, -0.0636, -0.5514), 0.9082),
+]
+
+
+@pytest.mark.parametrize('lab1, lab2, expected', SHARMA_PAIRS)
+def test_delta_e_matches_reference_data(lab1, lab2, expected):
+    assert color_engine.delta_e(lab1, lab2) == pytest.approx(expected, abs=1e-4)
+    assert color_engine.delta_e(lab2, lab1) == pytest.approx(expected, abs=1e-4)
+
+
+def test_names_resolve_through_words_modifiers_and_typos():
+    assert color_engine.lab('Grey') == color_engine.lab('gray')
+    assert color_engine.lab('Navy-Blue') == color_engine.lab('navy blue')
+    assert color_engine.name_delta_e('burgandy', 'burgundy') == pytest.approx(0)
+    assert color_engine.lab('#001F3F') == color_engine.lab('navy')
+
+    light, dark = color_engine.lab('light blue'), color_engine.lab('dark blue')
+    assert light[0] > color_engine.lab('blue')[0] > dark[0]
+    assert color_engine.name_delta_e('navy', 'dark blue') < color_engine.name_delta_e('navy', 'red')
+
+    assert color_engine.lab('xyzzy') is None
+    assert color_engine.to_hex('xyzzy') == color_engine.FALLBACK_HEX
+    assert color_engine.to_hex('navy') == '#001f3f'
+
+
+def test_neutrals_go_with_everything():
+    charcoal, red, green = (color_engine.lab(name) for name in ('charcoal', 'red', 'green'))
+    assert color_engine.harmony(charcoal, red) == 1.0
+    assert color_engine.harmony(red, red) == 0.9
+    assert color_engine.harmony(red, green) < 0.9
+
+
+def test_matrices_match_pairwise_functions():
+    names = ['navy', 'heathered gray', 'burgundy', 'olive', 'cream']
+    labs = [color_engine.lab(name) for name in names]
+    delta = color_engine.delta_e_matrix(labs)
+    harmony = color_engine.harmony_matrix(labs)
+    for i, a in enumerate(labs):
+        for j, b in enumerate(labs):
+            assert delta[i][j] == pytest.approx(color_engine.delta_e(a, b), abs=1e-9)
+            assert harmony[i][j] == color_engine.harmony(a, b)
+
+
+def test_item_matrices_use_the_worst_accent():
+    items = [
+        {'id': 'a', 'metadata': {'colors': {'primary': 'navy', 'accent': ['orange']}}},
+        {'id': 'b', 'metadata': {'colors': {'primary': 'navy'}}},
+        {'id': 'c', 'metadata': {'colors': {'primary': 'unknownish'}}},
+    ]
+    ids, delta, harmony = color_engine.item_color_matrices(items)
+    assert ids == ['a', 'b', 'c']
+    assert delta[0][1] == pytest.approx(0)
+    assert math.isinf(delta[0][2])
+    assert harmony[0][1] == min(color_engine.harmony(color_engine.lab(x), color_engine.lab('navy'))
+                                for x in ('navy', 'orange'))
+    assert harmony[2][0] == 1.0
+
+
+def test_color_near_finds_similar_names():
+    entries = [{'id': str(n), 'primaryColor': color} for n, color in
+               enumerate(['navy blue', 'Navy', 'dark navy', 'red', 'khaki'])]
+    engine = query_engine.QueryEngine(entries)
+    assert [entry['id'] for entry in engine.query(color_near='navy', max_delta=10)] == ['0', '1', '2']
+    assert [entry['id'] for entry in engine.query(color='navy')] == ['0', '1', '2']
@@ -0,0 +1,106 @@
+"""Feedback aggregates: incremental refreshes must agree with a rebuild."""
+
+import json
+import os
+import statistics
+
+import feedback_stats
+import wardrobe_core
+
+
+def write_feedback(name, items, overall, wear_again=None, performance=None):
+    path = wardrobe_core.FEEDBACK_DIR / name
+    document = {
+        'actualOutfit': {'itemsWorn': items},
+        'ratings': {'overall': overall, 'comfort': 4, 'wouldWearAgain': wear_again},
+        'learning': {'itemPerformance': {item_id: {'performance': label}
+                                         for item_id, label in (performance or {}).items()}},
+    }
+    path.write_text(json.dumps(document), encoding='utf-8')
+    return path
+
+
+def rebuilt():
+    store, _ = feedback_stats.refresh(rebuild=True)
+    return store
+
+
+def aggregates(store):
+    return {'items': store['items'], 'pairs': store['pairs']}
+
+
+def test_refresh_tracks_added_changed_and_removed_files(data_dir):
+    baseline, _ = feedback_stats.refresh()
+    _, changes = feedback_stats.refresh()
+    assert changes == {'added': [], 'updated': [], 'removed': []}
+    count = len(baseline['manifest'])
+
+    write_feedback('feedback_29990101_001.json', ['item_x', 'item_y', 'item_z'], 5, True, {'item_x': 'excellent'})
+    second = write_feedback('feedback_29990101_002.json', ['item_x', 'item_y'], 2, False)
+    store, changes = feedback_stats.refresh()
+    assert changes['added'] == ['feedback_29990101_001.json', 'feedback_29990101_002.json']
+    assert len(store['manifest']) == count + 2
+    assert aggregates(store) == aggregates(rebuilt())
+
+    write_feedback('feedback_29990101_002.json', ['item_x', 'item_z'], 3, True)
+    stat = second.stat()
+    os.utime(second, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    (wardrobe_core.FEEDBACK_DIR / 'feedback_29990101_001.json').unlink()
+    store, changes = feedback_stats.refresh()
+    assert changes == {'added': [], 'updated': ['feedback_29990101_002.json'],
+                       'removed': ['feedback_29990101_001.json']}
+    assert aggregates(store) == aggregates(rebuilt())
+    assert 'item_y' not in store['items']
+    assert feedback_stats.pair_stats(store, 'item_x', 'item_y') is None
+
+
+def test_item_and_pair_statistics(data_dir):
+    ratings = [5, 3, 4]
+    for n, (overall, wear_again) in enumerate(zip(ratings, [True, False, True]), 1):
+        write_feedback(f'feedback_29990102_{n:03d}.json', ['item_a', 'item_b'] if n < 3 else ['item_a'],
+                       overall, wear_again, {'item_a': 'good'})
+    store, _ = feedback_stats.refresh()
+
+    stats = feedback_stats.item_stats(store, 'item_a')
+    assert stats['feedback'] == 3
+    assert stats['ratings']['overall'] == {'count': 3, 'mean': round(statistics.mean(ratings), 2),
+                                           'stddev': round(statistics.pstdev(ratings), 2)}
+    assert stats['wearAgainRate'] == round(2 / 3, 3)
+    assert stats['performance'] == {'good': 3}
+
+    pair = feedback_stats.pair_stats(store, 'item_b', 'item_a')
+    assert pair['items'] == ['item_a', 'item_b']
+    assert pair['wornTogether'] == 2
+    assert pair['overall']['mean'] == 4
+    assert pair['wearAgainRate'] == 0.5
+    assert feedback_stats.item_stats(store, 'item_missing') is None
+
+
+def test_unreadable_file_is_skipped_until_it_changes(data_dir):
+    broken = wardrobe_core.FEEDBACK_DIR / 'feedback_29990103_001.json'
+    broken.write_text('{not json', encoding='utf-8')
+    store, changes = feedback_stats.refresh()
+    assert broken.name in changes['added']
+    assert store['manifest'][broken.name]['contribution'] is None
+
+    write_feedback(broken.name, ['item_q'], 4)
+    stat = broken.stat()
+    os.utime(broken, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    store, changes = feedback_stats.refresh()
+    assert changes['updated'] == [broken.name]
+    assert feedback_stats.item_stats(store, 'item_q')['feedback'] == 1
+
+
+def test_cli(data_dir, script):
+    write_feedback('feedback_29990104_001.json', ['item_top', 'item_other'], 10, True)
+    result = script('feedback_stats.py', 'top', '--json', '--limit', '1')
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout)[0]['ratings']['overall']['mean'] == 10
+
+    result = script('feedback_stats.py', 'pair', 'item_top', 'item_other', '--no-refresh')
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith('Worn together 1 time(s)')
+
+    result = script('feedback_stats.py', 'pair', 'item_top')
+    assert result.returncode == 2
+    assert 'exactly two' in result.stderr
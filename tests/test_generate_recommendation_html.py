@@ -0,0 +1,66 @@
+"""Recommendation pages: parallel batch rendering and the streamed lookbook."""
+
+import wardrobe_core
+import generate_recommendation_html as generator
+
+
+def page(data_dir, rec_id):
+    return (data_dir / 'recommendations' / f'{rec_id}.html').read_text(encoding='utf-8')
+
+
+def test_parallel_batch_matches_single_renders(data_dir):
+    rec_ids = wardrobe_core.recommendation_ids()
+    assert len(rec_ids) >= 3
+
+    single = {}
+    for rec_id in rec_ids:
+        generator.generate_html(rec_id)
+        single[rec_id] = page(data_dir, rec_id)
+
+    for path in (data_dir / 'recommendations').glob('*.html'):
+        path.unlink()
+    assert generator.generate_batch(rec_ids, workers=2) == 0
+    assert {rec_id: page(data_dir, rec_id) for rec_id in rec_ids} == single
+
+
+def test_batch_reports_missing_documents_and_renders_the_rest(data_dir):
+    rec_ids = wardrobe_core.recommendation_ids()[:2]
+    assert generator.generate_batch(rec_ids + ['rec_missing'], workers=2) == 1
+    for rec_id in rec_ids:
+        assert rec_id in page(data_dir, rec_id)
+
+
+def test_resolve_globs(data_dir):
+    rec_ids = wardrobe_core.recommendation_ids()
+    assert generator.resolve_recommendation_ids([], include_all=True) == rec_ids
+    assert generator.resolve_recommendation_ids(['rec_*', rec_ids[0]]) == rec_ids
+    assert generator.resolve_recommendation_ids(['rec_x']) == ['rec_x']
+
+
+def test_cli_renders_all(data_dir, script):
+    result = script('generate_recommendation_html.py', '--all', '-j', '2')
+    assert result.returncode == 0, result.stderr
+    assert all((data_dir / 'recommendations' / f'{rec_id}.html').exists()
+               for rec_id in wardrobe_core.recommendation_ids())
+
+
+def test_lookbook_includes_only_matching_recommendations(data_dir, tmp_path):
+    recs = [wardrobe_core.load_recommendation(rec_id) for rec_id in wardrobe_core.recommendation_ids()]
+    season = recs[0]['context']['season']
+    wanted = [rec['id'] for rec in recs if rec['context'].get('season', '').lower() == season.lower()]
+    output = tmp_path / 'lookbook.html'
+
+    assert generator.generate_lookbook([rec['id'] for rec in recs], output, season=season.upper()) == len(wanted)
+    html = output.read_text(encoding='utf-8')
+    assert [rec['id'] for rec in recs if rec['id'] in html] == wanted
+    assert html.rstrip().endswith('</html>')
+
+
+def test_empty_lookbook_keeps_the_previous_page(data_dir, tmp_path):
+    output = tmp_path / 'lookbook.html'
+    output.write_text('previous', encoding='utf-8')
+    rec_ids = wardrobe_core.recommendation_ids()
+
+    assert generator.generate_lookbook(rec_ids, output, since='2999-01-01') == 0
+    assert output.read_text(encoding='utf-8') == 'previous'
+    assert list(tmp_path.iterdir()) == [output]
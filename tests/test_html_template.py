@@ -0,0 +1,66 @@
+"""Precompiled HTML templates: slots, regions and the compiled cache."""
+
+import pytest
+
+import html_template
+
+TEXT = """<h1>{{TITLE}}</h1>
+<!-- region:intro -->
+<p>{{INTRO}}</p>
+<!-- endregion:intro -->
+<ul>
+    <!-- region:list -->
+    <li>{{ITEM}}</li>
+    <!-- endregion:list -->
+</ul>
+{{MISSING}}
+"""
+
+
+def naive_render(text, slots):
+    """The repeated whole-document str.replace the compiler replaces."""
+    for name, value in slots.items():
+        text = text.replace('{{' + name + '}}', value)
+    return '\n'.join(line for line in text.split('\n') if 'region:' not in line)
+
+
+def test_kept_regions_render_like_str_replace():
+    template = html_template.CompiledTemplate.from_text(TEXT)
+    slots = {'TITLE': 'Fall', 'INTRO': 'Hello & bye', 'ITEM': 'Coat'}
+    assert template.render(slots) == naive_render(TEXT, slots)
+    assert template.slots == {'TITLE', 'INTRO', 'ITEM', 'MISSING'}
+    assert template.regions == {'intro', 'list'}
+
+
+def test_slot_values_are_not_rescanned():
+    template = html_template.CompiledTemplate.from_text('{{A}}|{{B}}')
+    assert template.render({'A': '{{B}}', 'B': 'b'}) == '{{B}}|b'
+
+
+def test_regions_can_be_replaced_streamed_or_dropped():
+    template = html_template.CompiledTemplate.from_text(TEXT)
+    rendered = template.render({'TITLE': 'T'}, regions={'intro': None,
+                                                       'list': (f'<li>{n}</li>' for n in range(3))})
+    assert rendered == '<h1>T</h1>\n<ul>\n<li>0</li><li>1</li><li>2</li></ul>\n{{MISSING}}\n'
+
+
+@pytest.mark.parametrize('text', ['<!-- region:a -->\nx', 'x\n<!-- endregion:a -->\n',
+                                  '<!-- region:a -->\n<!-- region:b -->\n<!-- endregion:a -->\n'])
+def test_unbalanced_regions_are_rejected(text):
+    with pytest.raises(ValueError):
+        html_template.compile_template(text)
+
+
+def test_compiled_form_is_cached_until_the_text_changes(tmp_path):
+    path = tmp_path / 'page.html'
+    path.write_text(TEXT, encoding='utf-8')
+    first = html_template.CompiledTemplate.load(path)
+    cache = html_template.cache_path(path)
+    assert cache.exists()
+    stamp = cache.stat().st_mtime_ns
+
+    assert html_template.CompiledTemplate.load(path).parts == first.parts
+    assert cache.stat().st_mtime_ns == stamp
+
+    path.write_text('<p>{{OTHER}}</p>', encoding='utf-8')
+    assert html_template.CompiledTemplate.load(path).render({'OTHER': 'x'}) == '<p>x</p>'
@@ -0,0 +1,48 @@
+"""Columnar index snapshot: rows must round-trip with their JSON types."""
+
+import json
+
+import index_snapshot
+import update_wardrobe
+
+
+def test_round_trip_keeps_types(tmp_path):
+    index_path = tmp_path / 'wardrobe_index.json'
+    entries = [
+        {'id': 'a', 'formality': 5, 'score': 1.5, 'tags': ['x'], 'tempRange': {'min': 50, 'max': 80}},
+        {'id': 'b', 'formality': None, 'score': 2, 'tags': [], 'tempRange': {'min': 10.4, 'max': 71.6}},
+        {'id': 'c', 'formality': 7, 'score': None, 'tags': None, 'tempRange': None},
+        {'id': 'd', 'formality': 3, 'score': -4, 'tags': ['x', 'y'], 'tempRange': {'min': -5, 'max': 0.5}},
+    ]
+    assert index_snapshot.write_snapshot(index_path, entries, (1, 2)) is not None
+
+    snapshot = index_snapshot.load_snapshot(index_path, (1, 2))
+    assert len(snapshot) == len(entries)
+    for row, entry in zip(snapshot, entries):
+        assert index_snapshot.same_value(row, entry), (row, entry)
+
+
+def test_same_value_distinguishes_int_and_float():
+    assert index_snapshot.same_value({'min': 50}, {'min': 50})
+    assert not index_snapshot.same_value({'min': 50}, {'min': 50.0})
+    assert not index_snapshot.same_value([1, True], [1, 1])
+
+
+def test_query_output_does_not_depend_on_snapshot(data_dir, item_ids, script):
+    # One celsius range makes tempRange a mixed int/float column
+    update_wardrobe.update_item_field(item_ids[0], 'context.weather.tempRange',
+                                      {'min': 12, 'max': 21, 'unit': 'celsius'})
+
+    cold = script('wardrobe_query.py', '--no-cache')
+    assert cold.returncode == 0, cold.stderr
+    assert index_snapshot.snapshot_path(data_dir / 'wardrobe' / 'wardrobe_index.json').exists()
+    warm = script('wardrobe_query.py', '--no-cache')
+    assert warm.returncode == 0, warm.stderr
+    assert warm.stdout == cold.stdout
+
+    ranges = [entry['tempRange'] for entry in json.loads(warm.stdout) if entry['tempRange']]
+    assert any(isinstance(r['min'], int) for r in ranges)
+    assert any(isinstance(r['min'], float) for r in ranges)
+
+    verify = script('index_snapshot.py', '--verify')
+    assert verify.returncode == 0, verify.stderr
@@ -0,0 +1,57 @@
+"""Incremental index rebuild and --check-index drift detection."""
+
+import pytest
+
+import index_sync
+import item_offsets
+
+
+def rename_by_hand(items_path, item_id, name):
+    data = item_offsets.load_items_document(items_path)
+    for item in data['items']:
+        if item['id'] == item_id:
+            item['name'] = name
+    item_offsets.write_items_file(items_path, data)
+
+
+def no_hashing(*args):
+    raise AssertionError('records were re-hashed')
+
+
+def test_check_after_sync_uses_stored_hashes(data_dir, monkeypatch):
+    report = index_sync.sync_index(write=False)
+    assert report['recomputed'] == report['items']
+    assert not (report['missing'] or report['orphaned'] or report['mismatched'])
+
+    monkeypatch.setattr(index_sync, 'record_hashes', no_hashing)
+    report = index_sync.sync_index(write=False)
+    assert report['recomputed'] == 0
+    assert report['items'] > 0
+
+
+def test_hand_edit_is_found_and_rebuilt(data_dir, item_ids):
+    items_path = data_dir / 'wardrobe' / 'wardrobe_items.json'
+    index_path = data_dir / 'wardrobe' / 'wardrobe_index.json'
+    index_sync.sync_index(write=True)
+    rename_by_hand(items_path, item_ids[4], 'Edited by hand')
+    before = index_path.read_bytes()
+
+    report = index_sync.sync_index(write=False)
+    assert report['mismatched'] == [item_ids[4]]
+    assert report['recomputed'] == 1
+    assert not report['written']
+    assert index_path.read_bytes() == before
+
+    report = index_sync.sync_index(write=True)
+    assert report['written']
+    report = index_sync.sync_index(write=False)
+    assert not report['mismatched']
+    assert report['recomputed'] == 0
+
+
+@pytest.mark.parametrize('write', [False, True])
+def test_cli_exit_status_reflects_drift(data_dir, item_ids, script, write):
+    rename_by_hand(data_dir / 'wardrobe' / 'wardrobe_items.json', item_ids[0], 'Drifted')
+    result = script('update_wardrobe.py', '--rebuild-index' if write else '--check-index')
+    assert result.returncode == (0 if write else 1), result.stderr
+    assert item_ids[0] in result.stdout
@@ -0,0 +1,45 @@
+"""Byte-offset sidecar for wardrobe_items.json."""
+
+import json
+
+import item_offsets
+
+DOCUMENT = {
+    '_schema': {'version': '1.0'},
+    'items': [
+        {'id': 'item_a', 'name': 'Crème Café Sweater', 'tags': ['knit'], 'metadata': {'formality': 4}},
+        {'id': 'item_b', 'name': 'Plain Tee', 'notes': 'line\nbreak "quoted"', 'tags': []},
+        {'id': 'item_c', 'name': 'Ünïcödé Scarf ☃', 'tracking': {'wearCount': 2}},
+    ],
+}
+
+
+def test_dump_matches_json_dump_and_offsets(tmp_path):
+    payload, offsets = item_offsets.dump_items_document(DOCUMENT)
+    assert payload.decode('utf-8') == json.dumps(DOCUMENT, indent=2, ensure_ascii=False)
+    for item in DOCUMENT['items']:
+        offset, length = offsets[item['id']]
+        assert json.loads(payload[offset:offset + length].decode('utf-8')) == item
+    assert item_offsets.scan_offsets(payload) == offsets
+
+
+def test_read_items_decodes_only_requested_records(tmp_path):
+    items_path = tmp_path / 'wardrobe_items.json'
+    item_offsets.write_items_file(items_path, DOCUMENT)
+
+    found = item_offsets.read_items(items_path, ['item_c', 'item_missing', 'item_a'])
+    assert found == {'item_a': DOCUMENT['items'][0], 'item_c': DOCUMENT['items'][2]}
+
+
+def test_stale_sidecar_falls_back_and_is_regenerated(tmp_path):
+    items_path = tmp_path / 'wardrobe_items.json'
+    item_offsets.write_items_file(items_path, DOCUMENT)
+
+    # Edited by another tool: compact layout, sidecar not updated
+    edited = json.loads(json.dumps(DOCUMENT))
+    edited['items'][1]['name'] = 'Edited Tee'
+    items_path.write_text(json.dumps(edited, ensure_ascii=False), encoding='utf-8')
+    assert item_offsets.read_items(items_path, ['item_b']) is None
+
+    assert item_offsets.load_items_document(items_path) == edited
+    assert item_offsets.read_items(items_path, ['item_b']) == {'item_b': edited['items'][1]}
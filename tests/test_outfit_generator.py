@@ -0,0 +1,120 @@
+"""Outfit generator: branch and bound must find what an exhaustive search finds."""
+
+import itertools
+import json
+import random
+
+import pytest
+
+import outfit_generator
+import wardrobe_core
+
+
+def exhaustive(search, slot_indices):
+    """Score every valid combination the slow way; returns scores best first."""
+    scores = []
+    for outfit in itertools.product(*slot_indices):
+        levels = [search.formality[i] for i in outfit]
+        spread = max(levels) - min(levels)
+        pairs = [search.harmony[a][b] for a, b in itertools.combinations(outfit, 2)]
+        if spread > search.max_spread or (pairs and min(pairs) < search.min_harmony):
+            continue
+        scores.append(search.score(sum(search.fit[i] for i in outfit), sum(pairs), spread))
+    return sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_search_matches_exhaustive(seed):
+    rng = random.Random(seed)
+    sizes = [rng.randint(2, 6) for _ in range(4)]
+    total = sum(sizes)
+    slot_indices, pos = [], 0
+    for size in sizes:
+        slot_indices.append(list(range(pos, pos + size)))
+        pos += size
+    harmony = [[1.0] * total for _ in range(total)]
+    for a, b in itertools.combinations(range(total), 2):
+        harmony[a][b] = harmony[b][a] = rng.choice([0.4, 0.7, 0.8, 0.9, 1.0])
+
+    search = outfit_generator.OutfitSearch(
+        slot_indices,
+        fit=[rng.random() for _ in range(total)],
+        formality=[rng.randint(3, 8) for _ in range(total)],
+        harmony=harmony,
+        pool_size=4,
+    ).vectorize()
+    expected = exhaustive(search, slot_indices)[:4]
+
+    found = search.run()
+    assert [score for score, _ in found] == pytest.approx(expected)
+    for _, outfit in found:
+        assert sorted(outfit) == sorted(set(outfit)) and len(outfit) == len(sizes)
+        assert [sum(i in indices for i in outfit) for indices in slot_indices] == [1] * len(sizes)
+
+
+def test_distinct_outfits_prefers_different_pieces():
+    pool = [(0.9, (0, 2, 4)), (0.8, (0, 2, 5)), (0.7, (1, 3, 4))]
+    assert outfit_generator.distinct_outfits(pool, 2) == [(0.9, (0, 2, 4)), (0.7, (1, 3, 4))]
+    assert outfit_generator.distinct_outfits(pool, 3) == pool
+
+
+def context(occasion='dinner', season='fall', temp_f=55):
+    return {'occasion': occasion, 'words': outfit_generator.occasion_words(occasion),
+            'season': season, 'formality': outfit_generator.default_formality(occasion),
+            'temperature': temp_f, 'unit': 'fahrenheit', 'temp_f': temp_f, 'time_of_day': None}
+
+
+def test_generated_outfits_respect_the_constraints(data_dir):
+    ctx = context()
+    outfits, stats = outfit_generator.generate(ctx, top_k=2)
+    assert outfits and stats['evaluated'] > 0
+
+    wardrobe = wardrobe_core.Wardrobe.load()
+    for score, pieces in outfits:
+        slots = [slot for slot, _, _ in pieces]
+        assert slots == [slot for slot in outfit_generator.SLOTS if slot in slots]
+        assert {'outerwear', 'tops', 'bottoms', 'shoes'} <= set(slots)
+        levels = [item['metadata']['formality'] for _, item, _ in pieces]
+        assert max(levels) - min(levels) <= outfit_generator.DEFAULT_MAX_SPREAD
+        for slot, item, _ in pieces:
+            assert item['type'] == slot
+            assert ctx['season'] in wardrobe.get(item['id'])['context']['seasons']
+            assert outfit_generator.temp_fit(item, ctx['temp_f']) > 0
+
+
+def test_save_replaces_the_file_atomically(data_dir, monkeypatch):
+    rec = {'id': 'rec_29990101_001', 'outfit': {}}
+    path = outfit_generator.save_recommendation(rec)
+    assert json.loads(path.read_text(encoding='utf-8')) == rec
+    files = sorted(path.parent.iterdir())
+
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(json, 'dump', fail)
+    with pytest.raises(OSError):
+        outfit_generator.save_recommendation(dict(rec, outfit={'primary': {}}))
+    assert json.loads(path.read_text(encoding='utf-8')) == rec
+    assert sorted(path.parent.iterdir()) == files
+
+
+def test_cli_saves_a_renderable_recommendation(data_dir, script):
+    printed = script('outfit_generator.py', '--occasion', 'dinner', '--season', 'fall', '--temp', '12',
+                     '--unit', 'c', '--top-k', '2')
+    assert printed.returncode == 0, printed.stderr
+    rec = json.loads(printed.stdout)
+    assert rec['context']['weather'] == {'temperature': 12, 'unit': 'celsius'}
+    assert set(rec['outfit']) == {'primary', 'alternative1'}
+
+    saved = script('outfit_generator.py', '--occasion', 'dinner', '--season', 'fall', '--temp', '12',
+                   '--unit', 'c', '--save')
+    assert saved.returncode == 0, saved.stderr
+    rec_id = saved.stdout.split()[2]
+    assert wardrobe_core.recommendation_path(rec_id).exists()
+
+    rendered = script('generate_recommendation_html.py', rec_id)
+    assert rendered.returncode == 0, rendered.stderr
+
+    missing = script('outfit_generator.py', '--occasion', 'gala', '--season', 'summer', '--temp', '-40')
+    assert missing.returncode == 1
+    assert missing.stderr.startswith('Error:')
@@ -0,0 +1,64 @@
+"""On-disk query result cache: lookups, LRU eviction and concurrent stores."""
+
+import threading
+
+import query_cache
+import update_wardrobe
+
+
+def manifest_state():
+    return query_cache.MANIFEST.read_bytes(), query_cache.MANIFEST.stat().st_mtime_ns
+
+
+def test_hits_do_not_rewrite_the_manifest(data_dir):
+    query_cache.store({'type': 'tops'}, [{'id': 'a'}])
+    before = manifest_state()
+
+    for _ in range(3):
+        assert query_cache.lookup({'type': 'TOPS'}) == [{'id': 'a'}]
+    assert query_cache.lookup({'type': 'shoes'}) is None
+
+    assert manifest_state() == before
+    summary = query_cache.stats()
+    assert (summary['hits'], summary['misses']) == (3, 1)
+
+
+def test_logged_hits_count_for_eviction(data_dir, monkeypatch):
+    monkeypatch.setattr(query_cache, 'MAX_ENTRIES', 2)
+    query_cache.store({'type': 'tops'}, [1])
+    query_cache.store({'type': 'bottoms'}, [2])
+    assert query_cache.lookup({'type': 'tops'}) == [1]
+
+    query_cache.store({'type': 'shoes'}, [3])
+    assert query_cache.lookup({'type': 'tops'}) == [1]
+    assert query_cache.lookup({'type': 'bottoms'}) is None
+    assert query_cache.load_manifest()['hits'] == 1
+    assert query_cache.stats()['hits'] == 2
+
+
+def test_usage_log_is_folded_in_batches(data_dir, monkeypatch):
+    query_cache.store({'type': 'tops'}, [1])
+    monkeypatch.setattr(query_cache, 'USAGE_FOLD_BYTES', 0)
+    assert query_cache.lookup({'type': 'tops'}) == [1]
+
+    assert not query_cache.USAGE_LOG.exists()
+    assert query_cache.load_manifest()['hits'] == 1
+
+
+def test_concurrent_stores_keep_every_result(data_dir):
+    types = [f'type{n}' for n in range(8)]
+    threads = [threading.Thread(target=query_cache.store, args=({'type': t}, [t])) for t in types]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert query_cache.stats()['entries'] == len(types)
+    assert [query_cache.lookup({'type': t}) for t in types] == [[t] for t in types]
+
+
+def test_edit_invalidates(data_dir, item_ids):
+    query_cache.store({'type': 'tops'}, [1])
+    update_wardrobe.update_item_field(item_ids[0], 'name', 'Changed')
+    assert query_cache.lookup({'type': 'tops'}) is None
+    assert query_cache.stats()['invalidations'] == 1
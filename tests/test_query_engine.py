@@ -0,0 +1,176 @@
+"""Inverted-index query engine: results must match a plain scan of the index."""
+
+import json
+import random
+
+import pytest
+
+import query_engine
+import update_wardrobe
+import wardrobe_core
+import wardrobe_query
+
+FILTERS = [
+    {'type': 'tops'},
+    {'category': 'JACKET'},
+    {'color': 'blu'},
+    {'season': 'fall', 'formality': (4, 7)},
+    {'tag': 'versatile', 'type': 'bottoms'},
+    {'formality': (8, 10)},
+    {'type': 'no-such-type'},
+]
+
+
+def load_entries(data_dir):
+    with open(data_dir / 'wardrobe' / 'wardrobe_index.json', 'r', encoding='utf-8') as f:
+        return json.load(f)['items']
+
+
+def scan(entries, type=None, category=None, color=None, formality=None, season=None, tag=None, ids=None):
+    """The linear filter the engine replaces."""
+    def keep(entry):
+        return ((type is None or entry['type'].lower() == type.lower())
+                and (category is None or entry['category'].lower() == category.lower())
+                and (color is None or color.lower() in entry['primaryColor'].lower())
+                and (formality is None or formality[0] <= entry['formality'] <= formality[1])
+                and (season is None or season.lower() in [s.lower() for s in entry['seasons']])
+                and (tag is None or tag.lower() in [t.lower() for t in entry['tags']])
+                and (ids is None or entry['id'] in ids))
+    return [entry['id'] for entry in entries if keep(entry)]
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_matches_linear_scan(data_dir, filters):
+    entries = load_entries(data_dir)
+    engine = query_engine.QueryEngine(entries)
+    assert [entry['id'] for entry in engine.query(**filters)] == scan(entries, **filters)
+
+
+def test_ids_offset_and_limit(data_dir):
+    entries = load_entries(data_dir)
+    engine = query_engine.QueryEngine(entries)
+    wanted = [entries[9]['id'], entries[2]['id'], 'item_missing', entries[5]['id']]
+    assert [entry['id'] for entry in engine.query(ids=wanted)] == scan(entries, ids=wanted)
+    assert engine.query(offset=10, limit=5) == entries[10:15]
+
+
+def test_cached_engine_is_rebuilt_when_the_index_changes(data_dir):
+    index_path = data_dir / 'wardrobe' / 'wardrobe_index.json'
+    first = query_engine.load_engine(index_path)
+    assert query_engine.engine_path(index_path).exists()
+    assert query_engine.load_engine(index_path).query(type='tops') == first.query(type='tops')
+
+    index_data = json.loads(index_path.read_text(encoding='utf-8'))
+    index_data['items'][0]['type'] = 'capes'
+    index_path.write_text(json.dumps(index_data), encoding='utf-8')
+    assert [entry['id'] for entry in query_engine.load_engine(index_path).query(type='capes')] == \
+        [index_data['items'][0]['id']]
+
+
+def random_ranges(rng, count):
+    entries = []
+    for n in range(count):
+        low = rng.choice([rng.randint(-10, 90), rng.uniform(-10, 90), 50])
+        high = low + rng.choice([0, rng.randint(0, 40), rng.uniform(0, 40)])
+        entries.append({'id': f'item_{n:03d}', 'tempRange': {'min': low, 'max': high}})
+    entries.append({'id': 'item_unrated', 'tempRange': None})
+    return entries
+
+
+def overlapping(entries, low, high):
+    return [entry['id'] for entry in entries
+            if entry['tempRange'] and entry['tempRange']['min'] <= high and entry['tempRange']['max'] >= low]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_temperature_queries_match_linear_scan(seed):
+    rng = random.Random(seed)
+    entries = random_ranges(rng, 200)
+    engine = query_engine.QueryEngine(entries)
+    points = [-20, -10, 0, 32, 50, 90, 130] + [rng.uniform(-20, 130) for _ in range(20)]
+    for point in points:
+        assert [entry['id'] for entry in engine.query(temp=point)] == overlapping(entries, point, point)
+    for low in points:
+        high = low + rng.choice([0, 5, 30])
+        assert [entry['id'] for entry in engine.query(temp_range=(low, high))] == \
+            overlapping(entries, low, high)
+
+
+def test_temperature_arguments_are_fahrenheit():
+    assert wardrobe_query.parse_temperature('48') == 48
+    assert wardrobe_query.parse_temperature('10c') == pytest.approx(50)
+    assert wardrobe_query.parse_temperature_range('5-12C') == pytest.approx((41, 53.6))
+    with pytest.raises(Exception, match='min is above max'):
+        wardrobe_query.parse_temperature_range('60-40')
+
+
+def test_temperature_flags_select_rated_items(data_dir, script):
+    entries = load_entries(data_dir)
+    result = script('wardrobe_query.py', '--no-cache', '--temp', '10c', '--type', 'outerwear')
+    assert result.returncode == 0, result.stderr
+    expected = [entry['id'] for entry in entries if entry['type'] == 'outerwear'
+                and entry['id'] in overlapping(entries, 50, 50)]
+    assert [entry['id'] for entry in json.loads(result.stdout)] == expected
+
+
+def random_wear(rng, count):
+    entries = []
+    for n in range(count):
+        worn = rng.random() < 0.8
+        entries.append({'id': f'item_{n:03d}',
+                        'lastWorn': f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}' if worn else None,
+                        'wearCount': rng.randint(1, 30) if worn else 0})
+    return entries
+
+
+def with_pending(entry, pending):
+    count, latest = pending.get(entry['id'], (0, None))
+    last_worn = max(filter(None, [entry['lastWorn'], latest]), default=None)
+    return dict(entry, wearCount=entry['wearCount'] + count, lastWorn=last_worn)
+
+
+def rotation_scan(entries, pending, since=None, sort_by=None, limit=None):
+    current = [with_pending(entry, pending) for entry in entries]
+    if since:
+        current = [entry for entry in current if not entry['lastWorn'] or entry['lastWorn'] < since]
+    if sort_by == 'last-worn':
+        current.sort(key=lambda entry: entry['lastWorn'] or '')
+    elif sort_by == 'wear-count':
+        current.sort(key=lambda entry: entry['wearCount'])
+    return current[:limit]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_rotation_queries_match_linear_scan(seed):
+    rng = random.Random(seed)
+    entries = random_wear(rng, 150)
+    engine = query_engine.QueryEngine(entries)
+    pending = {entry['id']: (rng.randint(1, 3), f'2025-{rng.randint(6, 12):02d}-15')
+               for entry in rng.sample(entries, 20)}
+    for since in (None, '2025-03-01', '2025-07-01', '2026-01-01'):
+        for sort_by in (None, 'last-worn', 'wear-count'):
+            for limit in (None, 5):
+                assert engine.query(not_worn_since=since, sort_by=sort_by, limit=limit, pending=pending) == \
+                    rotation_scan(entries, pending, since, sort_by, limit), (since, sort_by, limit)
+    # Selective filters take the small-result path
+    few = [entry['id'] for entry in entries[:10]]
+    assert engine.query(ids=few, sort_by='last-worn', pending=pending) == \
+        rotation_scan(entries[:10], pending, sort_by='last-worn')
+
+
+def test_rotation_sees_pending_wear(data_dir, item_ids, script):
+    since = '2025-01-01'
+    before = [entry['id'] for entry in wardrobe_core.Wardrobe.load().query(not_worn_since=since)]
+    assert before
+    update_wardrobe.mark_items_worn(before[:2], '2025-11-01T10:00:00Z')
+
+    wardrobe_core.Wardrobe.clear_caches()
+    wardrobe = wardrobe_core.Wardrobe.load()
+    assert [entry['id'] for entry in wardrobe.query(not_worn_since=since)] == before[2:]
+    assert [entry['id'] for entry in wardrobe.query(sort_by='last-worn')][-2:] == sorted(before[:2])
+
+    result = script('wardrobe_query.py', '--no-cache', '--not-worn-since', since, '--sort-by', 'last-worn',
+                    '--limit', '3')
+    assert result.returncode == 0, result.stderr
+    assert [entry['id'] for entry in json.loads(result.stdout)] == \
+        [entry['id'] for entry in wardrobe.query(not_worn_since=since, sort_by='last-worn', limit=3)]
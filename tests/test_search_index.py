@@ -0,0 +1,104 @@
+"""BM25 search index: incremental updates and staleness checks on both backends."""
+
+import threading
+
+import pytest
+
+import search_index
+import update_wardrobe
+import wardrobe_core
+import wardrobe_db
+import wardrobe_lock
+
+
+def no_rehash(*args):
+    raise AssertionError('item records were re-hashed')
+
+
+def search_ids(text):
+    wardrobe_core.Wardrobe.clear_caches()
+    return [entry['id'] for entry, _ in wardrobe_core.Wardrobe.load().search(text)]
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def backend(request, data_dir):
+    if request.param == 'sqlite':
+        return request.getfixturevalue('sqlite_backend')
+    return data_dir
+
+
+def test_unchanged_items_are_not_rehashed(backend, monkeypatch):
+    search, changed = search_index.update_index()
+    assert changed == len(search.docs) > 0
+
+    monkeypatch.setattr(search_index, '_record_sources', no_rehash)
+    _, changed = search_index.update_index()
+    assert changed == 0
+
+
+def test_edit_reindexes_only_that_item(backend, item_ids):
+    search_index.update_index()
+    update_wardrobe.update_item_field(item_ids[3], 'name', 'Quetzal Overshirt')
+
+    _, changed = search_index.update_index()
+    assert changed == 1
+    assert search_ids('quetzal') == [item_ids[3]]
+
+
+def test_search_matches_json(data_dir, monkeypatch):
+    expected = search_ids('cotton stretch')
+    assert expected
+
+    monkeypatch.setenv('WARDROBE_BACKEND', 'sqlite')
+    with wardrobe_db.open_db() as conn:
+        wardrobe_db.import_json(conn)
+    assert search_ids('cotton stretch') == expected
+
+
+def test_generation_counts_every_item_change(sqlite_backend, item_ids):
+    with wardrobe_db.open_db() as conn:
+        instance, before = wardrobe_db.items_generation(conn)
+        item = wardrobe_db.get_item(conn, item_ids[0])
+        wardrobe_db.upsert_item(conn, dict(item, name='Renamed'))
+        wardrobe_db.delete_item(conn, item_ids[1])
+        assert wardrobe_db.items_generation(conn) == [instance, before + 2]
+        conn.execute('UPDATE items SET name = ? WHERE id = ?', ('Raw edit', item_ids[2]))
+        assert wardrobe_db.items_generation(conn) == [instance, before + 3]
+
+
+def test_results_carry_pending_wear(data_dir, item_ids):
+    update_wardrobe.update_item_field(item_ids[4], 'name', 'Quokka Cardigan')
+    update_wardrobe.mark_items_worn([item_ids[4]], '2026-02-01T08:00:00Z')
+
+    wardrobe_core.Wardrobe.clear_caches()
+    wardrobe = wardrobe_core.Wardrobe.load()
+    [(entry, _)] = wardrobe.search('quokka')
+    assert entry == wardrobe.query(ids=[item_ids[4]])[0]
+    assert entry['lastWorn'] >= '2026-02-01'
+
+
+def test_search_reads_the_pinned_generation(data_dir, item_ids):
+    update_wardrobe.update_item_field(item_ids[5], 'name', 'Pangolin Parka')
+    written, release = threading.Event(), threading.Event()
+
+    def write():
+        with wardrobe_lock.writer():
+            update_wardrobe.update_item_field(item_ids[5], 'name', 'Axolotl Anorak')
+            written.set()
+            release.wait(10)
+
+    wardrobe_core.Wardrobe.clear_caches()
+    wardrobe = wardrobe_core.Wardrobe.load()
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        assert written.wait(10)
+        assert [entry['id'] for entry, _ in wardrobe.search('pangolin')] == [item_ids[5]]
+        assert wardrobe.search('axolotl') == []
+    finally:
+        release.set()
+        thread.join()
+
+    # The index built from the old generation was not stored as current
+    assert search_ids('axolotl') == [item_ids[5]]
+    assert search_ids('pangolin') == []
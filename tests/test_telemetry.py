@@ -0,0 +1,84 @@
+"""Telemetry: per-phase records of script runs and the report over them."""
+
+import json
+
+import pytest
+
+import telemetry
+
+
+def logged(data_dir):
+    return telemetry.read_log(data_dir / 'telemetry.jsonl')
+
+
+def test_nothing_is_logged_unless_enabled(data_dir, script):
+    result = script('wardrobe_query.py', '--type', 'tops')
+    assert result.returncode == 0, result.stderr
+    assert 'timings:' not in result.stderr
+    assert logged(data_dir) == []
+
+
+def test_timings_flag_records_phases_and_shape(data_dir, script):
+    result = script('wardrobe_query.py', '--type', 'tops', '--season', 'fall', '--no-cache', '--timings')
+    assert result.returncode == 0, result.stderr
+    assert result.stderr.startswith('timings: wardrobe_query')
+    matched = json.loads(result.stdout)
+
+    [record] = logged(data_dir)
+    assert record['script'] == 'wardrobe_query'
+    assert record['shape'] == '--no-cache --season --type'
+    assert record['argv'] == ['--type', 'tops', '--season', 'fall', '--no-cache', '--timings']
+    assert {'filter', 'output'} <= set(record['phases'])
+    assert record['counts']['matched'] == len(matched)
+    assert record['phases']['filter']['calls'] == 1
+    assert 0 <= record['phases']['filter']['wall'] <= record['wall']
+
+
+def test_environment_enables_every_script_quietly(data_dir, item_ids, script, monkeypatch):
+    monkeypatch.setenv(telemetry.ENV_VAR, '1')
+    assert script('get_item_details.py', item_ids[0]).returncode == 0
+    result = script('update_wardrobe.py', '--mark-worn', item_ids[0])
+    assert result.returncode == 0, result.stderr
+    assert 'timings:' not in result.stderr
+
+    records = logged(data_dir)
+    assert [record['script'] for record in records] == ['get_item_details', 'update_wardrobe']
+    assert records[1]['counts'] == {'worn': 1}
+
+
+def record(script, shape, wall, timestamp='2025-10-01T00:00:00Z', **phases):
+    return {'timestamp': timestamp, 'script': script, 'shape': shape, 'argv': [], 'wall': wall,
+            'phases': {name: {'wall': value} for name, value in phases.items()}}
+
+
+def test_summary_ranks_invocations_and_shapes():
+    records = [record('wardrobe_query', '--type', wall / 10, filter=wall / 100) for wall in range(1, 11)]
+    records.append(record('update_wardrobe', '--update', 5.0))
+
+    summary = telemetry.summarize(records, limit=2)
+    assert summary['invocations'] == 11
+    assert [r['wall'] for r in summary['slowest']] == [5.0, 1.0]
+    assert summary['frequent'][0]['shape'] == 'wardrobe_query --type'
+    assert summary['frequent'][0]['count'] == 10
+    assert summary['frequent'][0]['p50'] == pytest.approx(0.5)
+    assert summary['frequent'][0]['p90'] == pytest.approx(0.9)
+    assert summary['phases']['wardrobe_query:filter']['max'] == pytest.approx(0.1)
+
+
+def test_report_filters_and_skips_partial_lines(data_dir, script):
+    lines = [json.dumps(record('wardrobe_query', '--type', 0.2, timestamp='2025-09-01T00:00:00Z')),
+             json.dumps(record('wardrobe_query', '--tag', 0.3)),
+             json.dumps(record('update_wardrobe', '--update', 0.4)),
+             '{"timestamp": "2025-']
+    (data_dir / 'telemetry.jsonl').write_text('\n'.join(lines), encoding='utf-8')
+
+    result = script('telemetry.py', 'report', '--script', 'wardrobe_query', '--since', '2025-10-01', '--json')
+    assert result.returncode == 0, result.stderr
+    summary = json.loads(result.stdout)
+    assert summary['invocations'] == 1
+    assert summary['frequent'][0]['shape'] == 'wardrobe_query --tag'
+
+    assert script('telemetry.py', 'clear').returncode == 0
+    result = script('telemetry.py', 'report')
+    assert result.returncode == 1
+    assert 'No telemetry recorded' in result.stderr
@@ -0,0 +1,65 @@
+"""Content-hashed thumbnail cache and the srcset markup that uses it."""
+
+import pytest
+
+import generate_recommendation_html as generator
+import thumbnails
+import wardrobe_core
+
+
+@pytest.fixture
+def images(tmp_path, monkeypatch):
+    """Point the thumbnail cache at a scratch project root with an images/ directory."""
+    monkeypatch.setattr(wardrobe_core, 'BASE_PATH', tmp_path)
+    monkeypatch.setattr(thumbnails, 'IMAGES_DIR', tmp_path / 'images')
+    monkeypatch.setattr(thumbnails, 'THUMBNAILS_DIR', tmp_path / 'images' / '.thumbnails')
+    monkeypatch.setattr(thumbnails, 'MANIFEST_PATH', tmp_path / 'images' / '.thumbnails' / 'manifest.json')
+    (tmp_path / 'images' / '.thumbnails').mkdir(parents=True)
+    return tmp_path / 'images'
+
+
+def fake_entry(source, digest='ab' * 32):
+    return {'source': list(wardrobe_core.file_signature(source)), 'sha256': digest, 'width': 1200,
+            'widths': [320, 640], 'webp': True, 'variants': [
+                [320, f'images/.thumbnails/ab/{digest}-320.jpg', 'image/jpeg'],
+                [320, f'images/.thumbnails/ab/{digest}-320.webp', 'image/webp'],
+                [640, f'images/.thumbnails/ab/{digest}-640.jpg', 'image/jpeg'],
+            ]}
+
+
+def test_variants_follow_the_source_signature(images):
+    source = images / 'coat.jpg'
+    source.write_bytes(b'photo')
+    thumbnails.save_manifest({'images/coat.jpg': fake_entry(source)})
+
+    found = thumbnails.variants('images/coat.jpg')
+    assert [width for _, width in found['image/jpeg']] == [320, 640]
+    assert len(found['image/webp']) == 1
+    assert thumbnails.variants('images/other.jpg') == {}
+
+    source.write_bytes(b'replaced photo')
+    assert thumbnails.variants('images/coat.jpg') == {}
+
+
+def test_image_html_uses_srcset_when_thumbnails_exist(images):
+    source = images / 'coat.jpg'
+    source.write_bytes(b'photo')
+    thumbnails.save_manifest({'images/coat.jpg': fake_entry(source)})
+
+    markup = generator.image_html('images/coat.jpg', 'Coat')
+    assert markup.startswith('<picture><source type="image/webp"')
+    assert '-320.jpg 320w, ../../images/.thumbnails/ab/' in markup
+    assert f'sizes="{thumbnails.SIZES}"' in markup
+    assert generator.image_html('images/none.jpg', 'None') == '<img src="../../images/none.jpg" alt="None">'
+
+
+def test_warm_skips_unchanged_and_shares_identical_photos(images):
+    Image = pytest.importorskip('PIL.Image')
+    Image.new('RGB', (800, 600), (200, 30, 30)).save(images / 'a.jpg')
+    (images / 'b.jpg').write_bytes((images / 'a.jpg').read_bytes())
+
+    assert thumbnails.warm(workers=1) == (2, 0, 0)
+    manifest = thumbnails.load_manifest()
+    assert manifest['images/a.jpg']['variants'] == manifest['images/b.jpg']['variants']
+    assert [width for width, _, _ in manifest['images/a.jpg']['variants']] == [320, 640]
+    assert thumbnails.warm(workers=1) == (0, 2, 0)
@@ -0,0 +1,82 @@
+"""update_wardrobe.py --batch, including its interaction with the wear log."""
+
+import json
+
+import update_wardrobe
+import wardrobe_core
+import wear_log
+
+
+def write_batch(path, *ops):
+    path.write_text(''.join(json.dumps(op) + '\n' for op in ops), encoding='utf-8')
+    return str(path)
+
+
+def tracking(item_id):
+    wardrobe_core.Wardrobe.clear_caches()
+    return wardrobe_core.Wardrobe.load().get(item_id)['tracking']
+
+
+def indexed_wear_count(item_id):
+    wardrobe_core.Wardrobe.clear_caches()
+    return wardrobe_core.Wardrobe.load().query(ids=[item_id])[0]['wearCount']
+
+
+def test_tracking_update_is_not_lost_to_pending_wear(data_dir, item_ids, tmp_path):
+    item_id = item_ids[0]
+    update_wardrobe.mark_items_worn([item_id], '2025-11-01T10:00:00Z')
+    assert wear_log.read_events()
+
+    batch = write_batch(tmp_path / 'ops.jsonl',
+                        {'op': 'update', 'id': item_id, 'field': 'tracking.wearCount', 'value': 0})
+    assert update_wardrobe.run_batch(batch)
+
+    assert tracking(item_id)['wearCount'] == 0
+    assert indexed_wear_count(item_id) == 0
+    assert not wear_log.read_events()
+
+
+def test_mark_worn_is_logged_not_written(data_dir, item_ids, tmp_path):
+    items_path = data_dir / 'wardrobe' / 'wardrobe_items.json'
+    before = items_path.stat().st_mtime_ns
+    worn = item_ids[1:3]
+    counts = [tracking(item_id).get('wearCount', 0) for item_id in worn]
+
+    batch = write_batch(tmp_path / 'ops.jsonl',
+                        {'op': 'mark-worn', 'ids': worn, 'date': '2025-11-02', 'outfit': 'rec_x'})
+    assert update_wardrobe.run_batch(batch)
+
+    assert items_path.stat().st_mtime_ns == before
+    assert [event[0] for event in wear_log.read_events()] == worn
+    for item_id, count in zip(worn, counts):
+        assert tracking(item_id)['wearCount'] == count + 1
+        assert tracking(item_id)['lastWorn'] >= '2025-11-02'
+        assert indexed_wear_count(item_id) == count + 1
+
+
+def test_mark_worn_before_tracking_update_in_same_batch(data_dir, item_ids, tmp_path):
+    item_id = item_ids[3]
+    batch = write_batch(tmp_path / 'ops.jsonl',
+                        {'op': 'mark-worn', 'id': item_id, 'date': '2025-11-03'},
+                        {'op': 'update', 'id': item_id, 'field': 'tracking.wearCount', 'value': 5},
+                        {'op': 'mark-worn', 'id': item_id, 'date': '2025-11-04'})
+    assert update_wardrobe.run_batch(batch)
+
+    # The first event is folded before the update, the second stays pending
+    assert tracking(item_id)['wearCount'] == 6
+    assert [event[:2] for event in wear_log.read_events()] == [(item_id, '2025-11-04')]
+    assert [event[:2] for event in wear_log.read_events(wear_log.WEAR_HISTORY)] == [(item_id, '2025-11-03')]
+
+
+def test_rejected_batch_writes_nothing(data_dir, item_ids, tmp_path):
+    items_path = data_dir / 'wardrobe' / 'wardrobe_items.json'
+    before = items_path.read_bytes()
+
+    batch = write_batch(tmp_path / 'ops.jsonl',
+                        {'op': 'update', 'id': item_ids[0], 'field': 'name', 'value': 'Renamed'},
+                        {'op': 'mark-worn', 'ids': [item_ids[1]]},
+                        {'op': 'remove', 'id': 'item_missing'})
+    assert not update_wardrobe.run_batch(batch)
+
+    assert items_path.read_bytes() == before
+    assert not wear_log.read_events()
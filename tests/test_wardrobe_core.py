@@ -0,0 +1,45 @@
+"""Wardrobe model and the shared data paths."""
+
+import json
+
+import pytest
+
+import item_offsets
+import query_cache
+import query_engine
+import telemetry
+import wardrobe_core
+import wardrobe_db
+import wardrobe_lock
+import wardrobe_paths
+import wear_log
+
+
+def test_get_matches_items_file(data_dir, item_ids):
+    with open(data_dir / 'wardrobe' / 'wardrobe_items.json', 'r', encoding='utf-8') as f:
+        items = {item['id']: item for item in json.load(f)['items']}
+
+    wardrobe = wardrobe_core.Wardrobe.load()
+    assert wardrobe.get(item_ids[5]) == items[item_ids[5]]
+    found, missing = wardrobe.get_many([item_ids[7], 'item_missing', item_ids[2]])
+    assert [item['id'] for item in found] == [item_ids[7], item_ids[2]]
+    assert missing == ['item_missing']
+
+
+def test_load_is_cached_until_a_file_changes(data_dir, item_ids):
+    first = wardrobe_core.Wardrobe.load()
+    assert wardrobe_core.Wardrobe.load() is first
+
+    items_path = data_dir / 'wardrobe' / 'wardrobe_items.json'
+    item_offsets.write_items_file(items_path, item_offsets.load_items_document(items_path))
+    assert wardrobe_core.Wardrobe.load() is not first
+
+
+@pytest.mark.parametrize('path', [
+    wardrobe_core.WARDROBE_INDEX, wardrobe_core.WARDROBE_ITEMS, query_engine.WARDROBE_INDEX,
+    item_offsets.WARDROBE_ITEMS, wear_log.WEAR_LOG, wardrobe_db.DB_PATH, wardrobe_lock.VERSION_PATH,
+    query_cache.CACHE_DIR, telemetry.TELEMETRY_LOG,
+])
+def test_every_module_uses_the_data_dir(data_dir, path):
+    assert wardrobe_paths.DATA_DIR == data_dir
+    assert data_dir in path.parents
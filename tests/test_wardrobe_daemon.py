@@ -0,0 +1,72 @@
+"""Resident query daemon: request handling, reload on edit, and the socket round trip."""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+import update_wardrobe
+import wardrobe_core
+import wardrobe_daemon
+from conftest import SCRIPTS_DIR
+
+
+def test_state_answers_like_the_library(data_dir, item_ids):
+    state = wardrobe_daemon.WardrobeState()
+    wardrobe = wardrobe_core.Wardrobe.load()
+
+    response = state.handle({'op': 'filter', 'filters': {'type': 'tops', 'formality': [3, 8]}})
+    assert response == {'ok': True, 'items': wardrobe.query(type='tops', formality=(3, 8))}
+
+    response = state.handle({'op': 'details', 'ids': [item_ids[1], 'item_missing']})
+    assert response['items'] == [wardrobe.get(item_ids[1])]
+    assert response['not_found'] == ['item_missing']
+    assert state.handle({'op': 'bogus'})['ok'] is False
+
+
+def test_state_sees_edits(data_dir, item_ids):
+    state = wardrobe_daemon.WardrobeState()
+    assert state.handle({'op': 'details', 'ids': [item_ids[0]]})['items'][0]['name'] != 'Edited'
+    update_wardrobe.update_item_field(item_ids[0], 'name', 'Edited')
+    assert state.handle({'op': 'details', 'ids': [item_ids[0]]})['items'][0]['name'] == 'Edited'
+
+
+@pytest.fixture
+def daemon(data_dir, monkeypatch):
+    if not hasattr(socket, 'AF_UNIX'):
+        pytest.skip('Unix domain sockets are not available')
+    # Socket paths are limited to ~100 bytes, so keep it short
+    socket_path = Path(tempfile.mkdtemp(prefix='wd-')) / 'd.sock'
+    monkeypatch.setenv('WARDROBE_SOCKET', str(socket_path))
+    monkeypatch.setattr(wardrobe_daemon, 'SOCKET_PATH', socket_path)
+    process = subprocess.Popen([sys.executable, str(SCRIPTS_DIR / 'wardrobe_daemon.py'), 'serve'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=dict(os.environ))
+    deadline = time.monotonic() + 10
+    while wardrobe_daemon.request('ping') is None:
+        assert process.poll() is None, process.stderr.read()
+        assert time.monotonic() < deadline, 'daemon did not start'
+        time.sleep(0.05)
+    yield process
+    wardrobe_daemon.request('shutdown')
+    process.wait(10)
+    socket_path.parent.rmdir()
+
+
+def test_socket_round_trip(daemon, item_ids, script):
+    assert wardrobe_daemon.request('ping')['pid'] == daemon.pid
+    response = wardrobe_daemon.request('details', ids=[item_ids[2]])
+    assert response['items'] == [wardrobe_core.Wardrobe.load().get(item_ids[2])]
+
+    result = script('get_item_details.py', item_ids[2])
+    assert result.returncode == 0, result.stderr
+    assert item_ids[2] in result.stdout
+
+
+def test_request_without_daemon_returns_none(monkeypatch, tmp_path):
+    monkeypatch.setattr(wardrobe_daemon, 'SOCKET_PATH', tmp_path / 'missing.sock')
+    assert wardrobe_daemon.request('ping') is None
@@ -0,0 +1,78 @@
+"""SQLite backend: JSON parity, import/export round trip and the CLI."""
+
+import json
+
+import pytest
+
+import update_wardrobe
+import wardrobe_core
+import wardrobe_db
+import wear_log
+
+QUERIES = [
+    {},
+    {'type': 'tops'},
+    {'category': 'outerwear'},
+    {'formality': (5, 7), 'season': 'fall'},
+    {'tag': 'versatile', 'type': 'bottoms'},
+    {'temp': 50.0},
+    {'temp_range': (30.0, 45.0)},
+    {'not_worn_since': '2025-06-01', 'sort_by': 'last-worn'},
+    {'order': ['-formality', 'name'], 'offset': 3, 'limit': 10},
+]
+
+
+def json_results(filters):
+    wardrobe_core.Wardrobe.clear_caches()
+    return [entry['id'] for entry in wardrobe_core.Wardrobe.load().query(**filters)]
+
+
+@pytest.mark.parametrize('filters', QUERIES)
+def test_sqlite_matches_json(data_dir, monkeypatch, filters):
+    expected = json_results(filters)
+
+    monkeypatch.setenv('WARDROBE_BACKEND', 'sqlite')
+    with wardrobe_db.open_db() as conn:
+        wardrobe_db.import_json(conn)
+        assert [entry['id'] for entry in wardrobe_db.query_index(conn, **filters)] == expected
+
+
+def test_export_round_trip(sqlite_backend):
+    items_path = sqlite_backend / 'wardrobe' / 'wardrobe_items.json'
+    before = json.loads(items_path.read_text(encoding='utf-8'))
+
+    with wardrobe_db.open_db() as conn:
+        wardrobe_db.export_json(conn)
+
+    assert json.loads(items_path.read_text(encoding='utf-8')) == before
+
+
+def test_import_keeps_pending_wear(data_dir, item_ids, script):
+    item_id = item_ids[0]
+    before = wardrobe_core.Wardrobe.load().get(item_id)['tracking']
+    update_wardrobe.mark_items_worn([item_id], '2026-01-15T09:00:00Z')
+    assert wear_log.read_events()
+
+    result = script('wardrobe_db.py', 'import')
+    assert result.returncode == 0, result.stderr
+
+    assert not wear_log.read_events()
+    with wardrobe_db.open_db() as conn:
+        tracking = wardrobe_db.get_item(conn, item_id)['tracking']
+        entry = wardrobe_db.query_index(conn, ids=[item_id])[0]
+    assert tracking['wearCount'] == entry['wearCount'] == before.get('wearCount', 0) + 1
+    assert tracking['lastWorn'] >= '2026-01-15' and entry['lastWorn'] >= '2026-01-15'
+
+    wardrobe_core.Wardrobe.clear_caches()
+    assert wardrobe_core.Wardrobe.load().get(item_id)['tracking']['wearCount'] == tracking['wearCount']
+
+
+def test_cli_with_data_dir_outside_repo(data_dir, script):
+    result = script('wardrobe_db.py', '--help')
+    assert result.returncode == 0, result.stderr
+    assert 'Database path' in result.stdout
+
+    db_path = data_dir / 'other.db'
+    result = script('wardrobe_db.py', 'import', '--db', db_path)
+    assert result.returncode == 0, result.stderr
+    assert db_path.exists()
@@ -0,0 +1,128 @@
+"""Atomic writes, the write lock and the version counter."""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import update_wardrobe
+import wardrobe_core
+import wardrobe_lock
+from conftest import SCRIPTS_DIR
+
+
+def test_atomic_file_replaces_on_success_and_keeps_mode(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text('old', encoding='utf-8')
+    os.chmod(path, 0o640)
+
+    wardrobe_lock.write_json_atomic(path, {'a': [1, 2]})
+
+    assert path.read_text(encoding='utf-8') == '{\n  "a": [\n    1,\n    2\n  ]\n}'
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_atomic_file_keeps_old_file_on_error_or_discard(tmp_path):
+    path = tmp_path / 'page.html'
+    path.write_text('old', encoding='utf-8')
+
+    with pytest.raises(RuntimeError):
+        with wardrobe_lock.atomic_file(path, 'w', encoding='utf-8') as f:
+            f.write('partial')
+            raise RuntimeError('render failed')
+    with wardrobe_lock.atomic_file(path, 'w', encoding='utf-8') as f:
+        f.write('empty')
+        raise wardrobe_lock.Discard()
+
+    assert path.read_text(encoding='utf-8') == 'old'
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_new_file_is_world_readable(tmp_path):
+    path = tmp_path / 'new.bin'
+    wardrobe_lock.write_atomic(path, b'\x00\x01')
+    assert path.read_bytes() == b'\x00\x01'
+    assert path.stat().st_mode & 0o777 == 0o644
+
+
+def committed_version():
+    """Record the generated files as a version (as the first writer would) and return it."""
+    with wardrobe_lock.writer() as version:
+        return version
+
+
+def names(wardrobe, item_ids):
+    return [wardrobe.get(item_id)['name'] for item_id in item_ids]
+
+
+def test_readers_do_not_wait_for_a_writer_mid_commit(data_dir, item_ids):
+    renamed = item_ids[:2]
+    version = committed_version()
+    before = names(wardrobe_core.Wardrobe.load(), renamed)
+    written, release = threading.Event(), threading.Event()
+
+    def write():
+        with wardrobe_lock.writer():
+            for item_id in renamed:
+                update_wardrobe.update_item_field(item_id, 'name', 'Renamed')
+            written.set()
+            release.wait(10)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        assert written.wait(10)
+        wardrobe_core.Wardrobe.clear_caches()
+        started = time.monotonic()
+        wardrobe = wardrobe_core.Wardrobe.load()
+        assert time.monotonic() - started < wardrobe_lock.SNAPSHOT_ATTEMPTS * 0.1
+        assert wardrobe.version == version
+        assert wardrobe.get(renamed[0])['name'] == before[0]
+        assert wardrobe.entry(renamed[0])['name'] == before[0]
+    finally:
+        release.set()
+        thread.join()
+
+    # Records decoded after the commit still come from the pinned generation
+    assert wardrobe.get(renamed[1])['name'] == before[1]
+    fresh = wardrobe_core.Wardrobe.load()
+    assert fresh.version == version + 1
+    assert names(fresh, renamed) == ['Renamed', 'Renamed']
+    assert not wardrobe_lock.GENERATIONS_DIR.exists()
+
+
+def test_concurrent_writers_do_not_lose_edits(data_dir, item_ids):
+    version = committed_version()
+    edited = item_ids[:8]
+    runs = [subprocess.Popen([sys.executable, str(SCRIPTS_DIR / 'update_wardrobe.py'),
+                              '--update', item_id, '--field', 'name', '--value', f'Parallel {n}'],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                             env=dict(os.environ))
+            for n, item_id in enumerate(edited)]
+    for run in runs:
+        assert run.wait(60) == 0, run.stderr.read()
+
+    wardrobe_core.Wardrobe.clear_caches()
+    wardrobe = wardrobe_core.Wardrobe.load()
+    assert names(wardrobe, edited) == [f'Parallel {n}' for n in range(len(edited))]
+    assert [wardrobe.entry(item_id)['name'] for item_id in edited] == names(wardrobe, edited)
+    assert wardrobe.version == version + len(edited)
+
+
+def test_stale_if_version_is_refused(data_dir, item_ids, script):
+    items_path = data_dir / 'wardrobe' / 'wardrobe_items.json'
+    update_wardrobe.update_item_field(item_ids[0], 'name', 'First')
+    stale = wardrobe_lock.read_version()['version']
+    result = script('update_wardrobe.py', '--update', item_ids[1], '--field', 'name', '--value', 'Second')
+    assert result.returncode == 0, result.stderr
+    before = items_path.read_bytes()
+
+    result = script('update_wardrobe.py', '--update', item_ids[2], '--field', 'name', '--value', 'Third',
+                    '--if-version', stale)
+    assert result.returncode == 1
+    assert 'Conflict' in result.stderr
+    assert items_path.read_bytes() == before
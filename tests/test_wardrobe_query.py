@@ -0,0 +1,126 @@
+"""wardrobe_query.py output: field projection, ordering, pagination, NDJSON and --batch."""
+
+import json
+
+import pytest
+
+import wardrobe_query
+from conftest import DATASET_SIZE
+
+
+def query(script, *args):
+    result = script('wardrobe_query.py', *args)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def ndjson(output):
+    return [json.loads(line) for line in output.splitlines()]
+
+
+def test_project_keeps_only_requested_paths():
+    item = {'id': 'a', 'name': 'Shirt', 'metadata': {'formality': 6, 'colors': {'primary': 'navy'}}}
+    assert wardrobe_query.project(item, ['id', 'metadata.colors.primary', 'metadata.missing', 'name.x']) == \
+        {'id': 'a', 'metadata': {'colors': {'primary': 'navy'}}}
+
+
+def test_sort_matches_python_ordering(data_dir, script):
+    everything = json.loads(query(script, '--no-cache'))
+    expected = sorted(everything, key=lambda entry: entry['name'])
+    expected.sort(key=lambda entry: entry['formality'], reverse=True)
+
+    result = json.loads(query(script, '--sort=-formality,name'))
+    assert [entry['id'] for entry in result] == [entry['id'] for entry in expected]
+
+
+@pytest.mark.parametrize('ordering', [[], ['--sort', 'primaryColor,-id'], ['--sort-by', 'wear-count']])
+def test_pages_add_up_to_the_full_result(data_dir, script, ordering):
+    full = json.loads(query(script, '--type', 'tops', *ordering))
+    pages = []
+    for offset in range(0, len(full) + 5, 5):
+        pages += json.loads(query(script, '--type', 'tops', *ordering, '--offset', offset, '--limit', 5))
+    assert pages == full
+
+
+@pytest.mark.parametrize('cache', [['--no-cache'], []])
+def test_ndjson_matches_json(data_dir, script, cache):
+    for extra in ([], ['--detailed', '--fields', 'id,name,metadata.formality']):
+        as_json = json.loads(query(script, '--season', 'fall', *cache, *extra))
+        assert as_json
+        # Twice: the second run may be answered from the result cache
+        for _ in range(2):
+            assert ndjson(query(script, '--season', 'fall', '--format', 'ndjson', *cache, *extra)) == as_json
+
+    detailed = ndjson(query(script, '--season', 'fall', '--detailed', '--format', 'ndjson', *cache,
+                            '--fields', 'id,metadata.formality'))
+    assert all(set(item) == {'id', 'metadata'} and set(item['metadata']) == {'formality'} for item in detailed)
+
+
+def test_all_returns_every_item(data_dir, script):
+    everything = json.loads(query(script, '--no-cache'))
+    assert len(everything) == DATASET_SIZE
+    assert json.loads(query(script, '--all', '--limit', '5')) == everything[:5]
+    assert [item['id'] for item in json.loads(query(script, '--all', '--detailed'))] == \
+        [entry['id'] for entry in everything]
+
+
+def test_invalid_output_flags_are_rejected(data_dir, script):
+    for args in (['--fields', 'id', '--format', 'summary'], ['--offset', '-1'], ['--sort', 'price'],
+                 ['--sort', 'name', '--sort-by', 'last-worn'], ['--all', '--type', 'tops'],
+                 ['--all', '--search', 'cotton']):
+        result = script('wardrobe_query.py', *args)
+        assert result.returncode == 2, args
+        assert 'error:' in result.stderr
+
+
+BATCH = [
+    ({'tag': 'tops', 'type': 'tops', 'formality': '5-7'}, ['--type', 'tops', '--formality', '5-7']),
+    ({'season': 'fall', 'sort': ['-formality', 'name'], 'limit': 4},
+     ['--season', 'fall', '--sort=-formality,name', '--limit', '4']),
+    ({'color_near': 'navy', 'detailed': True, 'fields': ['id', 'metadata.colors']},
+     ['--color-near', 'navy', '--detailed', '--fields', 'id,metadata.colors']),
+    ({'search': 'pockets', 'limit': 3}, ['--search', 'pockets', '--limit', '3']),
+]
+
+
+def test_batch_answers_match_single_queries(data_dir, script):
+    specs = '\n'.join(json.dumps(spec) for spec, _ in BATCH) + '\n\n'
+    result = script('wardrobe_query.py', '--batch', input=specs)
+    assert result.returncode == 0, result.stderr
+
+    answers = ndjson(result.stdout)
+    assert [answer['line'] for answer in answers] == [1, 2, 3, 4]
+    assert answers[0]['tag'] == 'tops'
+    for answer, (_, argv) in zip(answers, BATCH):
+        expected = json.loads(query(script, '--no-cache', *argv))
+        assert answer['status'] == 'ok'
+        assert answer['items'] == expected, argv
+        assert answer['count'] == len(expected)
+
+
+def test_batch_reports_bad_specs_and_continues(data_dir, item_ids, script, tmp_path):
+    specs = tmp_path / 'specs.jsonl'
+    specs.write_text('\n'.join([
+        json.dumps({'op': 'details', 'ids': [item_ids[0], 'item_missing', item_ids[1]], 'tag': 7}),
+        '{not json',
+        json.dumps({'op': 'delete'}),
+        json.dumps({'type': 'tops', 'format': 'summary'}),
+        json.dumps({'max_delta': 5}),
+        json.dumps({'color_near': 'no such color'}),
+        json.dumps({'op': 'details', 'ids': item_ids[1], 'fields': ['id']}),
+    ]) + '\n', encoding='utf-8')
+    result = script('wardrobe_query.py', '--batch', specs)
+    assert result.returncode == 1
+
+    answers = ndjson(result.stdout)
+    assert [answer['status'] for answer in answers] == ['ok'] + ['error'] * 5 + ['ok']
+    assert [item['id'] for item in answers[0]['items']] == item_ids[:2]
+    assert answers[0]['notFound'] == ['item_missing'] and answers[0]['tag'] == 7
+    assert answers[1]['message'].startswith('Invalid JSON')
+    assert 'format' in answers[3]['message']
+    assert answers[4]['message'] == '--max-delta requires --color-near'
+    assert answers[6]['items'] == [{'id': item_ids[1]}]
+
+    mixed = script('wardrobe_query.py', '--batch', specs, '--type', 'tops')
+    assert mixed.returncode == 2
+    assert 'only --timings' in mixed.stderr
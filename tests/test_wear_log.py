@@ -0,0 +1,62 @@
+"""Append-only wear log: pending events are visible at once and compact into the files."""
+
+import json
+
+import update_wardrobe
+import wardrobe_core
+import wear_log
+
+
+def tracking(item_id):
+    wardrobe_core.Wardrobe.clear_caches()
+    return wardrobe_core.Wardrobe.load().get(item_id)['tracking']
+
+
+def stored(data_dir, name, item_id):
+    with open(data_dir / 'wardrobe' / name, 'r', encoding='utf-8') as f:
+        return next(entry for entry in json.load(f)['items'] if entry['id'] == item_id)
+
+
+def test_mark_worn_appends_instead_of_rewriting(data_dir, item_ids):
+    items_path = data_dir / 'wardrobe' / 'wardrobe_items.json'
+    before = items_path.read_bytes()
+    count = tracking(item_ids[0]).get('wearCount', 0)
+
+    assert update_wardrobe.mark_items_worn([item_ids[0], 'item_missing'], '2026-01-02T08:00:00Z', 'rec_1')
+    assert update_wardrobe.mark_items_worn([item_ids[0]], '2026-01-01T08:00:00Z')
+
+    assert items_path.read_bytes() == before
+    assert wear_log.read_events() == [(item_ids[0], '2026-01-02T08:00:00Z', 'rec_1'),
+                                      (item_ids[0], '2026-01-01T08:00:00Z', None)]
+    assert tracking(item_ids[0])['wearCount'] == count + 2
+    assert tracking(item_ids[0])['lastWorn'] == '2026-01-02T08:00:00Z'
+
+
+def test_compact_folds_events_into_items_and_index(data_dir, item_ids):
+    count = tracking(item_ids[1]).get('wearCount', 0)
+    update_wardrobe.mark_items_worn(item_ids[1:3], '2026-02-01T08:00:00Z')
+
+    assert wear_log.compact() == 2
+    assert wear_log.read_events() == []
+    assert not wear_log.WEAR_LOG.exists()
+    assert stored(data_dir, 'wardrobe_items.json', item_ids[1])['tracking']['wearCount'] == count + 1
+    assert stored(data_dir, 'wardrobe_index.json', item_ids[1])['wearCount'] == count + 1
+    assert tracking(item_ids[1])['wearCount'] == count + 1
+    assert wear_log.history(item_ids[1])[-1] == ('2026-02-01T08:00:00Z', None)
+    assert wear_log.compact() == 0
+
+
+def test_log_compacts_past_the_threshold(data_dir, item_ids, monkeypatch):
+    monkeypatch.setattr(wear_log, 'COMPACT_THRESHOLD', 0)
+    count = tracking(item_ids[4]).get('wearCount', 0)
+    update_wardrobe.mark_items_worn([item_ids[4]], '2026-03-01T08:00:00Z')
+
+    assert not wear_log.WEAR_LOG.exists()
+    assert stored(data_dir, 'wardrobe_items.json', item_ids[4])['tracking']['wearCount'] == count + 1
+
+
+def test_history_merges_compacted_and_pending(data_dir, item_ids):
+    update_wardrobe.mark_items_worn([item_ids[5]], '2026-04-02')
+    wear_log.compact()
+    update_wardrobe.mark_items_worn([item_ids[5]], '2026-04-01', 'rec_2')
+    assert wear_log.history(item_ids[5]) == [('2026-04-01', 'rec_2'), ('2026-04-02', None)]